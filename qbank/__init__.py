@@ -0,0 +1 @@
+"""Python toolchain for the chapter question bank in student-app/src/data/raw_questions."""
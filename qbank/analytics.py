@@ -0,0 +1,337 @@
+"""Item analytics over quiz_results: check the easy/medium/hard labels against play.
+
+saveQuizResult stores each quiz's per-question responses, [{id, answer,
+correct}]. This job streams result exports in chunks of CHUNK responses. It
+keeps only per-student and per-question accumulators, so memory grows with
+the number of students and questions, never with the number of responses.
+The export is read twice:
+
+    pass 1  attempts and correct answers per question (p-value) and per
+            student (score), and a first Elo epoch
+    pass 2  point-biserial discrimination of every question against the
+            pass-1 student scores, and a second Elo epoch
+
+The Elo model is an online Rasch model: P(correct) = sigmoid(theta - b) for
+student ability theta and question difficulty b, in logits. Each chunk takes
+one vectorized Newton step per parameter, scaled by the information that
+parameter has seen so far.
+
+Bank questions carry stable content ids (qbank.manifest.question_id), which
+are used as they are. Older results hold positional ids: pooled
+`{Subject}-{chapterId}-{difficulty}-{n}` and shard `xml_{chapterId}_{difficulty}_{n}`
+both become `{pool}#{n}`. Layer 4 mock questions are skipped, and
+unattempted questions are ignored.
+
+Writes under build/qbank/analytics:
+
+    report.json    per-question n, p-value, discrimination, difficulty and flags
+    proposal.json  bank questions whose measured difficulty belongs in another pool
+
+Requires numpy.
+
+    python -m qbank.analytics --input results.jsonl [--min-responses 30]
+    python -m qbank.analytics --source file --source-target build/qbank/emulator
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from .backends import make_backend
+from .leaderboard import iter_export
+from .export import APP_CODES, bank_subject
+from .manifest import pool_doc_id
+from .paths import BUILD_DIR, DIFFICULTIES
+
+RESULTS = "quiz_results"
+DEFAULT_OUT = os.path.join(BUILD_DIR, "analytics")
+CHUNK = 1 << 16  # responses per vectorized step
+MIN_RESPONSES = 30
+PRIOR_INFO = 1.0  # pseudo-information that keeps the first steps small
+WEAK_DISCRIMINATION = 0.1
+
+# Layer 4 mock ids start with an app subject code
+MOCK_PREFIXES = frozenset(APP_CODES.values())
+
+_POOLED_ID = re.compile(r"^([A-Za-z]+)-(\d+)-(easy|medium|hard)-(\d+)$")
+_SHARD_ID = re.compile(r"^xml_(\d+)_(easy|medium|hard)_(\d+)$")
+
+
+def item_key(question_id, result):
+    """(key, pool, difficulty) for a served question id, or None for mock questions."""
+    m = _POOLED_ID.match(question_id)
+    if m:
+        subject, chapter_id, diff, n = m.groups()
+        if subject in MOCK_PREFIXES:
+            return None
+        pool = pool_doc_id(subject, int(chapter_id), diff)
+        return f"{pool}#{n}", pool, diff
+    code = str(result.get("subject") or "")
+    m = _SHARD_ID.match(question_id)
+    if m:
+        chapter_id, diff, n = m.groups()
+        pool = pool_doc_id(bank_subject(code, int(chapter_id)), int(chapter_id), diff)
+        return f"{pool}#{n}", pool, diff
+    # Content ids and flat Firestore document ids are stable as they are
+    diff = str(result.get("difficulty") or "").lower()
+    try:
+        chapter_id = int(result.get("chapterId"))
+    except (TypeError, ValueError):
+        return question_id, pool_doc_id(code, result.get("chapterId", ""), diff), diff
+    return question_id, pool_doc_id(bank_subject(code, chapter_id), chapter_id, diff), diff
+
+
+class _Index:
+    """Dense integer ids for string keys."""
+
+    def __init__(self):
+        self.ids = {}
+        self.keys = []
+
+    def __call__(self, key):
+        i = self.ids.get(key)
+        if i is None:
+            i = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return i
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class _Grow:
+    """Per-entity float64 columns that grow with an _Index."""
+
+    def __init__(self, *names):
+        self.cols = {name: np.zeros(1024) for name in names}
+
+    def fit(self, n):
+        size = len(next(iter(self.cols.values())))
+        if n > size:
+            while size < n:
+                size *= 2
+            for name, col in self.cols.items():
+                grown = np.zeros(size)
+                grown[:len(col)] = col
+                self.cols[name] = grown
+
+    def __getitem__(self, name):
+        return self.cols[name]
+
+
+class ItemAnalysis:
+    def __init__(self):
+        self.students = _Index()
+        self.items = _Index()
+        self.item_pool = []  # item id -> (pool, difficulty)
+        self.s = _Grow("n", "correct", "theta", "info")
+        self.i = _Grow("n", "correct", "b", "info", "x", "x2", "x_correct")
+        self.responses = 0
+        self.skipped = 0
+
+    def chunks(self, results):
+        """(student ids, item ids, correct) arrays of up to CHUNK responses."""
+        s_buf, i_buf, c_buf = [], [], []
+        for result in results:
+            student = self.students(str(result.get("userId", "")))
+            for response in result.get("responses") or ():
+                if response.get("answer") is None or "id" not in response:
+                    continue
+                key = item_key(str(response["id"]), result)
+                if key is None:
+                    self.skipped += 1
+                    continue
+                item = self.items(key[0])
+                if item == len(self.item_pool):
+                    self.item_pool.append(key[1:])
+                s_buf.append(student)
+                i_buf.append(item)
+                c_buf.append(bool(response.get("correct")))
+                if len(s_buf) >= CHUNK:
+                    yield self._arrays(s_buf, i_buf, c_buf)
+                    s_buf, i_buf, c_buf = [], [], []
+        if s_buf:
+            yield self._arrays(s_buf, i_buf, c_buf)
+
+    def _arrays(self, s, i, c):
+        self.s.fit(len(self.students))
+        self.i.fit(len(self.items))
+        return np.array(s, dtype=np.int64), np.array(i, dtype=np.int64), np.array(c, dtype=np.float64)
+
+    def _elo(self, s, i, c):
+        theta, b = self.s["theta"], self.i["b"]
+        p = 1.0 / (1.0 + np.exp(b[i] - theta[s]))
+        resid = c - p
+        w = p * (1.0 - p)
+        ns, ni = len(theta), len(b)
+        self.s["info"][:] += np.bincount(s, w, ns)
+        self.i["info"][:] += np.bincount(i, w, ni)
+        theta += np.bincount(s, resid, ns) / (self.s["info"] + PRIOR_INFO)
+        b -= np.bincount(i, resid, ni) / (self.i["info"] + PRIOR_INFO)
+
+    def first_pass(self, results):
+        for s, i, c in self.chunks(results):
+            self.responses += len(s)
+            ns, ni = len(self.s["n"]), len(self.i["n"])
+            self.s["n"][:] += np.bincount(s, minlength=ns)
+            self.s["correct"][:] += np.bincount(s, c, ns)
+            self.i["n"][:] += np.bincount(i, minlength=ni)
+            self.i["correct"][:] += np.bincount(i, c, ni)
+            self._elo(s, i, c)
+
+    def second_pass(self, results):
+        score = self.s["correct"] / np.maximum(self.s["n"], 1)
+        for s, i, c in self.chunks(results):
+            x = score[s]
+            ni = len(self.i["n"])
+            self.i["x"][:] += np.bincount(i, x, ni)
+            self.i["x2"][:] += np.bincount(i, x * x, ni)
+            self.i["x_correct"][:] += np.bincount(i, x * c, ni)
+            self._elo(s, i, c)
+
+    def statistics(self):
+        """Arrays n, p-value, discrimination and difficulty, one entry per item."""
+        k = len(self.items)
+        n = self.i["n"][:k]
+        correct = self.i["correct"][:k]
+        safe_n = np.maximum(n, 1)
+        p = correct / safe_n
+        mean_x = self.i["x"][:k] / safe_n
+        sd_x = np.sqrt(np.maximum(self.i["x2"][:k] / safe_n - mean_x ** 2, 0.0))
+        mean_x1 = self.i["x_correct"][:k] / np.maximum(correct, 1)
+        mean_x0 = (self.i["x"][:k] - self.i["x_correct"][:k]) / np.maximum(n - correct, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            disc = (mean_x1 - mean_x0) / sd_x * np.sqrt(p * (1 - p))
+        disc = np.where((sd_x > 0) & (correct > 0) & (correct < n), disc, np.nan)
+        b = self.i["b"][:k].copy()
+        # Rasch difficulties are only defined up to a shift; centre them on the calibrated items
+        calibrated = n >= MIN_RESPONSES
+        if calibrated.any():
+            b -= b[calibrated].mean()
+        return n, p, disc, b
+
+
+def _round(x, digits=4):
+    return None if x != x else round(float(x), digits)
+
+
+def analyse(results_factory, min_responses=MIN_RESPONSES):
+    """(report, proposal) from results_factory(), an iterable of result documents read twice."""
+    analysis = ItemAnalysis()
+    analysis.first_pass(results_factory())
+    analysis.second_pass(results_factory())
+    n, p, disc, b = analysis.statistics()
+
+    calibrated = n >= min_responses
+    cutoffs = np.quantile(b[calibrated], [1 / 3, 2 / 3]) if calibrated.any() else np.array([0.0, 0.0])
+    proposed = np.array(DIFFICULTIES)[np.searchsorted(cutoffs, b)]
+
+    items, moves = [], []
+    transitions = Counter()
+    for idx, key in enumerate(analysis.items.keys):
+        pool, diff = analysis.item_pool[idx]
+        flags = []
+        if calibrated[idx]:
+            if disc[idx] != disc[idx]:
+                flags.append("no-variance")
+            elif disc[idx] < 0:
+                flags.append("negative-discrimination")
+            elif disc[idx] < WEAK_DISCRIMINATION:
+                flags.append("weak-discrimination")
+            if proposed[idx] != diff:
+                flags.append("mislabelled")
+        entry = {
+            "id": key,
+            "pool": pool,
+            "difficulty": diff,
+            "n": int(n[idx]),
+            "p": _round(p[idx]),
+            "discrimination": _round(disc[idx]),
+            "b": _round(b[idx]),
+            "proposed": str(proposed[idx]) if calibrated[idx] else None,
+            "flags": flags,
+        }
+        items.append(entry)
+        if calibrated[idx] and diff in DIFFICULTIES:
+            transitions[f"{diff}->{proposed[idx]}"] += 1
+            # Only bank questions can move pools; flat admin-panel questions are edited there
+            if proposed[idx] != diff and (key.startswith("q_") or "#" in key):
+                moves.append({k: entry[k] for k in ("id", "pool", "difficulty", "proposed", "n", "p", "b")})
+
+    items.sort(key=lambda e: e["id"])
+    moves.sort(key=lambda e: (e["pool"], -abs(e["b"])))
+    summary = {
+        "responses": analysis.responses,
+        "skipped_mock_responses": analysis.skipped,
+        "students": len(analysis.students),
+        "questions": len(analysis.items),
+        "calibrated": int(calibrated.sum()),
+        "min_responses": min_responses,
+        "cutoffs": [_round(c) for c in cutoffs],
+    }
+    report = dict(summary, items=items)
+    proposal = dict(summary, transitions=dict(sorted(transitions.items())), moves=moves)
+    return report, proposal
+
+
+def _stream_results(source, target):
+    """Result documents from a backend, one at a time, so a pass never holds the collection."""
+    loop = asyncio.new_event_loop()
+    backend = make_backend(source, target)
+    docs = backend.stream(RESULTS)
+    try:
+        while True:
+            try:
+                _, data = loop.run_until_complete(docs.__anext__())
+            except StopAsyncIteration:
+                return
+            yield data or {}
+    finally:
+        loop.run_until_complete(docs.aclose())
+        loop.run_until_complete(backend.close())
+        loop.close()
+
+
+def _load_results(args):
+    """A callable returning a fresh iterable of result documents."""
+    if args.input:
+        return lambda: (doc for path in args.input for doc in iter_export(path))
+    return lambda: _stream_results(args.source, args.source_target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate question difficulty from quiz results.")
+    parser.add_argument("--input", action="append", help="quiz_results export (.jsonl or .json); repeatable")
+    parser.add_argument("--source", choices=("memory", "file", "firestore"), default="file",
+                        help="backend to read quiz_results from when there is no --input")
+    parser.add_argument("--source-target", help="directory or project id of the source backend")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--min-responses", type=int, default=MIN_RESPONSES,
+                        help="responses a question needs before it is calibrated")
+    args = parser.parse_args(argv)
+    if not args.input and args.source == "file" and not args.source_target:
+        parser.error("give --input, or --source-target for the file source")
+
+    start = time.perf_counter()
+    report, proposal = analyse(_load_results(args), args.min_responses)
+    os.makedirs(args.out, exist_ok=True)
+    for name, doc in (("report.json", report), ("proposal.json", proposal)):
+        with open(os.path.join(args.out, name), "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=1, ensure_ascii=False)
+
+    flagged = sum(1 for item in report["items"] if item["flags"])
+    print(f"{report['responses']} responses from {report['students']} students on "
+          f"{report['questions']} questions ({report['calibrated']} calibrated): "
+          f"{flagged} flagged, {len(proposal['moves'])} proposed moves "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Document-store backends for the uploader and other Firestore-shaped jobs.
+
+Every backend takes batches of writes, each ("set" | "delete", collection,
+doc_id, data), and applies a batch atomically. Whole collections can be read
+back with stream():
+
+    MemoryBackend     in-process dict with optional simulated latency and
+                      failures, for tests and benchmarks
+    FileBackend       one JSON file per document under a directory, a local
+                      stand-in for the Firestore emulator
+    FirestoreBackend  Cloud Firestore via google-cloud-firestore (optional)
+"""
+import asyncio
+import json
+import os
+import random
+
+
+class TransientError(Exception):
+    """A write that may succeed if retried."""
+
+
+class Backend:
+    # Firestore rejects batches above 500 writes or 10 MiB
+    max_batch_writes = 500
+    max_batch_bytes = 9 * 1024 * 1024
+    transient_errors = (TransientError,)
+
+    async def commit(self, writes):
+        raise NotImplementedError
+
+    async def get(self, collection, doc_id):
+        raise NotImplementedError
+
+    async def stream(self, collection):
+        """Async iterator of (doc_id, data) for every document in collection."""
+        raise NotImplementedError
+        yield  # an async generator, like the overrides
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(Backend):
+    """Dict-backed store. latency is seconds per round trip; failure_rate is the
+    chance that a commit raises TransientError."""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.docs = {}
+        self.commits = 0
+        self.reads = 0
+        self._rng = random.Random(seed)
+
+    async def _round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def commit(self, writes):
+        await self._round_trip()
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise TransientError("simulated failure")
+        for op, collection, doc_id, data in writes:
+            if op == "delete":
+                self.docs.pop((collection, doc_id), None)
+            else:
+                self.docs[(collection, doc_id)] = data
+        self.commits += 1
+
+    async def get(self, collection, doc_id):
+        await self._round_trip()
+        self.reads += 1
+        return self.docs.get((collection, doc_id))
+
+    async def stream(self, collection):
+        await self._round_trip()
+        for (coll, doc_id), data in list(self.docs.items()):
+            if coll == collection:
+                self.reads += 1
+                yield doc_id, data
+
+    def collection(self, collection):
+        return {doc_id: data for (coll, doc_id), data in self.docs.items() if coll == collection}
+
+
+class FileBackend(Backend):
+    """Stores each document as root/<collection>/<doc_id>.json."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, collection, doc_id):
+        return os.path.join(self.root, collection, f"{doc_id}.json")
+
+    def _apply(self, writes):
+        for op, collection, doc_id, data in writes:
+            path = self._path(collection, doc_id)
+            if op == "delete":
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def _read(self, collection, doc_id):
+        try:
+            with open(self._path(collection, doc_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def commit(self, writes):
+        await asyncio.to_thread(self._apply, writes)
+
+    async def get(self, collection, doc_id):
+        return await asyncio.to_thread(self._read, collection, doc_id)
+
+    async def stream(self, collection):
+        try:
+            names = sorted(os.listdir(os.path.join(self.root, collection)))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(".json"):
+                doc_id = name[:-len(".json")]
+                data = await asyncio.to_thread(self._read, collection, doc_id)
+                if data is not None:
+                    yield doc_id, data
+
+
+class FirestoreBackend(Backend):
+    """Cloud Firestore through the async client of google-cloud-firestore.
+
+    Credentials come from GOOGLE_APPLICATION_CREDENTIALS, or from the emulator
+    when FIRESTORE_EMULATOR_HOST is set.
+    """
+
+    def __init__(self, project=None):
+        try:
+            from google.api_core import exceptions
+            from google.cloud import firestore
+        except ImportError as e:
+            raise RuntimeError("FirestoreBackend needs `pip install google-cloud-firestore`") from e
+        self._client = firestore.AsyncClient(project=project)
+        self.transient_errors = (
+            TransientError,
+            exceptions.ServiceUnavailable,
+            exceptions.DeadlineExceeded,
+            exceptions.Aborted,
+            exceptions.TooManyRequests,
+        )
+
+    async def commit(self, writes):
+        batch = self._client.batch()
+        for op, collection, doc_id, data in writes:
+            ref = self._client.collection(collection).document(doc_id)
+            if op == "delete":
+                batch.delete(ref)
+            else:
+                batch.set(ref, data)
+        await batch.commit()
+
+    async def get(self, collection, doc_id):
+        snap = await self._client.collection(collection).document(doc_id).get()
+        return snap.to_dict() if snap.exists else None
+
+    async def stream(self, collection):
+        async for snap in self._client.collection(collection).stream():
+            yield snap.id, snap.to_dict()
+
+    async def close(self):
+        self._client.close()
+
+
+def make_backend(name, target=None, latency=0.0):
+    if name == "memory":
+        return MemoryBackend(latency=latency)
+    if name == "file":
+        if not target:
+            raise ValueError("the file backend needs a target directory")
+        return FileBackend(target)
+    if name == "firestore":
+        return FirestoreBackend(project=target)
+    raise ValueError(f"unknown backend {name!r}")
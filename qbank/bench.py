@@ -0,0 +1,208 @@
+"""Benchmarks for the question-bank toolchain.
+
+Builds synthetic banks from the catalog templates: 69 chapters x 120
+questions at scale 1, with pools growing linearly with the scale factor.
+Each stage is timed in a fresh worker process so that its peak RSS is its
+own. Results are written as JSON. --compare fails the run when a stage is
+slower than a previous result by more than --tolerance. Timings are only
+comparable on the same machine, so compare against a baseline recorded there;
+a baseline from another platform, CPU count or Python is reported with a
+warning.
+
+    python -m qbank.bench [--scales 1 10 100] [--out build/qbank/bench.json]
+                          [--compare baseline.json --tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from .catalog import load_catalog
+from .generate import generate_pool
+from .paths import BUILD_DIR, DIFFICULTIES, chapter_files
+from .xmlwriter import write_chapter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CHAPTERS = 69
+POOL_SIZE = 40
+DEFAULT_OUT = os.path.join(BUILD_DIR, "bench.json")
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def build_bank(out_dir, scale, seed=0):
+    """Write a synthetic bank of CHAPTERS chapters with POOL_SIZE * scale questions per pool."""
+    specs = load_catalog()
+    rng = random.Random(seed)
+    for n in range(CHAPTERS):
+        spec = specs[n % len(specs)]
+        pools = {d: generate_pool(spec, d, rng, POOL_SIZE * scale) for d in DIFFICULTIES}
+        write_chapter(os.path.join(out_dir, f"bench_{n:03d}.xml"), spec.subject, 1000 + n,
+                      spec.name, pools)
+
+
+# Stages run in a fresh process each and return the number of questions handled.
+# load parses the bank and fills the loader cache; later stages read from it.
+
+def stage_generate(bank_dir, scale):
+    build_bank(bank_dir, scale)
+    return CHAPTERS * len(DIFFICULTIES) * POOL_SIZE * scale
+
+
+def stage_parse_etree(bank_dir, scale):
+    return sum(len(ET.parse(f).getroot().findall(".//question")) for f in chapter_files(bank_dir))
+
+
+def stage_load(bank_dir, scale):
+    from .loader import iter_questions
+    return sum(1 for f in chapter_files(bank_dir) for _ in iter_questions(f))
+
+
+def stage_load_cached(bank_dir, scale):
+    return stage_load(bank_dir, scale)
+
+
+def stage_validate(bank_dir, scale):
+    from .validate import validate
+    return sum(sum(r["counts"].values()) for r in validate(chapter_files(bank_dir)))
+
+
+def stage_dedupe(bank_dir, scale):
+    from .dedupe import report
+    return sum(p["questions"] for p in report(chapter_files(bank_dir))["pools"].values())
+
+
+def stage_pack(bank_dir, scale):
+    from .pack import compile_pack
+    return compile_pack(chapter_files(bank_dir), os.path.join(bank_dir, "bench.qbpk"))[1]
+
+
+def stage_upload(bank_dir, scale):
+    from .backends import MemoryBackend
+    from .pack import PackReader
+    from .upload import pool_writes, upload
+    with PackReader(os.path.join(bank_dir, "bench.qbpk")) as reader:
+        writes = list(pool_writes(reader))
+    asyncio.run(upload(MemoryBackend(), writes))
+    return sum(len(w[3]["questions"]) for w in writes)
+
+
+STAGES = {
+    "generate": stage_generate,
+    "parse_etree": stage_parse_etree,
+    "load": stage_load,
+    "load_cached": stage_load_cached,
+    "validate": stage_validate,
+    "dedupe": stage_dedupe,
+    "pack": stage_pack,
+    "upload": stage_upload,
+}
+
+
+def _run_stage(name, bank_dir, scale):
+    from . import loader
+    # Keep the loader's record cache with the throwaway bank
+    loader.CACHE_DIR = os.path.join(bank_dir, ".cache")
+    start = time.perf_counter()
+    questions = STAGES[name](bank_dir, scale)
+    return time.perf_counter() - start, questions, _peak_rss_kb()
+
+
+def run(scales, stages=tuple(STAGES)):
+    results = []
+    for scale in scales:
+        bank_dir = tempfile.mkdtemp(prefix=f"qbank-bench-{scale}x-")
+        try:
+            for name in stages:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    seconds, questions, rss = pool.submit(_run_stage, name, bank_dir, scale).result()
+                results.append({
+                    "stage": name,
+                    "scale": scale,
+                    "questions": questions,
+                    "seconds": round(seconds, 4),
+                    "questions_per_second": round(questions / seconds) if seconds else None,
+                    "peak_rss_kb": rss,
+                })
+                print(f"{scale:>4}x {name:<16} {seconds * 1000:>9.0f} ms  {questions:>8} questions"
+                      + (f"  {rss / 1024:>7.1f} MiB" if rss else ""))
+        finally:
+            shutil.rmtree(bank_dir, ignore_errors=True)
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """(stage, scale, seconds, baseline seconds) for stages slower than baseline * (1 + tolerance)."""
+    before = {(r["stage"], r["scale"]): r["seconds"] for r in baseline["results"]}
+    slow = []
+    for r in results:
+        old = before.get((r["stage"], r["scale"]))
+        if old and r["seconds"] > old * (1 + tolerance):
+            slow.append((r["stage"], r["scale"], r["seconds"], old))
+    return slow
+
+
+def machine():
+    """Where a run was timed, as recorded in the results file."""
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the question-bank toolchain.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--stages", nargs="+", choices=tuple(STAGES), default=list(STAGES),
+                        help="generate always runs first; the other stages read its bank")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--compare", help="previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    stages = ["generate", *(s for s in STAGES if s in args.stages and s != "generate")]
+    if "load_cached" in stages and "load" not in stages:
+        stages.insert(stages.index("load_cached"), "load")
+    if "upload" in stages and "pack" not in stages:
+        stages.insert(stages.index("upload"), "pack")
+    results = run(args.scales, stages)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            **machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }, f, indent=1)
+    print(f"Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key, value in machine().items():
+            if baseline.get(key) != value:
+                print(f"[WARN] {args.compare} was recorded with {key} {baseline.get(key)!r}, this run has "
+                      f"{value!r}; its timings may not be comparable", file=sys.stderr)
+        slow = regressions(results, baseline, args.tolerance)
+        for stage, scale, seconds, old in slow:
+            print(f"[REGRESSION] {stage} @ {scale}x: {seconds:.3f}s vs {old:.3f}s", file=sys.stderr)
+        return 1 if slow else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
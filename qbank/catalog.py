@@ -0,0 +1,84 @@
+"""Declarative chapter catalog for generated question pools.
+
+Each qbank/catalog/*.json file describes one subject group: the subject name,
+the chapter id range it owns, question templates per difficulty and the
+chapters themselves (output file, id, name, topics).
+"""
+import glob
+import json
+import os
+from typing import NamedTuple
+
+from .paths import DIFFICULTIES
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog")
+
+
+class CatalogError(Exception):
+    pass
+
+
+class ChapterSpec(NamedTuple):
+    subject: str
+    file: str
+    id: int
+    name: str
+    topics: tuple
+    templates: dict  # difficulty -> ({"text", "answer", "explanation"}, ...)
+    option: str
+
+
+def catalog_files(catalog_dir=CATALOG_DIR):
+    return sorted(glob.glob(os.path.join(catalog_dir, "*.json")))
+
+
+def _load_group(path):
+    with open(path, encoding="utf-8") as f:
+        group = json.load(f)
+    name = os.path.basename(path)
+    for key in ("subject", "id_range", "templates", "chapters"):
+        if key not in group:
+            raise CatalogError(f"{name}: missing {key!r}")
+    for diff in DIFFICULTIES:
+        if not group["templates"].get(diff):
+            raise CatalogError(f"{name}: no {diff} templates")
+
+    low, high = group["id_range"]
+    templates = {d: tuple(group["templates"][d]) for d in DIFFICULTIES}
+    option = group.get("option", "Option {id} related to {topic}")
+    specs = []
+    for ch in group["chapters"]:
+        if not low <= ch["id"] <= high:
+            raise CatalogError(f"{name}: chapter {ch['id']} is outside id range {low}-{high}")
+        if not ch.get("topics"):
+            raise CatalogError(f"{name}: chapter {ch['id']} has no topics")
+        specs.append(ChapterSpec(group["subject"], ch["file"], ch["id"], ch["name"],
+                                 tuple(ch["topics"]), templates, option))
+    return specs
+
+
+def load_catalog(paths=None, subjects=None):
+    """ChapterSpecs from the given catalog files (default: all of them).
+
+    subjects optionally restricts the result to those subject names
+    (case-insensitive).
+    """
+    specs = []
+    for path in paths or catalog_files():
+        specs.extend(_load_group(path))
+
+    files = {}
+    ids = {}
+    for spec in specs:
+        key = (spec.subject.lower(), spec.id)
+        if spec.file in files:
+            raise CatalogError(f"{spec.file} is generated by both chapter {files[spec.file]} and {spec.id}")
+        if key in ids:
+            raise CatalogError(f"{spec.subject} chapter id {spec.id} is used by {ids[key]} and {spec.file}")
+        files[spec.file] = spec.id
+        ids[key] = spec.file
+
+    if subjects:
+        wanted = {s.lower() for s in subjects}
+        specs = [s for s in specs if s.subject.lower() in wanted]
+    return specs
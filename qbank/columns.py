@@ -0,0 +1,336 @@
+"""The whole bank as numpy columns, for bank-wide statistics in milliseconds.
+
+One row per question. Categorical fields are small integer codes into a
+vocabulary, and texts are kept only as lengths and 64-bit hashes:
+
+    subject       int8    code into bank.subjects
+    chapter_id    int32
+    difficulty    int8    index into DIFFICULTIES
+    topic         int32   code into bank.topics ("" for hand-written questions)
+    answer        int8    position of the correct option, -1 if the answer is not one of
+                          the first MAX_OPTIONS option ids
+    answer_id     int16   code into bank.answer_ids ("a", "b", ...)
+    n_options     int8
+    option_len    int32   (rows, MAX_OPTIONS) option text lengths, -1 past n_options
+    text_len      int32
+    text_hash     uint64  of the whitespace-normalized, lowercased question text
+    file          int16   code into bank.files
+
+Queries are masks over the columns, plus group counts by any mix of fields:
+
+    bank = Bank.build(chapter_files(RAW_DIR))
+    hard = bank.filter(subject="Physics", difficulty="hard")
+    labels, counts = hard.crosstab(("chapter_id",), "answer_id")
+
+Requires numpy.
+
+    python -m qbank.columns answers [--by pool] [--where subject=Physics]
+    python -m qbank.columns skew | dupes | summary
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .loader import SchemaError, iter_questions
+from .manifest import pool_doc_id
+from .paths import DIFFICULTIES, RAW_DIR, chapter_files
+
+MAX_OPTIONS = 6
+
+_SPACE = re.compile(r"\s+")
+
+
+def text_hash(text):
+    """64-bit hash of text with case and runs of whitespace ignored."""
+    normalized = _SPACE.sub(" ", text).strip().lower().encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(normalized, digest_size=8).digest(), "little")
+
+
+class _Vocab:
+    def __init__(self):
+        self.codes = {}
+
+    def __call__(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def values(self):
+        return list(self.codes)
+
+
+class Bank:
+    COLUMNS = ("subject", "chapter_id", "difficulty", "topic", "answer", "answer_id",
+               "n_options", "option_len", "text_len", "text_hash", "file")
+    VOCABS = {"subject": "subjects", "topic": "topics", "answer_id": "answer_ids", "file": "files"}
+
+    def __init__(self, columns, subjects, topics, answer_ids, files):
+        self.columns = columns
+        self.subjects = subjects
+        self.topics = topics
+        self.answer_ids = answer_ids
+        self.files = files
+
+    def __len__(self):
+        return len(self.columns["chapter_id"])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def build(cls, files, on_skip=None):
+        """Columns for every question in files. on_skip(path, message) hears about unreadable files."""
+        subjects, topics, answer_ids, file_names = _Vocab(), _Vocab(), _Vocab(), _Vocab()
+        rows = {name: [] for name in cls.COLUMNS if name != "option_len"}
+        option_len = []
+        for path in files:
+            try:
+                questions = list(iter_questions(path))
+            except (ET.ParseError, SchemaError, OSError) as e:
+                if on_skip:
+                    on_skip(path, str(e))
+                continue
+            file_code = file_names(os.path.basename(path))
+            for q in questions:
+                ids = [opt_id for opt_id, _ in q.options]
+                lengths = [len(text) for _, text in q.options[:MAX_OPTIONS]]
+                rows["subject"].append(subjects(q.subject))
+                rows["chapter_id"].append(q.chapter_id)
+                rows["difficulty"].append(DIFFICULTIES.index(q.difficulty))
+                rows["topic"].append(topics(q.topic))
+                answer = ids.index(q.answer) if q.answer in ids else -1
+                # option_len only holds MAX_OPTIONS options, so a later answer is marked unknown
+                rows["answer"].append(answer if answer < MAX_OPTIONS else -1)
+                rows["answer_id"].append(answer_ids(q.answer))
+                rows["n_options"].append(len(q.options))
+                option_len.append(lengths + [-1] * (MAX_OPTIONS - len(lengths)))
+                rows["text_len"].append(len(q.text))
+                rows["text_hash"].append(text_hash(q.text))
+                rows["file"].append(file_code)
+
+        dtypes = {"subject": np.int8, "chapter_id": np.int32, "difficulty": np.int8, "topic": np.int32,
+                  "answer": np.int8, "answer_id": np.int16, "n_options": np.int8, "text_len": np.int32,
+                  "text_hash": np.uint64, "file": np.int16}
+        columns = {name: np.array(values, dtype=dtypes[name]) for name, values in rows.items()}
+        columns["option_len"] = np.array(option_len, dtype=np.int32).reshape(-1, MAX_OPTIONS)
+        return cls(columns, subjects.values(), topics.values(), answer_ids.values(), file_names.values())
+
+    def save(self, path):
+        """Write the columns and vocabularies to an .npz file.
+
+        Vocabularies are fixed-width str arrays, so loading never needs pickle.
+        """
+        arrays = {f"column.{name}": col for name, col in self.columns.items()}
+        for name in self.VOCABS.values():
+            arrays[f"vocab.{name}"] = np.array(getattr(self, name), dtype=str)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[f"column.{name}"] for name in cls.COLUMNS}
+            vocabs = {name: data[f"vocab.{name}"].tolist() for name in cls.VOCABS.values()}
+        return cls(columns, **vocabs)
+
+    def _code(self, field, value):
+        """Column value for a user-facing value: a vocabulary code or a difficulty index."""
+        if field == "difficulty":
+            return DIFFICULTIES.index(value)
+        vocab = self.VOCABS.get(field)
+        if vocab:
+            values = getattr(self, vocab)
+            return values.index(value) if value in values else -1
+        return int(value)
+
+    def mask(self, **equals):
+        """Boolean mask of the rows whose fields equal the given values (lists mean any of)."""
+        keep = np.ones(len(self), dtype=bool)
+        for field, value in equals.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            keep &= np.isin(self.columns[field], [self._code(field, v) for v in values])
+        return keep
+
+    def take(self, rows):
+        """A Bank of the selected rows (a mask or indices), sharing the vocabularies."""
+        return Bank({name: col[rows] for name, col in self.columns.items()},
+                    self.subjects, self.topics, self.answer_ids, self.files)
+
+    def filter(self, **equals):
+        return self.take(self.mask(**equals))
+
+    def label(self, field, code):
+        """User-facing value of a column code."""
+        if field == "difficulty":
+            return DIFFICULTIES[code]
+        vocab = self.VOCABS.get(field)
+        return getattr(self, vocab)[code] if vocab else int(code)
+
+    def group(self, fields):
+        """(labels, inverse): one label tuple per distinct combination of fields, and each row's group."""
+        if not len(self):
+            return [], np.zeros(0, dtype=np.int64)
+        keys = np.stack([self.columns[f].astype(np.int64) for f in fields], axis=1)
+        distinct, inverse = np.unique(keys, axis=0, return_inverse=True)
+        labels = [tuple(self.label(f, code) for f, code in zip(fields, row)) for row in distinct]
+        return labels, inverse.reshape(-1)
+
+    def crosstab(self, fields, column):
+        """(row labels, column labels, counts) of column's values within each group of fields."""
+        labels, inverse = self.group(fields)
+        values, codes = np.unique(self.columns[column], return_inverse=True)
+        counts = np.zeros((len(labels), len(values)), dtype=np.int64)
+        np.add.at(counts, (inverse, codes.reshape(-1)), 1)
+        names = [self.label(column, v) for v in values]
+        order = sorted(range(len(names)), key=names.__getitem__)
+        return labels, [names[i] for i in order], counts[:, order]
+
+    def pool_ids(self, labels):
+        """Firestore pool ids for (subject, chapter_id, difficulty) labels."""
+        return [pool_doc_id(*label) for label in labels]
+
+    def longest_is_answer(self):
+        """Rows where the correct option is strictly the longest, a give-away for guessers."""
+        valid = self.answer >= 0
+        rows = np.arange(len(self))
+        answer_len = np.where(valid, self.option_len[rows, np.maximum(self.answer, 0)], -1)
+        others = self.option_len.copy()
+        others[rows[valid], self.answer[valid]] = -1
+        return valid & (answer_len > others.max(axis=1))
+
+    def option_skew(self):
+        """Length of the correct option over the mean length of the others, per row (nan if unknown)."""
+        valid = (self.answer >= 0) & (self.n_options > 1)
+        rows = np.arange(len(self))
+        lengths = np.where(self.option_len >= 0, self.option_len, 0).astype(np.float64)
+        answer_len = lengths[rows, np.maximum(self.answer, 0)]
+        others = (lengths.sum(axis=1) - answer_len) / np.maximum(self.n_options - 1, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(valid & (others > 0), answer_len / others, np.nan)
+
+    def duplicate_groups(self):
+        """Index arrays of the rows sharing a normalized question text, largest first."""
+        order = np.argsort(self.text_hash, kind="stable")
+        hashes = self.text_hash[order]
+        starts = np.flatnonzero(np.concatenate(([True], hashes[1:] != hashes[:-1])))
+        sizes = np.diff(np.append(starts, len(hashes)))
+        groups = [order[s:s + n] for s, n in zip(starts, sizes) if n > 1]
+        return sorted(groups, key=len, reverse=True)
+
+
+GROUPINGS = {
+    "pool": ("subject", "chapter_id", "difficulty"),
+    "chapter": ("subject", "chapter_id"),
+    "subject": ("subject",),
+    "difficulty": ("difficulty",),
+    "topic": ("topic",),
+}
+
+
+def _where(pairs):
+    equals = {}
+    for pair in pairs or ():
+        field, _, value = pair.partition("=")
+        if field not in Bank.COLUMNS:
+            raise SystemExit(f"unknown column {field!r}")
+        if field == "difficulty" and value not in DIFFICULTIES:
+            raise SystemExit(f"unknown difficulty {value!r}, expected one of {', '.join(DIFFICULTIES)}")
+        if field != "difficulty" and field not in Bank.VOCABS:
+            try:
+                int(value)
+            except ValueError:
+                raise SystemExit(f"{field} must be an integer, not {value!r}") from None
+        equals.setdefault(field, []).append(value)
+    return equals
+
+
+def _report_answers(bank, by):
+    labels, values, counts = bank.crosstab(GROUPINGS[by], "answer_id")
+    print(f"{by:<32} " + " ".join(f"{v:>6}" for v in values) + "   top share")
+    share = counts.max(axis=1) / np.maximum(counts.sum(axis=1), 1)
+    for i in np.argsort(-share, kind="stable"):
+        name = bank.pool_ids([labels[i]])[0] if by == "pool" else "/".join(map(str, labels[i]))
+        print(f"{name:<32} " + " ".join(f"{c:>6}" for c in counts[i]) + f"   {share[i]:.0%}")
+
+
+def _report_skew(bank, by):
+    labels, inverse = bank.group(GROUPINGS[by])
+    longest = np.bincount(inverse, bank.longest_is_answer(), len(labels))
+    skew = bank.option_skew()
+    known = ~np.isnan(skew)
+    mean_skew = np.bincount(inverse[known], skew[known], len(labels)) / np.maximum(
+        np.bincount(inverse[known], minlength=len(labels)), 1)
+    sizes = np.bincount(inverse, minlength=len(labels))
+    print(f"{by:<32} {'questions':>9} {'longest=answer':>15} {'answer/other length':>20}")
+    for i in np.argsort(-longest / np.maximum(sizes, 1), kind="stable"):
+        name = bank.pool_ids([labels[i]])[0] if by == "pool" else "/".join(map(str, labels[i]))
+        print(f"{name:<32} {sizes[i]:>9} {longest[i] / max(sizes[i], 1):>15.0%} {mean_skew[i]:>20.2f}")
+
+
+def _report_dupes(bank, by):
+    groups = bank.duplicate_groups()
+    print(f"{sum(len(g) for g in groups)} questions share their text with another ({len(groups)} texts)")
+    for rows in groups[:20]:
+        places = sorted({f"{bank.files[bank.file[r]]}:{bank.label('difficulty', bank.difficulty[r])}"
+                         for r in rows})
+        print(f"  x{len(rows)}  " + ", ".join(places))
+
+
+def _report_summary(bank, by):
+    labels, inverse = bank.group(GROUPINGS[by])
+    sizes = np.bincount(inverse, minlength=len(labels))
+    text_len = np.bincount(inverse, bank.text_len, len(labels)) / np.maximum(sizes, 1)
+    topics = bank.crosstab(GROUPINGS[by], "topic")[2]
+    print(f"{by:<32} {'questions':>9} {'mean text':>10} {'topics':>7}")
+    for i in range(len(labels)):
+        name = bank.pool_ids([labels[i]])[0] if by == "pool" else "/".join(map(str, labels[i]))
+        print(f"{name:<32} {sizes[i]:>9} {text_len[i]:>10.0f} {np.count_nonzero(topics[i]):>7}")
+
+
+REPORTS = {"answers": _report_answers, "skew": _report_skew, "dupes": _report_dupes, "summary": _report_summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bank-wide statistics over columnar questions.")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--by", choices=sorted(GROUPINGS), default="subject")
+    parser.add_argument("--where", action="append", metavar="COLUMN=VALUE",
+                        help="keep rows where COLUMN equals VALUE; repeatable")
+    parser.add_argument("--columns", help="read columns from this .npz instead of the XML")
+    parser.add_argument("--save", help="write the columns to this .npz")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.columns:
+        try:
+            bank = Bank.load(args.columns)
+        except ValueError as e:
+            # Files saved before the vocabularies were str arrays need pickle; rebuild them
+            print(f"ERROR: {args.columns}: {e} (re-save it with --save)", file=sys.stderr)
+            return 1
+    else:
+        bank = Bank.build(chapter_files(args.raw_dir),
+                          on_skip=lambda path, err: print(f"[SKIPPED] {path}: {err}", file=sys.stderr))
+    loaded = time.perf_counter()
+    if args.save:
+        bank.save(args.save)
+    total = len(bank)
+    bank = bank.filter(**_where(args.where))
+    REPORTS[args.report](bank, args.by)
+    print(f"{len(bank)} of {total} questions, loaded in {(loaded - start) * 1000:.0f} ms, "
+          f"queried in {(time.perf_counter() - loaded) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Near-duplicate detection across the question bank.
+
+Every question (text plus option texts) is reduced to word 3-gram shingles
+and a MinHash signature. Signatures are bucketed with LSH banding, so only
+questions that share a band are ever compared. Work grows linearly with the
+bank instead of with the number of pairs. Matches are merged into duplicate
+clusters, reported per pool and across chapters.
+
+Requires numpy.
+
+    python -m qbank.dedupe [--threshold 0.8] [--min-unique 0.9] [--json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from .loader import iter_questions
+from .paths import RAW_DIR, chapter_files
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+CHUNK = 1024  # questions per signature batch; bounds the temporary hash matrix
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(0x51B)
+# a * h stays below 2**63 for 32-bit shingle hashes, so nothing overflows
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text):
+    """32-bit hashes of the word 3-grams of text (lowercased)."""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+def question_text(q):
+    return " ".join([q.text, *(text for _, text in q.options)])
+
+
+def signatures(texts):
+    """MinHash signature matrix, one uint64 row of NUM_PERM values per text."""
+    out = np.empty((len(texts), NUM_PERM), dtype=np.uint64)
+    for start in range(0, len(texts), CHUNK):
+        batch = [sorted(shingles(t)) for t in texts[start:start + CHUNK]]
+        lengths = np.fromiter((len(s) for s in batch), dtype=np.int64, count=len(batch))
+        hashes = np.fromiter((h for s in batch for h in s), dtype=np.uint64, count=int(lengths.sum()))
+        permuted = (hashes[:, None] * _A + _B) % _PRIME
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        out[start:start + len(batch)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return out
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def clusters(sigs, threshold=0.8):
+    """Groups of row indices whose estimated Jaccard similarity is >= threshold.
+
+    Each LSH bucket is checked against its first member only, which keeps a
+    bucket of thousands of identical questions linear rather than quadratic.
+    """
+    n = len(sigs)
+    uf = _UnionFind(n)
+    for band in range(BANDS):
+        block = np.ascontiguousarray(sigs[:, band * ROWS:(band + 1) * ROWS])
+        buckets = defaultdict(list)
+        for i, key in enumerate(block.view(f"V{ROWS * 8}").ravel().tolist()):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            anchor = members[0]
+            rest = np.array(members[1:])
+            similar = (sigs[rest] == sigs[anchor]).mean(axis=1) >= threshold
+            for i in rest[similar].tolist():
+                uf.union(anchor, i)
+
+    groups = defaultdict(list)
+    for i in range(n):
+        groups[uf.find(i)].append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def load_bank(files):
+    """(refs, texts, errors): refs are (file, difficulty, 1-based position in pool)."""
+    refs, texts, errors = [], [], {}
+    for path in files:
+        name = os.path.basename(path)
+        counts = defaultdict(int)
+        try:
+            for q in iter_questions(path):
+                counts[q.difficulty] += 1
+                refs.append((name, q.difficulty, counts[q.difficulty]))
+                texts.append(question_text(q))
+        except (ET.ParseError, ValueError) as e:
+            errors[name] = str(e)
+    return refs, texts, errors
+
+
+def report(files, threshold=0.8):
+    """Duplicate report for files: per-pool unique ratios and duplicate clusters."""
+    refs, texts, errors = load_bank(files)
+    groups = clusters(signatures(texts), threshold) if texts else []
+
+    pools = defaultdict(lambda: {"questions": 0, "unique": 0, "clusters": []})
+    for name, diff, _ in refs:
+        pools[(name, diff)]["questions"] += 1
+
+    cross_chapter = []
+    for g in groups:
+        by_pool = defaultdict(list)
+        for i in g:
+            by_pool[refs[i][:2]].append(refs[i][2])
+        for key, positions in by_pool.items():
+            if len(positions) > 1:
+                pools[key]["clusters"].append(positions)
+        if len({refs[i][0] for i in g}) > 1:
+            cross_chapter.append([f"{refs[i][0]}:{refs[i][1]}#{refs[i][2]}" for i in g])
+
+    # A pool's unique count is its non-duplicated questions plus one per cluster
+    for key, pool in pools.items():
+        pool["unique"] = pool["questions"] - sum(len(c) - 1 for c in pool["clusters"])
+
+    return {
+        "pools": {
+            f"{name}:{diff}": dict(pool, ratio=round(pool["unique"] / pool["questions"], 4))
+            for (name, diff), pool in sorted(pools.items())
+        },
+        "cross_chapter": cross_chapter,
+        "errors": errors,
+    }
+
+
+def low_unique_pools(rep, min_unique):
+    """Pools whose unique-question ratio is below min_unique."""
+    return {key: pool for key, pool in rep["pools"].items() if pool["ratio"] < min_unique}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions in the bank.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="estimated Jaccard similarity at which two questions are duplicates")
+    parser.add_argument("--min-unique", type=float, default=None,
+                        help="exit non-zero when a pool's unique ratio is below this")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rep = report(chapter_files(args.raw_dir), args.threshold)
+    elapsed = time.perf_counter() - start
+    low = low_unique_pools(rep, args.min_unique) if args.min_unique is not None else {}
+
+    if args.json:
+        json.dump(dict(rep, seconds=round(elapsed, 4)), sys.stdout, indent=1)
+        print()
+        return 1 if low else 0
+
+    for key, pool in rep["pools"].items():
+        if not pool["clusters"]:
+            continue
+        flag = "LOW" if key in low else "DUP"
+        print(f"[{flag}] {key}: {pool['unique']}/{pool['questions']} unique, "
+              f"{len(pool['clusters'])} duplicate clusters")
+    if rep["cross_chapter"]:
+        print(f"\n{len(rep['cross_chapter'])} clusters span more than one chapter:")
+        for group in rep["cross_chapter"][:20]:
+            print("    " + ", ".join(group))
+    for name, err in sorted(rep["errors"].items()):
+        print(f"[SKIPPED] {name}: {err}", file=sys.stderr)
+
+    total = sum(p["questions"] for p in rep["pools"].values())
+    unique = sum(p["unique"] for p in rep["pools"].values())
+    print(f"\n{unique}/{total} questions unique within their pool in {elapsed * 1000:.0f} ms")
+    return 1 if low else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Export the bank to every consumer from one parse.
+
+Each chapter is parsed once and handed to every selected writer. Each writer
+runs on its own thread behind a small queue, so slow disk writes overlap with
+parsing and with each other. All targets see the same snapshot of the bank,
+so they cannot drift apart.
+
+    pooled   question_pools documents keyed {subject}_{chapterId}_{difficulty},
+             the list uploadQuestions.js reads (build/qbank/pools.json)
+    flat     admin-panel documents: one per question, with a capitalized
+             difficulty, option texts, the correct answer's text and isActive,
+             keyed by question id (build/qbank/flat_questions.json)
+    shards   the app's offline shards, .json and .json.gz (student-app/public/data/shards)
+
+The Android app gets the shards from the web build: `npm run build` copies
+public/data into dist, and `npx cap sync` copies dist into the Android assets,
+so export (or `npm run build:data`) before building and syncing.
+
+    python -m qbank.export [--targets pooled flat shards] [--raw-dir DIR]
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from .loader import POOLS_JSON, load_chapter, question_problems
+from .manifest import question_ids
+from .paths import BUILD_DIR, DIFFICULTIES, RAW_DIR, chapter_files
+from .shards import DEFAULT_OUT as SHARDS_OUT, ShardWriter
+from .upload import pool_document
+
+FLAT_JSON = os.path.join(BUILD_DIR, "flat_questions.json")
+QUEUE_SIZE = 8  # chapters a writer may fall behind the parser
+
+# Bank subject -> admin panel subject, as migrateXmlToFirestore.js resolves it
+FLAT_SUBJECTS = {"Physics": "Physics", "Chemistry": "Chemistry", "Mathematics": "Maths"}
+# Admin panel subject -> app subject code, as SUBJECT_CODE_TO_NAME in gameLogic.js
+APP_CODES = {"Physics": "phy", "Chemistry": "chem", "Maths": "math", "Biology": "bio", "Zoology": "zoo"}
+
+
+def flat_subject(subject, chapter_id):
+    if subject == "Biology":
+        return "Biology" if chapter_id >= 310 else "Zoology"
+    return FLAT_SUBJECTS.get(subject, subject)
+
+
+def app_subject(subject, chapter_id):
+    """(app subject code or None, admin panel subject) of a bank chapter."""
+    name = flat_subject(subject, chapter_id)
+    return APP_CODES.get(name), name
+
+
+def bank_subject(code, chapter_id):
+    """Bank subject of a chapter the app knows by subject code; the inverse of app_subject."""
+    name = next((name for name, c in APP_CODES.items() if c == code), None)
+    if name == "Zoology":
+        # Class 11 zoology chapters are Biology in the bank, class 12 ones Zoology
+        return "Biology" if chapter_id < 310 else "Zoology"
+    bank = {flat: subject for subject, flat in FLAT_SUBJECTS.items()}
+    return bank.get(name, name or code)
+
+
+def flat_documents(chapter):
+    """(doc_id, doc) for every valid question of chapter in the admin panel schema."""
+    subject = flat_subject(chapter.subject, chapter.chapter_id)
+    for diff in DIFFICULTIES:
+        questions = chapter.pools[diff]
+        for qid, q in zip(question_ids(questions), questions):
+            if question_problems(q):
+                continue
+            doc = {
+                "subject": subject,
+                "chapterId": chapter.chapter_id,
+                "difficulty": diff.capitalize(),
+                "question": q.text,
+                "options": [text for _, text in q.options],
+                "correctAnswer": dict(q.options)[q.answer],
+                "isActive": True,
+            }
+            if q.explanation:
+                doc["explanation"] = q.explanation
+            yield qid, doc
+
+
+class JsonStream:
+    """A JSON array (or object, with keyed=True) written item by item, then moved into place."""
+
+    def __init__(self, path, keyed=False):
+        self.path = path
+        self.keyed = keyed
+        self.count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp = path + ".tmp"
+        self._f = open(self._tmp, "w", encoding="utf-8")
+        self._f.write("{" if keyed else "[")
+
+    def add(self, item, key=None):
+        if self.count:
+            self._f.write(", ")
+        if self.keyed:
+            self._f.write(json.dumps(key) + ": ")
+        json.dump(item, self._f, ensure_ascii=False)
+        self.count += 1
+
+    def close(self):
+        self._f.write("}" if self.keyed else "]")
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return os.path.getsize(self.path)
+
+
+class PooledWriter:
+    def __init__(self, path=POOLS_JSON):
+        self.out = JsonStream(path)
+
+    def add(self, chapter):
+        for diff, questions in chapter.pools.items():
+            if questions:
+                self.out.add(pool_document(chapter.subject, chapter.chapter_id, diff, questions))
+
+    def finish(self):
+        size = self.out.close()
+        return f"{self.out.count} pool documents, {size / 1024:.0f} KiB in {self.out.path}"
+
+
+class FlatWriter:
+    def __init__(self, path=FLAT_JSON):
+        self.out = JsonStream(path, keyed=True)
+
+    def add(self, chapter):
+        for doc_id, doc in flat_documents(chapter):
+            self.out.add(doc, doc_id)
+
+    def finish(self):
+        size = self.out.close()
+        return f"{self.out.count} question documents, {size / 1024:.0f} KiB in {self.out.path}"
+
+
+class ShardTarget:
+    def __init__(self, out_dir):
+        self.writer = ShardWriter(out_dir)
+
+    def add(self, chapter):
+        self.writer.add(chapter)
+
+    def finish(self):
+        shards, written, removed = self.writer.finish()
+        return f"{shards} shards in {self.writer.out_dir}: {written} files written, {removed} removed"
+
+
+TARGETS = {
+    "pooled": lambda args: PooledWriter(args.pools_out),
+    "flat": lambda args: FlatWriter(args.flat_out),
+    "shards": lambda args: ShardTarget(args.shards_out),
+}
+
+
+class _Worker(threading.Thread):
+    """Feeds one writer from its queue; None ends the stream."""
+
+    def __init__(self, name, writer):
+        super().__init__(name=f"export-{name}", daemon=True)
+        self.writer = writer
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.summary = None
+        self.error = None
+
+    def run(self):
+        chapter = False
+        try:
+            while (chapter := self.queue.get()) is not None:
+                self.writer.add(chapter)
+            self.summary = self.writer.finish()
+        except Exception as e:
+            self.error = e
+            # Keep draining so the parser never blocks on a dead writer
+            while chapter is not None:
+                chapter = self.queue.get()
+
+    def put(self, chapter):
+        self.queue.put(chapter)
+
+
+def export(files, writers, on_skip=None):
+    """Parse files once and feed every chapter to each writer. Returns {name: summary or exception}."""
+    workers = {name: _Worker(name, writer) for name, writer in writers.items()}
+    for worker in workers.values():
+        worker.start()
+    for path in files:
+        try:
+            chapter = load_chapter(path)
+        except (ET.ParseError, ValueError) as e:
+            if on_skip:
+                on_skip(path, e)
+            continue
+        for worker in workers.values():
+            worker.put(chapter)
+    for worker in workers.values():
+        worker.put(None)
+    for worker in workers.values():
+        worker.join()
+    return {name: worker.error or worker.summary for name, worker in workers.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the bank to every target from one parse.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=list(TARGETS))
+    parser.add_argument("--pools-out", default=POOLS_JSON)
+    parser.add_argument("--flat-out", default=FLAT_JSON)
+    parser.add_argument("--shards-out", default=SHARDS_OUT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    writers = {name: TARGETS[name](args) for name in args.targets}
+    results = export(chapter_files(args.raw_dir), writers,
+                     on_skip=lambda path, e: print(f"[SKIPPED] {os.path.basename(path)}: {e}",
+                                                   file=sys.stderr))
+    failed = 0
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            print(f"[ERROR] {name}: {result}", file=sys.stderr)
+            failed += 1
+        else:
+            print(f"{name}: {result}")
+    print(f"Exported to {len(results) - failed} of {len(results)} targets "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Generate question pools for every chapter in the catalog.
+
+Chapters are generated in parallel on a process pool. A pool is a pure
+function of its inputs: the chapter spec, the difficulty, the pool size, the
+templates and the run seed. Each pool's RNG is seeded from a hash of those
+inputs, and the hashes are kept in the build manifest. A chapter is only
+regenerated when one of its pool input hashes changes, and pools that did not
+change come out byte-for-byte identical, so they stay out of the pool diff.
+Topics with a formula in qbank.numeric get real numeric questions.
+
+Requires numpy.
+
+    python -m qbank.generate [--out DIR] [--subject Physics] [--workers N]
+                             [--seed N] [--count 40] [--force] [--trace [DIR]]
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import manifest as mf
+from . import numeric
+from . import trace
+from .catalog import CatalogError, load_catalog
+from .loader import read_header
+from .paths import DIFFICULTIES, RAW_DIR, chapter_files
+from .validate import check_file
+from .xmlwriter import write_chapter
+
+# Bump when the way questions are produced from a spec changes, qbank.numeric included
+ENGINE_VERSION = 3
+
+# Written at the top of every generated file; files without it are hand-written
+GENERATED_MARKER = "Generated by qbank.generate from qbank/catalog. Do not edit by hand."
+
+
+def is_generated(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return GENERATED_MARKER in f.read(512)
+
+
+def _existing_ids(out_dir, skip):
+    """(subject, id) -> file for chapters in out_dir that are not in skip."""
+    ids = {}
+    for path in chapter_files(out_dir):
+        if os.path.basename(path) in skip:
+            continue
+        try:
+            subject, chapter_id, _ = read_header(path)
+        except (ET.ParseError, ValueError):
+            continue
+        if chapter_id is not None:
+            ids[(subject.lower(), chapter_id)] = os.path.basename(path)
+    return ids
+
+
+def pool_inputs_hash(spec, difficulty, count, seed):
+    payload = json.dumps(
+        [ENGINE_VERSION, spec.subject, spec.id, spec.name, spec.topics,
+         spec.templates[difficulty], spec.option, difficulty, count, seed],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generate_pool(spec, difficulty, rng, count):
+    """Yield (text, options, answer, explanation, topic) for one pool.
+
+    Topics with a formula in qbank.numeric get computed numeric questions, made
+    in one batch per topic; every other topic fills the catalog templates.
+    """
+    templates = spec.templates[difficulty]
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    topics = [rng.choice(spec.topics) for _ in range(count)]
+    wanted = Counter(t for t in topics if t in numeric.TOPICS)
+    batches = {t: iter(numeric.items(t, difficulty, n, np_rng)) for t, n in sorted(wanted.items())}
+    for topic in topics:
+        if topic in batches:
+            yield next(batches[topic])
+            continue
+        tpl = rng.choice(templates) if len(templates) > 1 else templates[0]
+        options = [(opt, spec.option.format(id=opt, topic=topic)) for opt in "ABCD"]
+        yield (
+            tpl["text"].format(topic=topic),
+            options,
+            tpl["answer"],
+            tpl["explanation"].format(topic=topic),
+            topic,
+        )
+
+
+def generate_chapter(spec, out_dir, inputs, count):
+    """Write, validate and hash one chapter file. Runs in a worker process.
+
+    Returns (errors, manifest entry).
+    """
+    path = os.path.join(out_dir, spec.file)
+    with trace.span("chapter", file=spec.file, questions=count * len(DIFFICULTIES)):
+        pools = {
+            d: trace.iterate("generate", generate_pool(spec, d, random.Random(int(inputs[d][:16], 16)), count),
+                             unit="questions", difficulty=d)
+            for d in DIFFICULTIES
+        }
+        write_chapter(path, spec.subject, spec.id, spec.name, pools, GENERATED_MARKER)
+        trace.count("questions_generated", count * len(DIFFICULTIES))
+        errors = check_file(path)["errors"]
+        if errors:
+            return errors, None
+        with trace.span("scan"):
+            entry = mf.scan_file(path)
+    entry["inputs"] = inputs
+    return [], entry
+
+
+def generate(specs, out_dir=RAW_DIR, count=40, seed=0, workers=None, force=False,
+             manifest_path=mf.MANIFEST_PATH, diff_path=mf.DIFF_PATH):
+    """Generate the chapters in specs whose inputs changed. Returns (rebuilt, diff, errors)."""
+    manifest = mf.load_manifest(manifest_path)
+    chapters = manifest["chapters"]
+    taken = _existing_ids(out_dir, {spec.file for spec in specs}) if os.path.isdir(out_dir) else {}
+    jobs = []
+    errors = {}
+    for spec in specs:
+        path = os.path.join(out_dir, spec.file)
+        other = taken.get((spec.subject.lower(), spec.id))
+        if other:
+            # Both would upload to the same question_pools documents
+            errors[spec.file] = f"{spec.subject} chapter id {spec.id} is already used by {other}"
+            continue
+        inputs = {d: pool_inputs_hash(spec, d, count, seed) for d in DIFFICULTIES}
+        if os.path.exists(path) and not force:
+            if not is_generated(path):
+                errors[spec.file] = "exists and was not generated; rename it or pass --force"
+                continue
+            entry = chapters.get(spec.file)
+            if entry and entry.get("inputs") == inputs:
+                continue
+        jobs.append((spec, inputs))
+
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1 or len(jobs) < 2:
+        results = [generate_chapter(spec, out_dir, inputs, count) for spec, inputs in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(trace.remote(generate_chapter), spec, out_dir, inputs, count)
+                       for spec, inputs in jobs]
+            results = [trace.collect(f.result()) for f in futures]
+
+    rebuilt = []
+    new = dict(manifest, chapters=dict(chapters))
+    for (spec, _), (file_errors, entry) in zip(jobs, results):
+        if file_errors:
+            errors[spec.file] = file_errors[0]
+            continue
+        new["chapters"][spec.file] = entry
+        rebuilt.append(spec.file)
+
+    diff = mf.diff_manifests(manifest, new)
+    mf.save_manifest(new, manifest_path)
+    if diff["upsert"] or diff["delete"]:
+        mf.write_pending_diff(diff, diff_path, bank=mf.manifest_bank_hash(new))
+    return rebuilt, diff, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate question pools from the chapter catalog.")
+    parser.add_argument("--catalog", nargs="*", help="catalog JSON files (default: qbank/catalog/*.json)")
+    parser.add_argument("--subject", action="append", help="only generate this subject (repeatable)")
+    parser.add_argument("--out", default=RAW_DIR, help="output directory for chapter files")
+    parser.add_argument("--count", type=int, default=40, help="questions per pool")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--manifest", default=mf.MANIFEST_PATH)
+    parser.add_argument("--force", action="store_true", help="regenerate and overwrite every chapter")
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with trace.run("generate", args):
+        try:
+            with trace.span("catalog.load") as attrs:
+                specs = load_catalog(args.catalog, args.subject)
+                attrs["chapters"] = len(specs)
+        except CatalogError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+
+        start = time.perf_counter()
+        rebuilt, diff, errors = generate(specs, args.out, args.count, args.seed, args.workers,
+                                         args.force, args.manifest)
+        elapsed = time.perf_counter() - start
+
+    for name in rebuilt:
+        print(f"Populated {name}")
+    for name, err in sorted(errors.items()):
+        print(f"[ERROR] {name}: {err}", file=sys.stderr)
+    print(f"{len(rebuilt)} of {len(specs)} chapters rebuilt, {len(diff['upsert'])} pools changed "
+          f"in {elapsed * 1000:.0f} ms")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
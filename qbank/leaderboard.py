@@ -0,0 +1,191 @@
+"""Aggregate user XP into a leaderboard snapshot document.
+
+getGlobalRank used to read the whole users collection, plus a second
+`stats.xp > xp` query, every time a profile opened. This job streams every
+user once and publishes leaderboard/global. The snapshot is a sorted XP
+histogram:
+
+    {"version": 1, "generatedAt": "...", "bucketWidth": 1,
+     "edges": [0, 10, 25, ...],                 ascending bucket lower bounds
+     "streams": {"all":  {"total": 1200, "above": [1180, 1100, ...]},
+                 "JEE":  {...}, "NEET": {...}}}
+
+above[i] is the number of users in buckets after bucket i, so a rank is a
+binary search over edges plus one lookup. Buckets are exact XP values until
+there are more than --max-buckets of them. Past that, the width doubles until
+they fit, and ranks inside a bucket are interpolated.
+
+Users are read from an export file (JSON lines, a JSON array, or an object
+keyed by uid) or from any backend in qbank.backends:
+
+    python -m qbank.leaderboard --input users.jsonl --backend file --target build/qbank/emulator
+    python -m qbank.leaderboard --source file --source-target build/qbank/emulator --out board.json
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import sys
+import time
+from collections import Counter
+
+from .backends import make_backend
+
+COLLECTION = "leaderboard"
+DOC_ID = "global"
+USERS = "users"
+STREAMS = ("JEE", "NEET")
+MAX_BUCKETS = 4096
+SNAPSHOT_VERSION = 1
+
+
+def user_xp(data):
+    """(xp, stream) of a user document; a missing or malformed xp counts as 0.
+
+    XP is awarded in whole points, so a float xp (as Firestore may return one)
+    is truncated to an int and counted in that integer's bucket.
+    """
+    xp = (data.get("stats") or {}).get("xp", 0)
+    if isinstance(xp, bool) or not isinstance(xp, (int, float)) or xp < 0:
+        xp = 0
+    stream = str(data.get("stream") or "").upper()
+    return int(xp), stream if stream in STREAMS else None
+
+
+class Tally:
+    """Exact XP counts per stream, fed one user at a time."""
+
+    def __init__(self):
+        self.counts = {"all": Counter(), **{s: Counter() for s in STREAMS}}
+        self.users = 0
+
+    def add(self, data):
+        xp, stream = user_xp(data)
+        self.counts["all"][xp] += 1
+        if stream:
+            self.counts[stream][xp] += 1
+        self.users += 1
+
+
+def iter_export(path):
+    """User documents from an export file: JSON lines (.jsonl), a JSON array or {uid: doc}."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from data.values() if isinstance(data, dict) else data
+
+
+def snapshot(tally, max_buckets=MAX_BUCKETS):
+    """The leaderboard document for a tally, in at most max_buckets buckets."""
+    if max_buckets < 1:
+        raise ValueError(f"max_buckets must be at least 1, not {max_buckets}")
+    width = 1
+    while len({xp // width for xp in tally.counts["all"]}) > max_buckets:
+        width *= 2
+    edges = sorted({xp // width * width for xp in tally.counts["all"]})
+    position = {edge: i for i, edge in enumerate(edges)}
+
+    streams = {}
+    for name, counts in tally.counts.items():
+        per_bucket = [0] * len(edges)
+        for xp, n in counts.items():
+            per_bucket[position[xp // width * width]] += n
+        above, running = [0] * len(edges), 0
+        for i in range(len(edges) - 1, -1, -1):
+            above[i] = running
+            running += per_bucket[i]
+        streams[name] = {"total": running, "above": above}
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "bucketWidth": width,
+        "edges": edges,
+        "streams": streams,
+    }
+
+
+def rank(doc, xp, stream="all"):
+    """(rank, total, percentile) for xp, as getGlobalRank computes them."""
+    board = doc["streams"].get(stream) or doc["streams"]["all"]
+    xp = int(xp)  # bucketed as user_xp does
+    total, above, edges, width = board["total"], board["above"], doc["edges"], doc["bucketWidth"]
+    i = bisect.bisect_right(edges, xp) - 1
+    if i < 0:
+        higher = total
+    else:
+        higher = above[i]
+        if xp < edges[i] + width - 1:
+            # Assume users are spread evenly across the bucket
+            in_bucket = (above[i - 1] if i else total) - above[i]
+            higher += round(in_bucket * (edges[i] + width - 1 - xp) / width)
+    position = higher + 1
+    total = max(total, 1)
+    percentile = max(1, min(100, round((total - position + 1) / total * 100)))
+    return position, total, percentile
+
+
+async def collect(source, tally):
+    async for _, data in source.stream(USERS):
+        tally.add(data or {})
+
+
+async def _main(args):
+    tally = Tally()
+    start = time.perf_counter()
+    if args.input:
+        for data in iter_export(args.input):
+            tally.add(data)
+    else:
+        source = make_backend(args.source, args.source_target)
+        try:
+            await collect(source, tally)
+        finally:
+            await source.close()
+
+    doc = snapshot(tally, args.max_buckets)
+    size = len(json.dumps(doc, separators=(",", ":")))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, separators=(",", ":"))
+    if args.backend:
+        backend = make_backend(args.backend, args.target)
+        try:
+            await backend.commit([("set", COLLECTION, DOC_ID, doc)])
+        finally:
+            await backend.close()
+
+    counts = ", ".join(f"{s} {doc['streams'][s]['total']}" for s in STREAMS)
+    elapsed = time.perf_counter() - start
+    print(f"{tally.users} users ({counts}) in {len(doc['edges'])} buckets of width "
+          f"{doc['bucketWidth']}, {size / 1024:.1f} KiB, in {elapsed * 1000:.0f} ms")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish a bucketed XP leaderboard snapshot.")
+    parser.add_argument("--input", help="export file of user documents (.jsonl or .json)")
+    parser.add_argument("--source", choices=("memory", "file", "firestore"), default="file",
+                        help="backend to stream users from when there is no --input")
+    parser.add_argument("--source-target", help="directory or project id of the source backend")
+    parser.add_argument("--backend", choices=("memory", "file", "firestore"),
+                        help="where to publish leaderboard/global")
+    parser.add_argument("--target", help="directory or project id of the publishing backend")
+    parser.add_argument("--out", help="also write the snapshot document to this file")
+    parser.add_argument("--max-buckets", type=int, default=MAX_BUCKETS)
+    args = parser.parse_args(argv)
+    if not args.input and args.source == "file" and not args.source_target:
+        parser.error("give --input, or --source-target for the file source")
+    if args.backend == "file" and not args.target:
+        parser.error("--target is required for the file backend")
+    if args.max_buckets < 1:
+        parser.error("--max-buckets must be at least 1")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
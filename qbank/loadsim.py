@@ -0,0 +1,326 @@
+"""Load-test the app's quiz traffic against an in-memory Firestore stand-in.
+
+Every simulated student runs quizzes the way App.jsx does:
+
+    start   startTestSession's fallback chain. Layer 1 is the flat
+            question_pools query, Layer 2 the pooled {code}_{chapterId}_{difficulty}
+            document, Layer 3 the static shard fetch and Layer 4 the local mock
+    finish  the three writes fired when a quiz ends: saveQuizResult,
+            updateUserStats and saveChapterProgress
+
+Pools come from the real bank. --layer picks the first layer that holds
+questions, so `--layer 3` models a Firestore without any question data.
+
+The stand-in bills the way Firestore does. A query costs one read per
+document returned, or one read if it returns nothing. Every written field
+updates its automatic index entries: two per scalar and one per array
+element. Round trips take a lognormal latency and share --capacity server
+slots, so queueing shows up at peak load. Write amplification is documents
+plus index entries written, per document the app asked to write.
+
+--coalesce sends the three quiz-end writes as one batch. That lets a change
+be measured against the baseline before it ships.
+
+    python -m qbank.loadsim --students 5000 --quizzes 2 [--layer 2] [--coalesce]
+                            [--latency 0.03] [--capacity 500] [--json build/qbank/loadsim.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from .backends import MemoryBackend, TransientError
+from .export import app_subject
+from .loader import load_chapter
+from .paths import DIFFICULTIES, RAW_DIR, chapter_files
+from .upload import pool_document
+
+POOLS = "question_pools"
+SESSION_SIZE = 25
+
+FLAT_FIELDS = ("subject", "chapterId", "difficulty", "isActive")
+
+
+def index_entries(data):
+    """Automatic single-field index entries Firestore updates when data is written."""
+    total = 0
+    for value in data.values():
+        if isinstance(value, dict):
+            total += index_entries(value)
+        elif isinstance(value, list):
+            total += len(value)
+        else:
+            total += 2  # ascending and descending
+    return total
+
+
+class Store(MemoryBackend):
+    """MemoryBackend with Firestore's billing, a latency distribution and finite capacity.
+
+    Besides "set" and "delete", commit accepts "update" (updateDoc) and
+    "merge" (setDoc with merge), which both merge into the stored document.
+    """
+
+    def __init__(self, latency=0.03, jitter=0.5, capacity=500, failure_rate=0.0, seed=None):
+        super().__init__(latency=latency, failure_rate=failure_rate, seed=seed)
+        self.jitter = jitter
+        self._slots = asyncio.Semaphore(capacity)
+        self.writes = 0
+        self.index_entries = 0
+        self.bytes_written = 0
+        self._queries = {}  # (collection, field values) -> doc ids, the composite index
+
+    async def _round_trip(self):
+        async with self._slots:
+            if self.latency:
+                await asyncio.sleep(self.latency * self._rng.lognormvariate(0, self.jitter))
+
+    def seed(self, collection, doc_id, data):
+        """Store a document without billing it."""
+        self.docs[(collection, doc_id)] = data
+        if collection == POOLS and all(f in data for f in FLAT_FIELDS):
+            key = (collection, tuple(data[f] for f in FLAT_FIELDS))
+            self._queries.setdefault(key, []).append(doc_id)
+
+    async def commit(self, writes):
+        applied = []
+        for op, collection, doc_id, data in writes:
+            if op in ("update", "merge"):
+                data = {**(self.docs.get((collection, doc_id)) or {}), **data}
+                op = "set"
+            applied.append((op, collection, doc_id, data))
+        await super().commit(applied)
+        for op, _, _, data in writes:
+            self.writes += 1
+            if op != "delete":
+                self.index_entries += index_entries(data)
+                self.bytes_written += len(json.dumps(data, separators=(",", ":"), default=str))
+
+    async def get(self, collection, doc_id):
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            await self._round_trip()
+            raise TransientError("simulated failure")
+        return await super().get(collection, doc_id)
+
+    async def query(self, collection, **equals):
+        """Documents whose fields equal equals, through the composite index on FLAT_FIELDS."""
+        await self._round_trip()
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            raise TransientError("simulated failure")
+        ids = self._queries.get((collection, tuple(equals.get(f) for f in FLAT_FIELDS)), ())
+        self.reads += max(1, len(ids))
+        return [self.docs[(collection, doc_id)] for doc_id in ids]
+
+
+def seed_pools(store, files, layer, on_skip=None):
+    """Load the bank into store for the given first answering layer. Returns the quiz targets.
+
+    on_skip(path, message) hears about chapters no app subject serves.
+    """
+    targets = []
+    for path in files:
+        try:
+            chapter = load_chapter(path)
+        except (ET.ParseError, ValueError):
+            continue
+        # Class 11 zoology is Biology in the bank but zoo in the app
+        code, name = app_subject(chapter.subject, chapter.chapter_id)
+        if code is None:
+            if on_skip:
+                on_skip(path, f"no app subject for {chapter.subject}")
+            continue
+        for diff in DIFFICULTIES:
+            questions = chapter.pools[diff]
+            if not questions:
+                continue
+            targets.append((code, name, chapter.chapter_id, diff))
+            pool = pool_document(chapter.subject, chapter.chapter_id, diff, questions)
+            if layer == 1:
+                for q in pool["questions"]:
+                    store.seed(POOLS, q["id"], {**q, "subject": name, "chapterId": chapter.chapter_id,
+                                                "difficulty": diff.capitalize(), "isActive": True})
+            elif layer == 2:
+                store.seed(POOLS, f"{code}_{chapter.chapter_id}_{diff}", pool)
+    return targets
+
+
+class Recorder:
+    def __init__(self):
+        self.latency = {"start": [], "finish": []}
+        self.layers = {1: 0, 2: 0, 3: 0, 4: 0}
+        self.failed_writes = 0
+
+
+async def start_session(store, target, args, rec):
+    """startTestSession: the first layer that returns questions wins."""
+    code, name, chapter_id, diff = target
+    try:
+        docs = await store.query(POOLS, subject=name, chapterId=chapter_id,
+                                 difficulty=diff.capitalize(), isActive=True)
+        if docs:
+            rec.layers[1] += 1
+            return docs[:SESSION_SIZE]
+    except TransientError:
+        pass
+    try:
+        pool = await store.get(POOLS, f"{code}_{chapter_id}_{diff}")
+        if pool and pool.get("questions"):
+            rec.layers[2] += 1
+            return pool["questions"][:SESSION_SIZE]
+    except TransientError:
+        pass
+    if args.layer <= 3:
+        # A static file from the app bundle or CDN: no Firestore round trip
+        await asyncio.sleep(args.shard_latency)
+        rec.layers[3] += 1
+    else:
+        rec.layers[4] += 1
+    return [{"id": f"{code}-{chapter_id}-{diff}-{n}", "correctAnswer": "a"} for n in range(SESSION_SIZE)]
+
+
+def finish_writes(uid, target, questions, stats, rng):
+    """The documents App.jsx writes when a quiz ends."""
+    code, _, chapter_id, diff = target
+    responses = []
+    for q in questions:
+        answer = rng.choice("abcd") if rng.random() < 0.9 else None
+        responses.append({"id": q["id"], "answer": answer, "correct": answer == q.get("correctAnswer")})
+    correct = sum(r["correct"] for r in responses)
+    stats["xp"] += correct + 10
+    stats["totalTests"] += 1
+    stats["totalQuestions"] += len(questions)
+    stats["correctAnswers"] += correct
+    result = {"userId": uid, "subject": code, "chapterId": chapter_id, "chapterName": "",
+              "difficulty": diff, "score": correct * 4, "correct": correct,
+              "incorrect": len(questions) - correct, "unattempted": 0,
+              "totalQuestions": len(questions), "maxScore": len(questions) * 4,
+              "percentage": round(correct / len(questions) * 100), "stars": 1,
+              "responses": responses, "timestamp": time.time()}
+    progress = {"stars": 1, "starMap": {"easy": 1, "medium": 0, "hard": 0}, "completedModes": [diff]}
+    return [
+        ("set", "quiz_results", f"{uid}-{stats['totalTests']}", result),
+        ("update", "users", uid, {"stats": dict(stats)}),
+        ("merge", f"users/{uid}/chapterProgress", str(chapter_id), progress),
+    ]
+
+
+async def _commit(store, writes, rec):
+    try:
+        await store.commit(writes)
+    except TransientError:
+        # The app logs and drops failed writes; so does the simulation
+        rec.failed_writes += len(writes)
+
+
+async def student(store, uid, targets, args, rec, rng):
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+    stats = {"xp": 0, "lvl": 1, "nextXp": 100, "gold": 0, "totalTests": 0, "totalQuestions": 0,
+             "correctAnswers": 0, "streak": 1, "lastActive": "2024-01-01",
+             "activity": [f"2024-01-{d:02d}" for d in range(1, 15)]}
+    store.seed("users", uid, {"stats": dict(stats)})
+    for _ in range(args.quizzes):
+        target = rng.choice(targets)
+        start = time.perf_counter()
+        questions = await start_session(store, target, args, rec)
+        rec.latency["start"].append(time.perf_counter() - start)
+
+        await asyncio.sleep(rng.expovariate(1 / args.quiz_time) if args.quiz_time else 0)
+
+        writes = finish_writes(uid, target, questions, stats, rng)
+        start = time.perf_counter()
+        if args.coalesce:
+            await _commit(store, writes, rec)
+        else:
+            await asyncio.gather(*(_commit(store, [w], rec) for w in writes))
+        rec.latency["finish"].append(time.perf_counter() - start)
+
+
+def percentile(values, q):
+    """The q-th percentile (0-100) of values, nearest rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+async def simulate(args, targets_files):
+    store = Store(args.latency, args.jitter, args.capacity, args.failure_rate, args.seed)
+    targets = seed_pools(store, targets_files, args.layer,
+                         on_skip=lambda path, err: print(f"[SKIPPED] {os.path.basename(path)}: {err}",
+                                                         file=sys.stderr))
+    if not targets:
+        raise SystemExit("no chapters loaded")
+    rec = Recorder()
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(student(store, f"user{n:06d}", targets, args, rec, random.Random(rng.random()))
+                           for n in range(args.students)))
+    elapsed = time.perf_counter() - start
+
+    sessions = args.students * args.quizzes
+    return {
+        "students": args.students,
+        "sessions": sessions,
+        "coalesce": args.coalesce,
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(sessions / elapsed, 1),
+        "latency_ms": {
+            name: {"p50": round(percentile(v, 50) * 1000, 1), "p99": round(percentile(v, 99) * 1000, 1)}
+            for name, v in rec.latency.items()
+        },
+        "layers": rec.layers,
+        "reads_per_session": round(store.reads / sessions, 2),
+        "writes_per_session": round(store.writes / sessions, 2),
+        "commits_per_session": round(store.commits / sessions, 2),
+        "index_entries_per_session": round(store.index_entries / sessions, 1),
+        "bytes_written_per_session": round(store.bytes_written / sessions),
+        "write_amplification": round((store.writes + store.index_entries) / max(store.writes, 1), 1),
+        "failed_writes": rec.failed_writes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent students against a Firestore stand-in.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--quizzes", type=int, default=2, help="quizzes per student")
+    parser.add_argument("--layer", type=int, choices=(1, 2, 3, 4), default=2,
+                        help="first startTestSession layer that holds questions")
+    parser.add_argument("--coalesce", action="store_true", help="commit the quiz-end writes as one batch")
+    parser.add_argument("--latency", type=float, default=0.03, help="median seconds per round trip")
+    parser.add_argument("--jitter", type=float, default=0.5, help="lognormal sigma of the latency")
+    parser.add_argument("--capacity", type=int, default=500, help="round trips the store serves at once")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--shard-latency", type=float, default=0.01, help="seconds to fetch a static shard")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which students arrive")
+    parser.add_argument("--quiz-time", type=float, default=0.5, help="mean seconds between start and finish")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(simulate(args, chapter_files(args.raw_dir)))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+    lat = report["latency_ms"]
+    print(f"{report['sessions']} sessions from {report['students']} students in "
+          f"{report['seconds'] * 1000:.0f} ms ({report['sessions_per_second']:.0f}/s)")
+    print(f"  start   p50 {lat['start']['p50']:.1f} ms  p99 {lat['start']['p99']:.1f} ms  "
+          f"layers {report['layers']}")
+    print(f"  finish  p50 {lat['finish']['p50']:.1f} ms  p99 {lat['finish']['p99']:.1f} ms")
+    print(f"  per session: {report['reads_per_session']} reads, {report['writes_per_session']} writes in "
+          f"{report['commits_per_session']} commits, {report['index_entries_per_session']} index entries, "
+          f"{report['bytes_written_per_session']} bytes; write amplification "
+          f"{report['write_amplification']}x")
+    if report["failed_writes"]:
+        print(f"[WARN] {report['failed_writes']} writes failed and were dropped", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Content-hashed build manifest for the question bank.
+
+The manifest records, for every chapter file, a hash of the file and of each
+<easy>/<medium>/<hard> pool. Rescanning compares against it so that only
+files whose bytes changed are reparsed, and produces a pool diff: the
+question_pools/{subject}_{chapterId}_{difficulty} documents that need to be
+written or deleted. Diffs accumulate in build/qbank/pool_diff.json, stamped
+with the bank_hash of the manifest they came from, until an uploader writes
+them and calls settle_pending_diff().
+
+    python -m qbank.manifest [--raw-dir DIR] [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+from .loader import load_chapter
+from .paths import BUILD_DIR, DIFFICULTIES, RAW_DIR, chapter_files
+
+MANIFEST_VERSION = 1
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+DIFF_PATH = os.path.join(BUILD_DIR, "pool_diff.json")
+
+
+def pool_doc_id(subject, chapter_id, difficulty):
+    """Firestore document id of a pool, as written by uploadQuestions.js."""
+    return f"{subject}_{chapter_id}_{difficulty}".lower()
+
+
+def pool_hash(questions):
+    h = hashlib.sha256()
+    for q in questions:
+        h.update(json.dumps([q.text, q.options, q.answer, q.explanation],
+                            ensure_ascii=False).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def question_id(q):
+    """Stable id of a question: a hash of its subject, chapter, difficulty and normalized text.
+
+    Editing a question's options, answer or explanation keeps its id; rewording
+    the question or moving it to another difficulty makes it a new question.
+    The difficulty keeps a text repeated in two pools of a chapter from sharing
+    an id in flat_questions.json and in the item statistics.
+    """
+    text = " ".join(q.text.split()).lower()
+    digest = hashlib.sha256(f"{q.subject.lower()}\0{q.chapter_id}\0{q.difficulty}\0{text}".encode("utf-8"))
+    return "q_" + digest.hexdigest()[:16]
+
+
+def question_ids(questions):
+    """question_id for each of questions; repeats of a text get a _2, _3, ... suffix."""
+    seen = {}
+    ids = []
+    for q in questions:
+        qid = question_id(q)
+        n = seen[qid] = seen.get(qid, 0) + 1
+        ids.append(qid if n == 1 else f"{qid}_{n}")
+    return ids
+
+
+def question_hash(q):
+    """Hash of everything a client shows for a question."""
+    payload = json.dumps([q.text, q.options, q.answer, q.explanation], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def bank_hash(file_hashes):
+    """Hash of a bank snapshot given as {chapter file name: sha256}.
+
+    The pack stores it in its header, so a pack can be matched to a manifest.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for name, digest in sorted(file_hashes.items()):
+        h.update(f"{name}\0{digest}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def manifest_bank_hash(manifest, errors=()):
+    """bank_hash of manifest's chapters, leaving out the files in errors as the pack does."""
+    return bank_hash({name: entry["sha256"] for name, entry in manifest["chapters"].items()
+                      if name not in errors})
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = None
+    if not manifest or manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "chapters": {}}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def scan_file(path, previous=None):
+    """Manifest entry for one chapter file, reusing previous when the file is unchanged."""
+    st = os.stat(path)
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        return previous
+
+    digest = file_hash(path)
+    if previous and previous.get("sha256") == digest:
+        return dict(previous, size=st.st_size, mtime_ns=st.st_mtime_ns)
+
+    chapter = load_chapter(path)
+    entry = {
+        "sha256": digest,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "subject": chapter.subject,
+        "id": chapter.chapter_id,
+        "name": chapter.name,
+        "pools": {},
+    }
+    if previous and "inputs" in previous:
+        entry["inputs"] = previous["inputs"]
+    for diff in DIFFICULTIES:
+        questions = chapter.pools[diff]
+        if questions:
+            entry["pools"][diff] = {
+                "doc": pool_doc_id(chapter.subject, chapter.chapter_id, diff),
+                "hash": pool_hash(questions),
+                "count": len(questions),
+            }
+    return entry
+
+
+def update(manifest, files, partial=False):
+    """Rescan files against manifest.
+
+    Returns (new manifest, diff, errors). Files that fail to parse keep their
+    previous entry so a broken save never turns into pool deletions. With
+    partial=True, chapters not in files are carried over instead of dropped.
+    """
+    old = manifest["chapters"]
+    chapters = dict(old) if partial else {}
+    errors = {}
+    for path in files:
+        name = os.path.basename(path)
+        try:
+            chapters[name] = scan_file(path, old.get(name))
+        except (ET.ParseError, ValueError, OSError) as e:
+            errors[name] = str(e)
+            if name in old:
+                chapters[name] = old[name]
+    new = dict(manifest, chapters=chapters)
+    return new, diff_manifests(manifest, new), errors
+
+
+def _pool_hashes(manifest):
+    return {
+        pool["doc"]: pool["hash"]
+        for entry in manifest["chapters"].values()
+        for pool in entry.get("pools", {}).values()
+    }
+
+
+def diff_manifests(old, new):
+    """Pool documents to write and to delete to go from old to new."""
+    before = _pool_hashes(old)
+    after = _pool_hashes(new)
+    return {
+        "upsert": sorted(doc for doc, h in after.items() if before.get(doc) != h),
+        "delete": sorted(doc for doc in before if doc not in after),
+    }
+
+
+def load_pending_diff(path=DIFF_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"upsert": [], "delete": []}
+
+
+def _save_pending_diff(pending, path):
+    if not pending["upsert"] and not pending["delete"]:
+        clear_pending_diff(path)
+        return
+    if load_pending_diff(path) == pending:
+        return  # keep the mtime uploadQuestions.js compares against pools.json
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pending, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def write_pending_diff(diff, path=DIFF_PATH, bank=None):
+    """Merge diff into the pending diff that has not been uploaded yet.
+
+    bank is the manifest_bank_hash of the manifest the diff leads to.
+    """
+    pending = load_pending_diff(path)
+    upsert = (set(pending["upsert"]) - set(diff["delete"])) | set(diff["upsert"])
+    delete = (set(pending["delete"]) - set(diff["upsert"])) | set(diff["delete"])
+    merged = {"upsert": sorted(upsert), "delete": sorted(delete)}
+    if bank:
+        merged["bank"] = bank
+    _save_pending_diff(merged, path)
+    return merged
+
+
+def settle_pending_diff(upserted, deleted, path=DIFF_PATH):
+    """Drop the pools an upload wrote or deleted from the pending diff; keep the rest."""
+    pending = load_pending_diff(path)
+    pending["upsert"] = [doc for doc in pending["upsert"] if doc not in upserted]
+    pending["delete"] = [doc for doc in pending["delete"] if doc not in deleted]
+    _save_pending_diff(pending, path)
+    return pending
+
+
+def clear_pending_diff(path=DIFF_PATH):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rescan raw_questions and record changed pools.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--diff-out", default=DIFF_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="print the diff without saving anything")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    new, diff, errors = update(manifest, chapter_files(args.raw_dir))
+    for name, err in sorted(errors.items()):
+        print(f"[ERROR] {name}: {err}", file=sys.stderr)
+    for doc in diff["upsert"]:
+        print(f"  upsert {doc}")
+    for doc in diff["delete"]:
+        print(f"  delete {doc}")
+
+    if not args.dry_run:
+        save_manifest(new, args.manifest)
+        pending = write_pending_diff(diff, args.diff_out, manifest_bank_hash(new, errors))
+        print(f"{len(diff['upsert'])} pools changed, {len(diff['delete'])} removed; "
+              f"{len(pending['upsert']) + len(pending['delete'])} pending upload in {args.diff_out}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
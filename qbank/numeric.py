@@ -0,0 +1,484 @@
+"""Parametric numeric questions for formula-based catalog topics.
+
+Each topic in TOPICS declares its parameters as (low, high, decimals) ranges
+and one Form per difficulty. A Form is a question template, the formula for
+the answer, and formulas for the classic mistakes students make. A whole
+batch is computed at once with numpy:
+
+    1. sample every parameter for every question
+    2. evaluate the answer and each mistake
+    3. round all candidates to 3 significant figures
+    4. keep the first three distinct, nonzero distractors per question, from
+       the mistakes first and then from scaled answers (x2, /2, x10, ...)
+    5. shuffle the four options independently per question
+
+qbank.generate uses these items for catalog topics named here, and the
+template placeholders for every other topic.
+
+Requires numpy.
+
+    python -m qbank.numeric [--topic "Ohm's Law"] [--difficulty easy] [--count 5] [--seed 0]
+"""
+import argparse
+import math
+import sys
+import time
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from .paths import DIFFICULTIES
+
+OPTION_IDS = "ABCD"
+# Fallback distractors when a topic's mistakes collide with the answer or each other
+SCALES = (2.0, 0.5, 10.0, 0.1, 1.5, 0.75, 3.0, 1 / 3)
+
+K_COULOMB = 8.99e9
+EPSILON_0 = 8.854e-12
+PLANCK = 6.626e-34
+LIGHT = 3.0e8
+ELECTRON_CHARGE = 1.602e-19
+FARADAY = 96485
+GAS_R = 8.314
+GAS_R_ATM = 0.0821
+LN2 = 0.693
+
+
+class Form(NamedTuple):
+    text: str  # str.format template over the parameter names
+    answer: Callable  # {name: array} -> array
+    unit: str
+    mistakes: tuple = ()  # callables like answer, giving plausible wrong results
+    explanation: str = ""  # template over the parameter names and {answer}
+
+
+class NumericTopic(NamedTuple):
+    params: dict  # name -> (low, high, decimals)
+    forms: dict  # difficulty -> Form; missing difficulties use the nearest easier one
+
+
+TOPICS = {
+    # ── Physics ─────────────────────────────────────────────────────────────
+    "Coulomb's Law": NumericTopic(
+        {"q1": (1, 9, 0), "q2": (1, 9, 0), "r": (0.1, 0.9, 1), "r_cm": (5, 50, 0)},
+        {
+            "easy": Form(
+                "Two point charges of {q1} μC and {q2} μC are {r} m apart in vacuum. "
+                "What is the electrostatic force between them?",
+                lambda p: K_COULOMB * p["q1"] * p["q2"] * 1e-12 / p["r"] ** 2, "N",
+                (lambda p: K_COULOMB * p["q1"] * p["q2"] * 1e-12 / p["r"],
+                 lambda p: p["q1"] * p["q2"] * 1e-12 / p["r"] ** 2),
+                "F = kq₁q₂/r² = 8.99×10⁹ × {q1}×10⁻⁶ × {q2}×10⁻⁶ / {r}² = {answer} N.",
+            ),
+            "medium": Form(
+                "Charges of {q1} μC and {q2} μC are separated by {r_cm} cm. Find the force between them.",
+                lambda p: K_COULOMB * p["q1"] * p["q2"] * 1e-12 / (p["r_cm"] / 100) ** 2, "N",
+                (lambda p: K_COULOMB * p["q1"] * p["q2"] * 1e-12 / p["r_cm"] ** 2,
+                 lambda p: K_COULOMB * p["q1"] * p["q2"] * 1e-12 / (p["r_cm"] / 100)),
+                "Convert r to metres: {r_cm} cm = {r_cm}/100 m. F = kq₁q₂/r² = {answer} N.",
+            ),
+            "hard": Form(
+                "Two equal charges of {q1} μC repel each other with a force of {q2} N. "
+                "How far apart are they?",
+                lambda p: np.sqrt(K_COULOMB * (p["q1"] * 1e-6) ** 2 / p["q2"]), "m",
+                (lambda p: K_COULOMB * (p["q1"] * 1e-6) ** 2 / p["q2"],
+                 lambda p: np.sqrt(K_COULOMB * p["q1"] * 1e-6 / p["q2"])),
+                "r = √(kq²/F) = √(8.99×10⁹ × ({q1}×10⁻⁶)² / {q2}) = {answer} m.",
+            ),
+        },
+    ),
+    "Ohm's Law": NumericTopic(
+        {"I": (0.5, 5, 1), "R": (2, 100, 0), "I_mA": (5, 500, 0), "R_k": (0.5, 10, 1), "V": (3, 240, 0)},
+        {
+            "easy": Form(
+                "A current of {I} A flows through a {R} Ω resistor. What is the potential difference across it?",
+                lambda p: p["I"] * p["R"], "V",
+                (lambda p: p["R"] / p["I"], lambda p: p["I"] / p["R"]),
+                "V = IR = {I} × {R} = {answer} V.",
+            ),
+            "medium": Form(
+                "A current of {I_mA} mA flows through a {R_k} kΩ resistor. Find the voltage across it.",
+                lambda p: p["I_mA"] * p["R_k"], "V",
+                (lambda p: p["I_mA"] * p["R_k"] * 1000, lambda p: p["I_mA"] * p["R_k"] / 1000),
+                "V = IR = {I_mA}×10⁻³ A × {R_k}×10³ Ω = {answer} V.",
+            ),
+            "hard": Form(
+                "A {V} V supply drives {I_mA} mA through a conductor. What is its resistance?",
+                lambda p: p["V"] / (p["I_mA"] / 1000), "Ω",
+                (lambda p: p["V"] / p["I_mA"], lambda p: p["V"] * p["I_mA"] / 1000),
+                "R = V/I = {V} / ({I_mA}×10⁻³) = {answer} Ω.",
+            ),
+        },
+    ),
+    "Joule's Heating": NumericTopic(
+        {"I": (1, 5, 0), "R": (2, 50, 0), "t": (10, 120, 0), "t_min": (2, 30, 0)},
+        {
+            "easy": Form(
+                "A current of {I} A passes through a {R} Ω resistor for {t} s. How much heat is produced?",
+                lambda p: p["I"] ** 2 * p["R"] * p["t"], "J",
+                (lambda p: p["I"] * p["R"] * p["t"], lambda p: p["I"] * p["R"] ** 2 * p["t"]),
+                "H = I²Rt = {I}² × {R} × {t} = {answer} J.",
+            ),
+            "medium": Form(
+                "A {R} Ω heater carries {I} A for {t_min} minutes. Find the heat produced.",
+                lambda p: p["I"] ** 2 * p["R"] * p["t_min"] * 60, "J",
+                (lambda p: p["I"] ** 2 * p["R"] * p["t_min"], lambda p: p["I"] * p["R"] * p["t_min"] * 60),
+                "t = {t_min} × 60 s. H = I²Rt = {I}² × {R} × {t_min}×60 = {answer} J.",
+            ),
+        },
+    ),
+    "Parallel Plate Capacitor": NumericTopic(
+        {"A": (10, 200, 0), "d": (0.5, 5, 1), "K": (2, 8, 0)},
+        {
+            "easy": Form(
+                "A parallel plate capacitor has plates of area {A} cm² separated by {d} mm of air. "
+                "What is its capacitance?",
+                lambda p: EPSILON_0 * p["A"] * 1e-4 / (p["d"] * 1e-3) * 1e12, "pF",
+                (lambda p: EPSILON_0 * p["A"] / p["d"] * 1e12,
+                 lambda p: EPSILON_0 * p["A"] * 1e-4 * p["d"] * 1e-3 * 1e12),
+                "C = ε₀A/d = 8.854×10⁻¹² × {A}×10⁻⁴ / {d}×10⁻³ = {answer} pF.",
+            ),
+            "hard": Form(
+                "The gap of a parallel plate capacitor (area {A} cm², separation {d} mm) is filled with a "
+                "dielectric of constant {K}. What is the new capacitance?",
+                lambda p: p["K"] * EPSILON_0 * p["A"] * 1e-4 / (p["d"] * 1e-3) * 1e12, "pF",
+                (lambda p: EPSILON_0 * p["A"] * 1e-4 / (p["d"] * 1e-3) * 1e12 / p["K"],
+                 lambda p: EPSILON_0 * p["A"] * 1e-4 / (p["d"] * 1e-3) * 1e12),
+                "C = Kε₀A/d = {K} × 8.854×10⁻¹² × {A}×10⁻⁴ / {d}×10⁻³ = {answer} pF.",
+            ),
+        },
+    ),
+    "Photon Energy": NumericTopic(
+        {"lam": (200, 800, 0)},
+        {
+            "easy": Form(
+                "What is the energy of a photon of wavelength {lam} nm?",
+                lambda p: 1240 / p["lam"], "eV",
+                (lambda p: p["lam"] / 1240, lambda p: 1240 / p["lam"] * 10),
+                "E = hc/λ = 1240 eV·nm / {lam} nm = {answer} eV.",
+            ),
+            "medium": Form(
+                "Find the energy in joules of a photon of wavelength {lam} nm.",
+                lambda p: PLANCK * LIGHT / (p["lam"] * 1e-9), "J",
+                (lambda p: PLANCK * LIGHT / p["lam"], lambda p: PLANCK * p["lam"] * 1e-9 / LIGHT),
+                "E = hc/λ = 6.626×10⁻³⁴ × 3×10⁸ / {lam}×10⁻⁹ = {answer} J.",
+            ),
+        },
+    ),
+    "De Broglie Wavelength": NumericTopic(
+        {"V": (25, 400, 0)},
+        {
+            "easy": Form(
+                "An electron is accelerated from rest through {V} V. What is its de Broglie wavelength?",
+                lambda p: 1.227 / np.sqrt(p["V"]), "nm",
+                (lambda p: 1.227 / p["V"], lambda p: 1.227 * np.sqrt(p["V"])),
+                "λ = 1.227/√V nm = 1.227/√{V} = {answer} nm.",
+            ),
+        },
+    ),
+    "Half Life": NumericTopic(
+        {"T": (2, 20, 0), "n": (1, 5, 0), "m0": (10, 200, 0)},
+        {
+            "easy": Form(
+                "A radioactive sample has a half-life of {T} days. What percentage of it remains after "
+                "{n} half-lives?",
+                lambda p: 100 * 0.5 ** p["n"], "%",
+                (lambda p: 100 - 100 * 0.5 ** p["n"], lambda p: 100 / (2 * p["n"])),
+                "After n half-lives N/N₀ = (1/2)ⁿ = (1/2)^{n}, so {answer}% remains.",
+            ),
+            "medium": Form(
+                "{m0} g of an isotope with a half-life of {T} days decays for {n}×{T} days. "
+                "How much remains?",
+                lambda p: p["m0"] * 0.5 ** p["n"], "g",
+                (lambda p: p["m0"] - p["m0"] * 0.5 ** p["n"], lambda p: p["m0"] / (2 * p["n"])),
+                "{n} half-lives pass, so m = {m0} × (1/2)^{n} = {answer} g.",
+            ),
+        },
+    ),
+    "Resonance": NumericTopic(
+        {"L": (1, 100, 0), "C": (1, 50, 0)},
+        {
+            "medium": Form(
+                "An LC circuit has L = {L} mH and C = {C} μF. What is its resonant frequency?",
+                lambda p: 1 / (2 * np.pi * np.sqrt(p["L"] * 1e-3 * p["C"] * 1e-6)), "Hz",
+                (lambda p: 1 / np.sqrt(p["L"] * 1e-3 * p["C"] * 1e-6),
+                 lambda p: 1 / (2 * np.pi * p["L"] * 1e-3 * p["C"] * 1e-6)),
+                "f = 1/(2π√LC) = 1/(2π√({L}×10⁻³ × {C}×10⁻⁶)) = {answer} Hz.",
+            ),
+        },
+    ),
+    "Transformers": NumericTopic(
+        {"Vp": (110, 440, -1), "Np": (100, 1000, -1), "Ns": (20, 5000, -1)},
+        {
+            "easy": Form(
+                "A transformer has {Np} primary turns and {Ns} secondary turns. With {Vp} V across the primary, "
+                "what is the secondary voltage?",
+                lambda p: p["Vp"] * p["Ns"] / p["Np"], "V",
+                (lambda p: p["Vp"] * p["Np"] / p["Ns"], lambda p: p["Vp"] * p["Ns"] * p["Np"] / 1e4),
+                "Vs/Vp = Ns/Np, so Vs = {Vp} × {Ns}/{Np} = {answer} V.",
+            ),
+        },
+    ),
+    # ── Chemistry ───────────────────────────────────────────────────────────
+    "Nernst Equation": NumericTopic(
+        {"E0": (0.1, 1.2, 2), "n": (1, 3, 0), "logQ": (-3, 3, 0)},
+        {
+            "medium": Form(
+                "For a cell with E° = {E0} V and n = {n}, the reaction quotient is Q = 10^{logQ}. "
+                "What is the cell potential at 298 K?",
+                lambda p: p["E0"] - 0.0591 / p["n"] * p["logQ"], "V",
+                (lambda p: p["E0"] + 0.0591 / p["n"] * p["logQ"],
+                 lambda p: p["E0"] - 0.0591 * p["logQ"],
+                 lambda p: p["E0"] - 0.0591 / p["n"] * p["logQ"] * 2.303),
+                "E = E° − (0.0591/n) log Q = {E0} − (0.0591/{n}) × {logQ} = {answer} V.",
+            ),
+        },
+    ),
+    "Half-Life": NumericTopic(
+        {"k": (0.01, 0.5, 2), "t_half": (5, 60, 0), "x": (2, 5, 0)},
+        {
+            "easy": Form(
+                "A first order reaction has a rate constant of {k} min⁻¹. What is its half-life?",
+                lambda p: LN2 / p["k"], "min",
+                (lambda p: p["k"] / LN2, lambda p: 1 / p["k"]),
+                "t½ = 0.693/k = 0.693/{k} = {answer} min.",
+            ),
+            "medium": Form(
+                "The half-life of a first order reaction is {t_half} min. What is its rate constant?",
+                lambda p: LN2 / p["t_half"], "min⁻¹",
+                (lambda p: p["t_half"] / LN2, lambda p: 1 / p["t_half"]),
+                "k = 0.693/t½ = 0.693/{t_half} = {answer} min⁻¹.",
+            ),
+            "hard": Form(
+                "A first order reaction has a half-life of {t_half} min. How long does it take for the "
+                "reactant to fall to 1/2^{x} of its initial amount?",
+                lambda p: p["x"] * p["t_half"], "min",
+                (lambda p: p["t_half"] / p["x"], lambda p: p["t_half"] * 2 ** p["x"] / 2),
+                "Each half-life halves the amount, so {x} half-lives are needed: {x} × {t_half} = {answer} min.",
+            ),
+        },
+    ),
+    "First Order Reaction": NumericTopic(
+        {"k": (0.005, 0.1, 3), "pct": (50, 95, -1)},
+        {
+            "hard": Form(
+                "A first order reaction has k = {k} s⁻¹. How long does it take for {pct}% of the "
+                "reactant to be consumed?",
+                lambda p: 2.303 / p["k"] * np.log10(100 / (100 - p["pct"])), "s",
+                (lambda p: 2.303 / p["k"] * np.log10(100 / p["pct"]),
+                 lambda p: 1 / p["k"] * np.log10(100 / (100 - p["pct"]))),
+                "t = (2.303/k) log([A]₀/[A]) = (2.303/{k}) log(100/(100 − {pct})) = {answer} s.",
+            ),
+        },
+    ),
+    "Osmotic Pressure": NumericTopic(
+        {"C": (0.05, 1, 2), "T": (280, 320, 0)},
+        {
+            "easy": Form(
+                "What is the osmotic pressure of a {C} M solution of a non-electrolyte at {T} K?",
+                lambda p: p["C"] * GAS_R_ATM * p["T"], "atm",
+                (lambda p: p["C"] * GAS_R * p["T"], lambda p: p["C"] * GAS_R_ATM * (p["T"] - 273)),
+                "π = CRT = {C} × 0.0821 × {T} = {answer} atm.",
+            ),
+        },
+    ),
+    "Elevation in Boiling Point": NumericTopic(
+        {"m": (0.1, 2, 1), "i": (1, 3, 0)},
+        {
+            "easy": Form(
+                "Find the elevation in boiling point of a {m} molal aqueous solution of a non-electrolyte "
+                "(Kb = 0.52 K kg mol⁻¹).",
+                lambda p: 0.52 * p["m"], "K",
+                (lambda p: 0.52 / p["m"], lambda p: 1.86 * p["m"]),
+                "ΔTb = Kb·m = 0.52 × {m} = {answer} K.",
+            ),
+            "medium": Form(
+                "A {m} molal aqueous solution of an electrolyte has van't Hoff factor {i}. By how much is its "
+                "boiling point raised (Kb = 0.52 K kg mol⁻¹)?",
+                lambda p: p["i"] * 0.52 * p["m"], "K",
+                (lambda p: 0.52 * p["m"], lambda p: 0.52 * p["m"] / p["i"]),
+                "ΔTb = i·Kb·m = {i} × 0.52 × {m} = {answer} K.",
+            ),
+        },
+    ),
+    "Depression in Freezing Point": NumericTopic(
+        {"m": (0.1, 2, 1), "i": (1, 3, 0)},
+        {
+            "easy": Form(
+                "Find the depression in freezing point of a {m} molal aqueous solution of a non-electrolyte "
+                "(Kf = 1.86 K kg mol⁻¹).",
+                lambda p: 1.86 * p["m"], "K",
+                (lambda p: 1.86 / p["m"], lambda p: 0.52 * p["m"]),
+                "ΔTf = Kf·m = 1.86 × {m} = {answer} K.",
+            ),
+            "medium": Form(
+                "A {m} molal aqueous solution of an electrolyte has van't Hoff factor {i}. By how much is its "
+                "freezing point lowered (Kf = 1.86 K kg mol⁻¹)?",
+                lambda p: p["i"] * 1.86 * p["m"], "K",
+                (lambda p: 1.86 * p["m"], lambda p: 1.86 * p["m"] / p["i"]),
+                "ΔTf = i·Kf·m = {i} × 1.86 × {m} = {answer} K.",
+            ),
+        },
+    ),
+    "Faraday's Laws": NumericTopic(
+        {"I": (1, 10, 0), "t_min": (10, 120, 0)},
+        {
+            "medium": Form(
+                "A current of {I} A is passed through CuSO₄ solution for {t_min} minutes. What mass of copper "
+                "is deposited? (Cu = 63.5 g mol⁻¹, n = 2)",
+                lambda p: p["I"] * p["t_min"] * 60 * 63.5 / (2 * FARADAY), "g",
+                (lambda p: p["I"] * p["t_min"] * 60 * 63.5 / FARADAY,
+                 lambda p: p["I"] * p["t_min"] * 63.5 / (2 * FARADAY)),
+                "m = ItM/(nF) = {I} × {t_min}×60 × 63.5 / (2 × 96485) = {answer} g.",
+            ),
+        },
+    ),
+    "Arrhenius Equation": NumericTopic(
+        {"Ea": (20, 120, 0), "T1": (290, 310, 0), "dT": (10, 30, -1)},
+        {
+            "hard": Form(
+                "A reaction has an activation energy of {Ea} kJ mol⁻¹. By what factor does its rate "
+                "constant increase when the temperature rises from {T1} K by {dT} K?",
+                lambda p: np.exp(p["Ea"] * 1000 / GAS_R * (1 / p["T1"] - 1 / (p["T1"] + p["dT"]))), "",
+                (lambda p: np.exp(p["Ea"] / GAS_R * (1 / p["T1"] - 1 / (p["T1"] + p["dT"]))) * 10,
+                 lambda p: 10 ** (p["Ea"] * 1000 / GAS_R * (1 / p["T1"] - 1 / (p["T1"] + p["dT"])))),
+                "ln(k₂/k₁) = (Ea/R)(1/T₁ − 1/T₂) with Ea = {Ea}×10³ J mol⁻¹, so k₂/k₁ = {answer}.",
+            ),
+        },
+    ),
+    "Raoult's Law": NumericTopic(
+        {"x": (0.1, 0.9, 2), "p0": (20, 800, -1)},
+        {
+            "easy": Form(
+                "The vapour pressure of pure solvent A is {p0} mm Hg. What is its partial pressure in a "
+                "solution where its mole fraction is {x}?",
+                lambda p: p["x"] * p["p0"], "mm Hg",
+                (lambda p: (1 - p["x"]) * p["p0"], lambda p: p["p0"] / p["x"]),
+                "pA = xA·p°A = {x} × {p0} = {answer} mm Hg.",
+            ),
+        },
+    ),
+}
+
+
+def form_for(topic, difficulty):
+    """The topic's Form for difficulty, falling back to the nearest easier then harder one."""
+    i = DIFFICULTIES.index(difficulty)
+    for d in DIFFICULTIES[i::-1] + DIFFICULTIES[i + 1:]:
+        if d in topic.forms:
+            return topic.forms[d]
+    raise KeyError(difficulty)
+
+
+def sig3(values):
+    """values rounded to 3 significant figures (0 stays 0)."""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exp = np.floor(np.log10(np.abs(values)))
+    exp = np.where(np.isfinite(exp), exp, 0)
+    step = 10.0 ** (exp - 2)
+    return np.round(values / step) * step
+
+
+def fmt(x):
+    """A number already rounded to 3 significant figures, as it is shown in questions."""
+    if x == 0:
+        return "0"
+    exp = math.floor(math.log10(abs(x)))
+    if -3 <= exp < 5:
+        return f"{x:.{max(0, 2 - exp)}f}"
+    mantissa = x / 10 ** exp
+    return f"{mantissa:.2f} × 10^{exp}"
+
+
+def _param_text(value, decimals):
+    return f"{value:.{decimals}f}" if decimals > 0 else str(int(value))
+
+
+def sample(topic, count, rng):
+    """{name: array of count values} drawn uniformly from each parameter's range."""
+    params = {}
+    for name, (low, high, decimals) in topic.params.items():
+        params[name] = np.round(rng.uniform(low, high, count), decimals)
+        # Rounding to tens can push a value out of range; a zero would break most formulas
+        params[name] = np.clip(params[name], low, high)
+    return params
+
+
+def options_for(form, params, rng):
+    """(option values (count, 4), index of the answer in each row) with distractors filled in."""
+    answer = np.asarray(form.answer(params), dtype=np.float64)
+    count = len(answer)
+    candidates = [answer] + [np.broadcast_to(m(params), answer.shape) for m in form.mistakes]
+    candidates += [answer * s for s in SCALES]
+    rounded = sig3(np.stack(candidates, axis=1))
+
+    chosen = np.zeros((count, 4))
+    chosen[:, 0] = rounded[:, 0]
+    filled = np.ones(count, dtype=np.int64)
+    slots = np.arange(4)
+    for j in range(1, rounded.shape[1]):
+        c = rounded[:, j]
+        taken = ((chosen == c[:, None]) & (slots < filled[:, None])).any(axis=1)
+        ok = np.isfinite(c) & (c != 0) & ~taken & (filled < 4)
+        rows = np.flatnonzero(ok)
+        chosen[rows, filled[rows]] = c[rows]
+        filled += ok
+    if (filled < 4).any():
+        raise ValueError("could not find three distinct distractors")
+
+    order = np.argsort(rng.random((count, 4)), axis=1)
+    return np.take_along_axis(chosen, order, axis=1), np.argmax(order == 0, axis=1)
+
+
+def items(name, difficulty, count, rng):
+    """count questions on topic name as (text, options, answer, explanation, topic) tuples."""
+    topic = TOPICS[name]
+    form = form_for(topic, difficulty)
+    params = sample(topic, count, rng)
+    values, answer_pos = options_for(form, params, rng)
+    unit = f" {form.unit}" if form.unit else ""
+    shown = {n: [_param_text(v, topic.params[n][2]) for v in params[n]] for n in params}
+    out = []
+    for row in range(count):
+        args = {n: shown[n][row] for n in shown}
+        options = [(OPTION_IDS[k], fmt(values[row, k]) + unit) for k in range(4)]
+        answer = OPTION_IDS[answer_pos[row]]
+        out.append((
+            form.text.format(**args),
+            options,
+            answer,
+            form.explanation.format(answer=fmt(values[row, answer_pos[row]]), **args),
+            name,
+        ))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preview parametric numeric questions.")
+    parser.add_argument("--topic", action="append", choices=sorted(TOPICS),
+                        help="topic to generate (repeatable; default all)")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES, default="easy")
+    parser.add_argument("--count", type=int, default=3, help="questions per topic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quiet", action="store_true", help="only print the timing")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    batches = {name: items(name, args.difficulty, args.count, rng) for name in args.topic or TOPICS}
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        for batch in batches.values():
+            for text, options, answer, explanation, topic in batch:
+                print(f"[{topic}] {text}")
+                for opt_id, opt in options:
+                    print(f"  {'*' if opt_id == answer else ' '} {opt_id}. {opt}")
+                print(f"    {explanation}")
+    total = sum(map(len, batches.values()))
+    print(f"{total} questions on {len(batches)} topics in {elapsed * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""Compile the chapter XML bank into a single binary question pack.
+
+Layout (all integers little-endian):
+
+    header    magic, format version, section counts and offsets, bank hash
+              (manifest.bank_hash of the chapter files it compiled)
+    strings   u32 offsets[n + 1] followed by one UTF-8 blob; every string in
+              the bank (texts, option ids, explanations, subjects) is stored once
+    records   fixed-width question records, grouped by pool
+    index     one entry per (subject, chapterId, difficulty) pool pointing at
+              its run of records
+
+PackReader maps the file with mmap. Opening a pack reads only the header and
+the pool index; fetching a pool unpacks that pool's records and decodes the
+strings they reference, nothing else.
+
+    python -m qbank.pack [--raw-dir DIR] [--out build/qbank/questions.qbpk]
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+from .loader import Question, iter_questions
+from .manifest import bank_hash, file_hash
+from .paths import BUILD_DIR, DIFFICULTIES, RAW_DIR, chapter_files
+
+MAGIC = b"QBPK"
+FORMAT_VERSION = 1
+MAX_OPTIONS = 6
+
+# magic, version, n_strings, n_records, n_pools,
+# strings offset, records offset, index offset, bank hash
+HEADER = struct.Struct("<4sHxxIIIQQQ16s")
+# text, explanation, answer index, option count, option ids, option texts
+RECORD = struct.Struct(f"<IIBBxx{MAX_OPTIONS}I{MAX_OPTIONS}I")
+# subject, chapter id, difficulty, first record, record count
+INDEX_ENTRY = struct.Struct("<IiBxxxII")
+
+DEFAULT_PACK = os.path.join(BUILD_DIR, "questions.qbpk")
+
+
+class PackError(Exception):
+    pass
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, s):
+        idx = self.ids.get(s)
+        if idx is None:
+            idx = self.ids[s] = len(self.values)
+            self.values.append(s)
+        return idx
+
+    def encode(self):
+        blobs = [s.encode("utf-8") for s in self.values]
+        offsets = [0]
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+def _encode_question(q, strings):
+    if len(q.options) > MAX_OPTIONS:
+        raise PackError(f"question has {len(q.options)} options, pack supports {MAX_OPTIONS}")
+    ids = [strings.intern(opt_id) for opt_id, _ in q.options]
+    texts = [strings.intern(text) for _, text in q.options]
+    answer = next((i for i, (opt_id, _) in enumerate(q.options) if opt_id == q.answer), 0xFF)
+    pad = [0] * (MAX_OPTIONS - len(q.options))
+    return RECORD.pack(
+        strings.intern(q.text), strings.intern(q.explanation), answer, len(q.options),
+        *ids, *pad, *texts, *pad,
+    )
+
+
+def compile_pack(files, out_path=DEFAULT_PACK, strict=False):
+    """Write a pack for files. Returns (pools, questions, skipped files).
+
+    Malformed files are skipped, or raise PackError when strict; strict also
+    rejects schema errors such as an answer that is not one of the options.
+    """
+    strings = _StringTable()
+    records = []
+    pools = {}  # (subject, chapter_id, difficulty) -> [encoded record]
+    hashes = {}
+    skipped = []
+
+    for path in files:
+        digest = file_hash(path)
+        try:
+            questions = list(iter_questions(path, strict=strict))
+        except (ET.ParseError, ValueError) as e:
+            if strict:
+                raise PackError(f"{os.path.basename(path)}: {e}") from e
+            skipped.append((os.path.basename(path), str(e)))
+            continue
+        hashes[os.path.basename(path)] = digest
+        for q in questions:
+            key = (q.subject, q.chapter_id, DIFFICULTIES.index(q.difficulty))
+            if key not in pools:
+                pools[key] = []
+            pools[key].append(_encode_question(q, strings))
+
+    index = []
+    for key in sorted(pools):
+        subject, chapter_id, diff = key
+        index.append(INDEX_ENTRY.pack(strings.intern(subject), chapter_id, diff,
+                                      len(records), len(pools[key])))
+        records.extend(pools[key])
+
+    string_blob = strings.encode()
+    record_blob = b"".join(records)
+    index_blob = b"".join(index)
+
+    strings_at = HEADER.size
+    records_at = strings_at + len(string_blob)
+    index_at = records_at + len(record_blob)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(strings.values), len(records), len(index),
+                         strings_at, records_at, index_at, bytes.fromhex(bank_hash(hashes)))
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(string_blob)
+        f.write(record_blob)
+        f.write(index_blob)
+    os.replace(tmp_path, out_path)
+    return len(index), len(records), skipped
+
+
+class PackReader:
+    """Read-only, mmap-backed view of a compiled pack."""
+
+    def __init__(self, path=DEFAULT_PACK):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        (magic, version, self.n_strings, self.n_records, n_pools,
+         self._strings_at, self._records_at, index_at, self.bank_hash) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise PackError(f"{path} is not a question pack")
+        if version != FORMAT_VERSION:
+            raise PackError(f"{path} has pack format {version}, expected {FORMAT_VERSION}")
+        self.version = version
+        self._blob_at = self._strings_at + 4 * (self.n_strings + 1)
+        # The offset table is little-endian on disk; copy it into native order
+        self._offsets = array("I")
+        self._offsets.frombytes(self._view[self._strings_at:self._blob_at])
+        if sys.byteorder != "little":
+            self._offsets.byteswap()
+
+        # Keyed by lowercased subject so "Physics" and "physics" both resolve
+        self._index = {}
+        for subject, chapter_id, diff, first, count in INDEX_ENTRY.iter_unpack(
+                self._view[index_at:index_at + n_pools * INDEX_ENTRY.size]):
+            name = self.string(subject)
+            self._index[(name.lower(), chapter_id, DIFFICULTIES[diff])] = (name, first, count)
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def string(self, idx):
+        start = self._blob_at + self._offsets[idx]
+        return str(self._view[start:self._blob_at + self._offsets[idx + 1]], "utf-8")
+
+    def pools(self):
+        """Every (subject, chapter_id, difficulty) key in the pack."""
+        return [(name, key[1], key[2]) for key, (name, _, _) in self._index.items()]
+
+    def _locate(self, subject, chapter_id, difficulty):
+        return self._index.get((subject.lower(), int(chapter_id), difficulty), (subject, 0, 0))
+
+    def pool_records(self, subject, chapter_id, difficulty):
+        """The raw record bytes of one pool, as a zero-copy memoryview."""
+        _, first, count = self._locate(subject, chapter_id, difficulty)
+        start = self._records_at + first * RECORD.size
+        return self._view[start:start + count * RECORD.size]
+
+    def pool(self, subject, chapter_id, difficulty):
+        """Decode one pool into Question records."""
+        subject = self._locate(subject, chapter_id, difficulty)[0]
+        out = []
+        for rec in RECORD.iter_unpack(self.pool_records(subject, chapter_id, difficulty)):
+            text, explanation, answer, n_opts = rec[:4]
+            ids = rec[4:4 + n_opts]
+            texts = rec[4 + MAX_OPTIONS:4 + MAX_OPTIONS + n_opts]
+            options = tuple((self.string(i), self.string(t)) for i, t in zip(ids, texts))
+            out.append(Question(
+                subject,
+                int(chapter_id),
+                difficulty,
+                self.string(text),
+                options,
+                options[answer][0] if answer < n_opts else "",
+                self.string(explanation),
+            ))
+        return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile raw_questions into a binary pack.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--out", default=DEFAULT_PACK)
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on malformed chapter files and schema errors")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        n_pools, n_questions, skipped = compile_pack(chapter_files(args.raw_dir), args.out, args.strict)
+    except PackError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for name, err in skipped:
+        print(f"[SKIPPED] {name}: {err}", file=sys.stderr)
+    size = os.path.getsize(args.out)
+    print(f"Wrote {args.out}: {n_pools} pools, {n_questions} questions, "
+          f"{size / 1024:.0f} KiB in {elapsed * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
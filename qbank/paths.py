@@ -0,0 +1,19 @@
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(ROOT, "student-app", "src", "data", "raw_questions")
+BUILD_DIR = os.path.join(ROOT, "build", "qbank")
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Files in RAW_DIR that are not real chapters
+IGNORED_FILES = {"template.xml"}
+
+
+def chapter_files(raw_dir=RAW_DIR):
+    """Every chapter XML file in raw_dir, sorted by name."""
+    return sorted(
+        os.path.join(raw_dir, name)
+        for name in os.listdir(raw_dir)
+        if name.endswith(".xml") and name not in IGNORED_FILES
+    )
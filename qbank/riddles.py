@@ -0,0 +1,268 @@
+"""Compile the mini-game riddle banks into small JSON chunks.
+
+RiddleCipher and MathMaze used to download and parse a whole XML bank
+(dist/data/riddles.xml, dist/data/math_riddles.xml) before showing the first
+level. This stage validates each bank and drops duplicates. It then writes the
+riddles in play order (easy, moderate, difficult, then by id) as chunks of
+--chunk-size riddles per game and difficulty, plus an index:
+
+    index.json                {"version": 1, "games": {game: {"source", "count",
+                               "chunks": [{"difficulty", "first", "count", "file"}]}}}
+    <game>_<difficulty>_<n>.json   {"game", "difficulty", "first", "riddles": [
+                               {"id", "difficulty", "question", "answer", "hint", "explanation"}]}
+
+first is the level index of a chunk's first riddle. A game fetches the index
+and the chunk holding its current level at start-up, and later chunks as the
+player reaches them. Chunks are written as .json and a precompressed .json.gz
+to student-app/public/data/riddles; the Android app gets them from the web
+build through `npx cap sync`. Without an index.json the games read the XML
+banks instead.
+
+A riddle is rejected when it has no positive integer id or a repeated id, when
+its difficulty is unknown, or when a field is missing or empty. It is also
+rejected when its answer cannot be typed on its game's keyboard (letters for
+RiddleCipher, digits and a leading minus for MathMaze), or when its question
+repeats an earlier riddle's.
+
+    python -m qbank.riddles [--source-dir dist/data] [--chunk-size 10] [--strict]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import NamedTuple
+
+from .paths import ROOT
+from .shards import write_if_changed
+
+SOURCE_DIR = os.path.join(ROOT, "dist", "data")
+DEFAULT_OUT = os.path.join(ROOT, "student-app", "public", "data", "riddles")
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+CHUNK_SIZE = 10  # the free levels fit in the first chunk
+
+RIDDLE_DIFFICULTIES = ("easy", "moderate", "difficult")
+FIELDS = ("question", "answer", "hint", "explanation")
+MAX_MAZE_ANSWER = 10  # MathMaze accepts at most 10 keypresses
+
+_SPACE = re.compile(r"\s+")
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+class Game(NamedTuple):
+    source: str  # file name in the source dir
+    answer_ok: object  # answer -> error message or None
+
+
+def _cipher_answer(answer):
+    if not answer.replace(" ", "").isalpha() or not answer.replace(" ", "").isascii():
+        return f"answer {answer!r} cannot be typed on the RiddleCipher keyboard (A-Z only)"
+    return None
+
+
+def _maze_answer(answer):
+    if not re.fullmatch(r"-?\d+", answer) or len(answer) > MAX_MAZE_ANSWER:
+        return f"answer {answer!r} cannot be typed on the MathMaze keypad (digits and -, up to 10)"
+    return None
+
+
+GAMES = {
+    "riddle_cipher": Game("riddles.xml", _cipher_answer),
+    "math_maze": Game("math_riddles.xml", _maze_answer),
+}
+
+
+class Riddle(NamedTuple):
+    id: int
+    difficulty: str
+    question: str
+    answer: str
+    hint: str
+    explanation: str
+
+
+def _dump(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def normalize(text):
+    return _SPACE.sub(" ", _PUNCT.sub("", text)).strip().lower()
+
+
+def riddle_problems(elem):
+    """(Riddle or None, problems) for one <riddle> element."""
+    problems = []
+    raw_id = elem.get("id", "")
+    try:
+        riddle_id = int(raw_id)
+    except ValueError:
+        riddle_id = 0
+    if riddle_id <= 0:
+        problems.append(f"id {raw_id!r} is not a positive integer")
+    difficulty = elem.get("difficulty", "").strip().lower()
+    if difficulty not in RIDDLE_DIFFICULTIES:
+        problems.append(f"unknown difficulty {difficulty!r}")
+
+    fields = {}
+    for child in elem:
+        if not isinstance(child.tag, str):
+            continue  # comments
+        if child.tag not in FIELDS:
+            problems.append(f"unexpected <{child.tag}>")
+        elif child.tag in fields:
+            problems.append(f"more than one <{child.tag}>")
+        else:
+            fields[child.tag] = _SPACE.sub(" ", "".join(child.itertext())).strip()
+    for name in FIELDS:
+        if not fields.get(name):
+            problems.append(f"missing or empty <{name}>")
+    if problems:
+        return None, problems
+    return Riddle(riddle_id, difficulty, *(fields[name] for name in FIELDS)), []
+
+
+def load_bank(path, game):
+    """(riddles in play order, [(riddle id, problem)]) for one bank file."""
+    root = ET.parse(path).getroot()
+    if root.tag != "riddles":
+        raise ValueError(f"root element is <{root.tag}>, expected <riddles>")
+    riddles, problems = [], []
+    ids, texts = set(), {}
+    for elem in root:
+        if not isinstance(elem.tag, str):
+            continue
+        where = elem.get("id", "?")
+        if elem.tag != "riddle":
+            problems.append((where, f"unexpected <{elem.tag}>"))
+            continue
+        riddle, errors = riddle_problems(elem)
+        if riddle and riddle.id in ids:
+            errors.append(f"id {riddle.id} is used twice")
+        if riddle and not errors:
+            error = game.answer_ok(riddle.answer)
+            if error:
+                errors.append(error)
+        if riddle and not errors:
+            key = normalize(riddle.question)
+            if key in texts:
+                errors.append(f"duplicate of riddle {texts[key]}")
+            else:
+                texts[key] = riddle.id
+        problems.extend((where, e) for e in errors)
+        if riddle and not errors:
+            ids.add(riddle.id)
+            riddles.append(riddle)
+    riddles.sort(key=lambda r: (RIDDLE_DIFFICULTIES.index(r.difficulty), r.id))
+    return riddles, problems
+
+
+def chunks(game_name, riddles, size=CHUNK_SIZE):
+    """(index entry, chunk document) per chunk, in play order."""
+    level = 0
+    for difficulty in RIDDLE_DIFFICULTIES:
+        group = [r for r in riddles if r.difficulty == difficulty]
+        for n, start in enumerate(range(0, len(group), size), 1):
+            part = group[start:start + size]
+            name = f"{game_name}_{difficulty}_{n}"
+            entry = {"difficulty": difficulty, "first": level, "count": len(part), "file": name}
+            doc = {"game": game_name, "difficulty": difficulty, "first": level,
+                   "riddles": [r._asdict() for r in part]}
+            level += len(part)
+            yield entry, doc
+
+
+class ChunkWriter:
+    """Writes chunk files and the index into one directory, removing stale chunks."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.keep = {INDEX_NAME}
+        self.written = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _write(self, fname, data):
+        self.written += write_if_changed(os.path.join(self.out_dir, fname), data)
+        self.keep.add(fname)
+
+    def write(self, name, doc):
+        data = _dump(doc)
+        self._write(f"{name}.json", data)
+        # mtime=0 keeps the compressed bytes identical across builds
+        self._write(f"{name}.json.gz", gzip.compress(data, 9, mtime=0))
+
+    def finish(self, index):
+        """Write index.json and remove stale chunks. Returns (written, removed)."""
+        self._write(INDEX_NAME, _dump(index))
+        removed = 0
+        for fname in os.listdir(self.out_dir):
+            if fname not in self.keep and fname.endswith((".json", ".json.gz")):
+                os.remove(os.path.join(self.out_dir, fname))
+                removed += 1
+        return self.written, removed
+
+
+def build(source_dir=SOURCE_DIR, out_dir=DEFAULT_OUT, size=CHUNK_SIZE):
+    """Compile every game's bank into out_dir.
+
+    Returns ({game: riddles kept}, {game: problems}, (written, removed), errors).
+    """
+    writer = ChunkWriter(out_dir)
+    games, counts, problems, errors = {}, {}, {}, {}
+    try:
+        with open(os.path.join(out_dir, INDEX_NAME), encoding="utf-8") as f:
+            previous = json.load(f).get("games", {})
+    except (OSError, ValueError):
+        previous = {}
+
+    for name, game in GAMES.items():
+        path = os.path.join(source_dir, game.source)
+        try:
+            riddles, problems[name] = load_bank(path, game)
+        except (OSError, ET.ParseError, ValueError) as e:
+            errors[game.source] = str(e)
+            continue
+        entries = []
+        for entry, doc in chunks(name, riddles, size):
+            entries.append(entry)
+            writer.write(entry["file"], doc)
+        games[name] = {"source": game.source, "count": len(riddles), "chunks": entries}
+        counts[name] = len(riddles)
+
+    # A bank that fails to parse keeps its last published chunks
+    for name, entry in previous.items():
+        if name not in games and GAMES.get(name) and GAMES[name].source in errors:
+            games[name] = entry
+            writer.keep.update(f"{c['file']}{ext}" for c in entry["chunks"] for ext in (".json", ".json.gz"))
+    result = writer.finish({"version": INDEX_VERSION, "games": games})
+    return counts, problems, result, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the riddle banks and compile them into chunks.")
+    parser.add_argument("--source-dir", default=SOURCE_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--strict", action="store_true", help="fail when any riddle is rejected")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts, problems, (written, removed), errors = build(args.source_dir, args.out, args.chunk_size)
+    for name, err in sorted(errors.items()):
+        print(f"[ERROR] {name}: {err}", file=sys.stderr)
+    for name, found in problems.items():
+        for riddle_id, problem in found:
+            print(f"[SKIPPED] {GAMES[name].source} riddle {riddle_id}: {problem}", file=sys.stderr)
+    for name, n in counts.items():
+        print(f"{name}: {n} riddles, {len(problems[name])} rejected")
+    print(f"{args.out}: {written} files written, {removed} removed")
+    print(f"Compiled {len(counts)} of {len(GAMES)} riddle banks in {(time.perf_counter() - start) * 1000:.0f} ms")
+    rejected = sum(len(p) for p in problems.values())
+    return 1 if errors or (args.strict and rejected) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
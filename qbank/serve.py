@@ -0,0 +1,379 @@
+"""Serve quiz sessions over HTTP from the compiled question pack.
+
+    GET /session/{subject}/{chapterId}/{difficulty}   25 questions, options shuffled
+    GET /metrics                                      cache hit rate and latency percentiles
+
+subject is the bank's subject name or one of the app's codes (phy, chem,
+math, bio, zoo). A session is {"pool", "size", "questions"}, and its questions
+have the shape startTestSession returns: {id, text, options: [{id, text}],
+answer, correctAnswer, explanation}. Options are shuffled per request and
+relabelled A, B, C..., and answer follows the correct option.
+
+Pools are decoded from the pack on first use and kept in an LRU bounded by
+--cache-mb. A cached question is stored as ready-encoded JSON fragments,
+with its options already rendered in every order, so serving a session is
+sampling and joining bytes, with no JSON encoding per request. When
+python -m qbank.sessions has precomputed topic-stratified sessions for a pool
+(--sessions DIR) and their poolHash matches the pack, a session is one of
+those rows; otherwise its questions are sampled uniformly. Connections
+are kept alive. Set VITE_SESSION_SERVER=http://localhost:8787 for the
+student app to try this server before Firestore.
+
+--load N runs N sessions against the server from the same process over
+--connections keep-alive connections and reports sessions per second.
+
+    python -m qbank.pack && python -m qbank.serve [--port 8787] [--cache-mb 64]
+                                                  [--load 20000 --connections 32]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from collections import Counter, OrderedDict
+from typing import NamedTuple
+from urllib.parse import unquote
+
+from .export import APP_CODES, bank_subject
+from .loader import question_problems
+from .manifest import pool_doc_id, pool_hash, question_ids
+from .pack import DEFAULT_PACK, PackError, PackReader
+from .paths import DIFFICULTIES
+from .sessions import DEFAULT_OUT as SESSIONS_DIR, decode_sessions
+
+SESSION_SIZE = 25
+LATENCY_WINDOW = 8192  # most recent requests kept for the percentiles
+
+LETTERS = "ABCDEFGHIJ"
+_OPTION_HEADS = [(b"," if i else b"") + f'{{"id":"{c}","text":'.encode() for i, c in enumerate(LETTERS)]
+_ANSWERS = [f'],"answer":"{c}","correctAnswer":"{c}",'.encode() for c in LETTERS]
+
+# Questions with up to this many options keep every shuffled rendering of them
+MAX_PRESHUFFLED = 4
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+class Prepared(NamedTuple):
+    head: bytes  # {"id":...,"text":...,"options":[
+    options: tuple  # each option's encoded text, closing its object
+    answer: int  # index of the correct option
+    tail: bytes  # "explanation":...}
+    shuffles: tuple  # options and answer rendered in every order, or () if there are too many
+
+    @property
+    def size(self):
+        return len(self.head) + len(self.tail) + sum(map(len, self.options)) + sum(map(len, self.shuffles))
+
+
+def _render_options(options, order, answer):
+    return b"".join([*(_OPTION_HEADS[slot] + options[j] for slot, j in enumerate(order)),
+                     _ANSWERS[order.index(answer)]])
+
+
+def prepare(qid, q):
+    ids = [opt_id for opt_id, _ in q.options]
+    options = tuple(_json(text) + b"}" for _, text in q.options)
+    answer = ids.index(q.answer)
+    shuffles = ()
+    if len(options) <= MAX_PRESHUFFLED:
+        shuffles = tuple(_render_options(options, order, answer)
+                         for order in itertools.permutations(range(len(options))))
+    return Prepared(
+        b'{"id":' + _json(qid) + b',"text":' + _json(q.text) + b',"options":[',
+        options,
+        answer,
+        b'"explanation":' + _json(q.explanation) + b"}",
+        shuffles,
+    )
+
+
+class Pool(NamedTuple):
+    doc_id: str
+    questions: list  # Prepared
+    size: int
+    sessions: tuple = ()  # precomputed rows of indices into questions
+
+
+class PoolCache:
+    """Prepared pools, least recently used first, bounded by their encoded size."""
+
+    def __init__(self, reader, max_bytes, sessions_dir=None):
+        self.reader = reader
+        self.max_bytes = max_bytes
+        self.sessions_dir = sessions_dir
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.precomputed = self.stale_sessions = 0
+        self._pools = OrderedDict()
+
+    def __len__(self):
+        return len(self._pools)
+
+    def get(self, subject, chapter_id, difficulty):
+        """The Pool, or None if the pack has no valid questions for it."""
+        key = (subject.lower(), chapter_id, difficulty)
+        pool = self._pools.get(key)
+        if pool is not None:
+            self.hits += 1
+            self._pools.move_to_end(key)
+            return pool
+        self.misses += 1
+        questions = self.reader.pool(subject, chapter_id, difficulty)
+        valid = [(qid, q) for qid, q in zip(question_ids(questions), questions)
+                 if not question_problems(q) and len(q.options) <= len(LETTERS)]
+        if not valid:
+            return None
+        doc_id = pool_doc_id(questions[0].subject, chapter_id, difficulty)
+        prepared = [prepare(qid, q) for qid, q in valid]
+        sessions = self._sessions(doc_id, [q for _, q in valid])
+        # A row costs about a pointer per index
+        pool = Pool(doc_id, prepared, sum(p.size for p in prepared) + sum(8 * len(r) for r in sessions),
+                    sessions)
+        self._pools[key] = pool
+        self.bytes += pool.size
+        # The newest pool always stays, even if it alone is over the limit
+        while self.bytes > self.max_bytes and len(self._pools) > 1:
+            _, old = self._pools.popitem(last=False)
+            self.bytes -= old.size
+            self.evictions += 1
+        return pool
+
+    def _sessions(self, doc_id, questions):
+        """The precomputed rows of a pool, or () if there are none for exactly these questions."""
+        if not self.sessions_dir:
+            return ()
+        try:
+            with open(os.path.join(self.sessions_dir, f"{doc_id}.json"), encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return ()
+        if doc.get("poolSize") != len(questions) or doc.get("poolHash") != pool_hash(questions):
+            self.stale_sessions += 1
+            return ()
+        self.precomputed += 1
+        return tuple(tuple(row) for row in decode_sessions(doc))
+
+
+def session_body(pool, rng, k=SESSION_SIZE):
+    """One session of pool as JSON bytes: a precomputed row or k sampled questions, options shuffled."""
+    if pool.sessions:
+        picked = [pool.questions[i] for i in pool.sessions[int(rng.random() * len(pool.sessions))]]
+    else:
+        picked = rng.sample(pool.questions, min(k, len(pool.questions)))
+    parts = [b'{"pool":"', pool.doc_id.encode(), b'","size":', str(len(picked)).encode(), b',"questions":[']
+    for i, p in enumerate(picked):
+        if i:
+            parts.append(b",")
+        parts.append(p.head)
+        if p.shuffles:
+            parts.append(p.shuffles[int(rng.random() * len(p.shuffles))])
+        else:
+            order = list(range(len(p.options)))
+            rng.shuffle(order)
+            parts.append(_render_options(p.options, order, p.answer))
+        parts.append(p.tail)
+    parts.append(b"]}")
+    return b"".join(parts)
+
+
+class Metrics:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.perf_counter()
+        self.statuses = Counter()
+        self.latencies = array("d", bytes(8 * window))
+        self.count = 0
+
+    def record(self, status, seconds):
+        self.statuses[status] += 1
+        self.latencies[self.count % len(self.latencies)] = seconds
+        self.count += 1
+
+    def snapshot(self, cache):
+        recent = sorted(self.latencies[:min(self.count, len(self.latencies))])
+        lookups = cache.hits + cache.misses
+        uptime = time.perf_counter() - self.started
+
+        def pct(p):
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else None
+
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests": self.count,
+            "requests_per_second": round(self.count / uptime, 1) if uptime else None,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99),
+                           "max": round(recent[-1] * 1000, 3) if recent else None},
+            "cache": {
+                "pools": len(cache),
+                "bytes": cache.bytes,
+                "max_bytes": cache.max_bytes,
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "evictions": cache.evictions,
+                "hit_rate": round(cache.hits / lookups, 4) if lookups else None,
+                "precomputed_sessions": cache.precomputed,
+                "stale_sessions": cache.stale_sessions,
+            },
+        }
+
+
+def _response(status, body, content_type=b"application/json", keep_alive=True):
+    return b"".join((
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n".encode(),
+        b"Content-Type: ", content_type, b"; charset=utf-8\r\n",
+        b"Content-Length: ", str(len(body)).encode(), b"\r\n",
+        b"Cache-Control: no-store\r\nAccess-Control-Allow-Origin: *\r\n",
+        b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n",
+        body,
+    ))
+
+
+def _error(message):
+    return _json({"error": message})
+
+
+class SessionServer:
+    def __init__(self, reader, max_bytes, seed=None, sessions_dir=None):
+        self.cache = PoolCache(reader, max_bytes, sessions_dir)
+        self.metrics = Metrics()
+        self.rng = random.Random(seed)
+
+    def route(self, method, target):
+        """(status, body) for one request."""
+        if method != b"GET":
+            return 405, _error("only GET is supported")
+        path = unquote(target.decode("latin-1").split("?", 1)[0])
+        parts = path.strip("/").split("/")
+        if parts == ["metrics"]:
+            return 200, _json(self.metrics.snapshot(self.cache))
+        if len(parts) != 4 or parts[0] != "session":
+            return 404, _error("expected /session/{subject}/{chapterId}/{difficulty} or /metrics")
+        _, subject, chapter_id, difficulty = parts
+        try:
+            chapter_id = int(chapter_id)
+        except ValueError:
+            return 400, _error(f"chapterId must be an integer, not {chapter_id!r}")
+        difficulty = difficulty.lower()
+        if difficulty not in DIFFICULTIES:
+            return 404, _error(f"unknown difficulty {difficulty!r}")
+        if subject.lower() in APP_CODES.values():
+            subject = bank_subject(subject.lower(), chapter_id)
+        pool = self.cache.get(subject, chapter_id, difficulty)
+        if pool is None:
+            return 404, _error(f"no questions for {subject} chapter {chapter_id} {difficulty}")
+        return 200, session_body(pool, self.rng)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                start = time.perf_counter()
+                line, _, headers = head.partition(b"\r\n")
+                try:
+                    method, target, version = line.split(b" ", 2)
+                except ValueError:
+                    writer.write(_response(400, _error("malformed request line"), keep_alive=False))
+                    self.metrics.record(400, time.perf_counter() - start)
+                    break
+                keep_alive = version.strip() == b"HTTP/1.1" and b"connection: close" not in headers.lower()
+                status, body = self.route(method, target)
+                writer.write(_response(status, body, keep_alive=keep_alive))
+                self.metrics.record(status, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _client(host, port, targets, n, rng, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            writer.write(b"GET " + rng.choice(targets) + b" HTTP/1.1\r\nHost: load\r\n\r\n")
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length: ", 1)[1].split(b"\r\n", 1)[0])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(host, port, targets, n, connections, seed=0):
+    """Run n requests over connections keep-alive connections. Returns (seconds, latencies)."""
+    rng = random.Random(seed)
+    latencies = []
+    per = [n // connections + (i < n % connections) for i in range(connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, targets, k, rng, latencies) for k in per if k))
+    return time.perf_counter() - start, latencies
+
+
+async def _main(args):
+    try:
+        reader = PackReader(args.pack)
+    except (OSError, PackError) as e:
+        print(f"ERROR: {e} (run python -m qbank.pack first)", file=sys.stderr)
+        return 1
+    app = SessionServer(reader, int(args.cache_mb * 1024 * 1024), args.seed, args.sessions)
+    server = await asyncio.start_server(app.handle, args.host, args.port, backlog=1024)
+    host, port = server.sockets[0].getsockname()[:2]
+    try:
+        if not args.load:
+            print(f"Serving {len(reader.pools())} pools from {args.pack} on http://{host}:{port}; "
+                  f"Ctrl+C to stop")
+            await server.serve_forever()
+            return 0
+        targets = [f"/session/{s}/{c}/{d}".encode() for s, c, d in reader.pools()]
+        seconds, latencies = await load(host, port, targets, args.load, args.connections, args.seed or 0)
+        latencies.sort()
+        stats = app.metrics.snapshot(app.cache)
+        print(f"{len(latencies)} sessions over {args.connections} connections in {seconds * 1000:.0f} ms, "
+              f"{len(latencies) / seconds:.0f} sessions/s")
+        print(f"client latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms; "
+              f"server p50 {stats['latency_ms']['p50']} ms, p99 {stats['latency_ms']['p99']} ms")
+        print(f"cache: {stats['cache']['pools']} pools, {stats['cache']['bytes'] / 1024:.0f} KiB, "
+              f"hit rate {stats['cache']['hit_rate']:.1%}, {stats['cache']['evictions']} evictions; "
+              f"{stats['cache']['precomputed_sessions']} pools with precomputed sessions, "
+              f"{stats['cache']['stale_sessions']} stale")
+        return 0
+    finally:
+        server.close()
+        await server.wait_closed()
+        reader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve quiz sessions from the compiled question pack.")
+    parser.add_argument("--pack", default=DEFAULT_PACK)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--cache-mb", type=float, default=64, help="size bound of the pool cache")
+    parser.add_argument("--seed", type=int, default=None, help="seed the session sampler")
+    parser.add_argument("--sessions", metavar="DIR", default=SESSIONS_DIR,
+                        help="precomputed sessions from python -m qbank.sessions (pass '' to always sample)")
+    parser.add_argument("--load", type=int, default=0, metavar="N",
+                        help="run N sessions against the server in-process, then exit")
+    parser.add_argument("--connections", type=int, default=32)
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
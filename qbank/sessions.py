@@ -0,0 +1,214 @@
+"""Precompute quiz sessions for every pool.
+
+startTestSession downloads a whole pool, shuffles it and keeps 25 questions.
+This stage does that work once, offline. For each (subject, chapterId,
+difficulty) pool it writes a fixed number of sessions. Each session is a row
+of indices into the pool, packed as uint8/uint16 and base64-encoded. Serving
+a quiz is then picking a row.
+
+Sessions are stratified by the topic recorded on generated questions. Every
+topic gets at least one slot when the session is large enough to hold them
+all, and the remaining slots are shared out in proportion to topic size.
+Within a topic, questions are dealt from a shuffled deck that is only
+reshuffled once exhausted, so every question is served about equally often.
+
+Rows index a pool's valid questions only, the ones the shards and qbank.serve
+keep (see loader.question_problems), and poolHash is the pool_hash of exactly
+those questions. qbank.serve picks its sessions from these rows when a pool's
+poolHash matches the pack, and samples them itself otherwise. The app reads
+no session files directly. Files are rewritten only when they change, and
+the files of pools that no longer exist are removed.
+
+    python -m qbank.sessions [--sessions 64] [--size 25] [--out build/qbank/sessions]
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import defaultdict
+
+from .loader import load_chapter, question_problems, read_header
+from .manifest import pool_doc_id, pool_hash
+from .paths import BUILD_DIR, DIFFICULTIES, RAW_DIR, chapter_files
+from .shards import write_if_changed
+
+SESSION_SIZE = 25
+SESSIONS_PER_POOL = 64
+DEFAULT_OUT = os.path.join(BUILD_DIR, "sessions")
+
+
+def allocate(topic_sizes, k, rng):
+    """Slots per topic for a session of k questions.
+
+    Each topic gets the floor of its proportional share; the leftover slots go
+    to topics drawn at random, weighted by their fractional share, so that
+    over many sessions every topic averages its exact share.
+    """
+    total = sum(topic_sizes.values())
+    k = min(k, total)
+    quota = dict.fromkeys(topic_sizes, 1 if k >= len(topic_sizes) else 0)
+    spare = {t: n - quota[t] for t, n in topic_sizes.items()}
+    spare_total = sum(spare.values())
+    left = k - sum(quota.values())
+    if not left or not spare_total:
+        return quota
+
+    fractions = {}
+    for t, n in spare.items():
+        share = left * n / spare_total
+        quota[t] += int(share)
+        fractions[t] = share - int(share)
+    left = k - sum(quota.values())
+    # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+    keys = {t: rng.random() ** (1 / f) if f else -1.0 for t, f in fractions.items()}
+    ranked = sorted(fractions, key=keys.get, reverse=True)
+    for t in ranked:
+        if not left:
+            break
+        if quota[t] < topic_sizes[t]:
+            quota[t] += 1
+            left -= 1
+    return quota
+
+
+class _Deck:
+    """Deals a topic's question indices in shuffled order, reshuffling when empty."""
+
+    def __init__(self, indices, rng):
+        self.indices = list(indices)
+        self.rng = rng
+        self.cards = []
+
+    def deal(self, n):
+        hand = []
+        while len(hand) < n:
+            if not self.cards:
+                self.cards = self.indices[:]
+                self.rng.shuffle(self.cards)
+                # Never repeat a question within one session across a reshuffle
+                # (cards are dealt from the end of the list)
+                self.cards = [c for c in self.cards if c in hand] + [c for c in self.cards if c not in hand]
+            hand.append(self.cards.pop())
+        return hand
+
+
+def sample_sessions(topics, n_sessions=SESSIONS_PER_POOL, k=SESSION_SIZE, seed=0):
+    """n_sessions rows of k distinct pool indices. topics[i] is question i's topic."""
+    rng = random.Random(seed)
+    by_topic = defaultdict(list)
+    for i, topic in enumerate(topics):
+        by_topic[topic].append(i)
+    sizes = {t: len(ix) for t, ix in by_topic.items()}
+    decks = {t: _Deck(ix, rng) for t, ix in by_topic.items()}
+
+    rows = []
+    for _ in range(n_sessions):
+        quota = allocate(sizes, k, rng)
+        row = [i for t in by_topic for i in decks[t].deal(quota[t])]
+        rng.shuffle(row)
+        rows.append(row)
+    return rows
+
+
+def encode_sessions(rows, pool_size):
+    code = "B" if pool_size <= 0xFF else ("H" if pool_size <= 0xFFFF else "I")
+    packed = array(code, (i for row in rows for i in row))
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return code, base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def decode_sessions(doc):
+    """The rows of a session document, as lists of pool indices."""
+    packed = array(doc["type"])
+    packed.frombytes(base64.b64decode(doc["sessions"]))
+    if sys.byteorder != "little":
+        packed.byteswap()
+    k = doc["sessionSize"]
+    return [packed[i:i + k].tolist() for i in range(0, len(packed), k)]
+
+
+def valid_questions(questions):
+    """The questions of a pool that session rows index."""
+    return [q for q in questions if not question_problems(q)]
+
+
+def pool_sessions(subject, chapter_id, difficulty, questions, n_sessions, k):
+    """The session document of one pool; questions must already be valid_questions."""
+    digest = pool_hash(questions)
+    rows = sample_sessions([q.topic for q in questions], n_sessions, k, seed=int(digest[:16], 16))
+    code, blob = encode_sessions(rows, len(questions))
+    return {
+        "pool": pool_doc_id(subject, chapter_id, difficulty),
+        "poolHash": digest,
+        "poolSize": len(questions),
+        "sessionSize": min(k, len(questions)),
+        "count": len(rows),
+        "type": code,
+        "sessions": blob,
+    }
+
+
+def build(files, out_dir=DEFAULT_OUT, n_sessions=SESSIONS_PER_POOL, k=SESSION_SIZE):
+    """Write one {pool}.json session document per pool and remove stale ones.
+
+    Returns (pools, written, removed, errors). A chapter that fails to parse
+    keeps its previous session files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    keep = set()
+    pools = written = 0
+    errors = {}
+    for path in files:
+        try:
+            chapter = load_chapter(path)
+        except (ET.ParseError, ValueError) as e:
+            errors[os.path.basename(path)] = str(e)
+            try:
+                subject, chapter_id, _ = read_header(path)
+                if chapter_id is not None:
+                    keep.update(f"{pool_doc_id(subject, chapter_id, d)}.json" for d in DIFFICULTIES)
+            except (ET.ParseError, ValueError):
+                pass
+            continue
+        for diff in DIFFICULTIES:
+            questions = valid_questions(chapter.pools[diff])
+            if not questions:
+                continue
+            doc = pool_sessions(chapter.subject, chapter.chapter_id, diff, questions, n_sessions, k)
+            name = f"{doc['pool']}.json"
+            written += write_if_changed(os.path.join(out_dir, name), json.dumps(doc).encode("utf-8"))
+            keep.add(name)
+            pools += 1
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith(".json") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return pools, written, removed, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute topic-stratified quiz sessions.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--sessions", type=int, default=SESSIONS_PER_POOL)
+    parser.add_argument("--size", type=int, default=SESSION_SIZE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    pools, written, removed, errors = build(chapter_files(args.raw_dir), args.out, args.sessions, args.size)
+    for name, err in sorted(errors.items()):
+        print(f"[SKIPPED] {name}: {err}", file=sys.stderr)
+    print(f"Sessions for {pools} pools in {args.out}: {written} files written, {removed} removed "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Compile the bank into static JSON shards for the app's offline fallback.
+
+When Firestore is unreachable, startTestSession used to fetch and parse the
+chapter XML files one by one until it found the chapter it wanted. This stage
+does that work at build time instead. It writes one shard per
+(subject, chapterId, difficulty) holding the pool's questions already in quiz
+format, plus a small index.json that maps each chapterId to its shards:
+
+    {"version": 1, "chapters": {"301": [{"subject": "Biology", "name": "...",
+                                         "pools": {"easy": "biology_301_easy", ...}}]}}
+
+Each shard is written as <pool>.json and as a precompressed <pool>.json.gz.
+Questions that would fail the app's own validation are dropped here rather
+than at runtime. Shards are only rewritten when their bytes change, and shards
+that no longer belong to any pool are removed.
+
+    python -m qbank.shards [--raw-dir DIR] [--out student-app/public/data/shards]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from .loader import load_chapter, question_problems
+from .manifest import pool_doc_id, question_ids
+from .paths import DIFFICULTIES, RAW_DIR, ROOT, chapter_files
+
+DEFAULT_OUT = os.path.join(ROOT, "student-app", "public", "data", "shards")
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+def quiz_question(qid, q):
+    """One question in the format QuizInterface consumes."""
+    return {
+        "id": qid,
+        "text": q.text,
+        "options": [{"id": opt_id, "text": text} for opt_id, text in q.options],
+        "answer": q.answer,
+        "explanation": q.explanation,
+    }
+
+
+def shard_document(chapter_id, difficulty, questions):
+    """A pool in the question format QuizInterface consumes."""
+    return {
+        "chapterId": chapter_id,
+        "difficulty": difficulty,
+        "questions": [
+            quiz_question(qid, q)
+            for qid, q in zip(question_ids(questions), questions)
+            if not question_problems(q)
+        ],
+    }
+
+
+def write_if_changed(path, data):
+    """Write data to path unless it already holds exactly that. Returns True if written."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class ShardWriter:
+    """Writes the shards of one chapter at a time, then the index."""
+
+    def __init__(self, out_dir=DEFAULT_OUT):
+        self.out_dir = out_dir
+        self.chapters = {}
+        self.keep = {INDEX_NAME}
+        self.shards = 0
+        self.written = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _write(self, fname, data):
+        self.written += write_if_changed(os.path.join(self.out_dir, fname), data)
+        self.keep.add(fname)
+
+    def add(self, chapter):
+        pools = {}
+        for diff in DIFFICULTIES:
+            doc = shard_document(chapter.chapter_id, diff, chapter.pools[diff])
+            if not doc["questions"]:
+                continue
+            name = pool_doc_id(chapter.subject, chapter.chapter_id, diff)
+            data = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self._write(f"{name}.json", data)
+            # mtime=0 keeps the compressed bytes identical across builds
+            self._write(f"{name}.json.gz", gzip.compress(data, 9, mtime=0))
+            pools[diff] = name
+            self.shards += 1
+        if pools:
+            self.chapters.setdefault(str(chapter.chapter_id), []).append(
+                {"subject": chapter.subject, "name": chapter.name, "pools": pools})
+
+    def finish(self):
+        """Write index.json and remove stale shards. Returns (shards, written, removed)."""
+        chapters = dict(sorted(self.chapters.items(), key=lambda kv: int(kv[0])))
+        index = {"version": INDEX_VERSION, "chapters": chapters}
+        self._write(INDEX_NAME, json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+        removed = 0
+        for fname in os.listdir(self.out_dir):
+            if fname not in self.keep and fname.endswith((".json", ".json.gz")):
+                os.remove(os.path.join(self.out_dir, fname))
+                removed += 1
+        return self.shards, self.written, removed
+
+
+def build(files, out_dir=DEFAULT_OUT):
+    """Write shards and index.json for files. Returns (shards, written, removed, errors)."""
+    writer = ShardWriter(out_dir)
+    errors = {}
+    for path in files:
+        try:
+            writer.add(load_chapter(path))
+        except (ET.ParseError, ValueError) as e:
+            errors[os.path.basename(path)] = str(e)
+    return (*writer.finish(), errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write static JSON pool shards for the app.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    shards, written, removed, errors = build(chapter_files(args.raw_dir), args.out)
+    for name, err in sorted(errors.items()):
+        print(f"[SKIPPED] {name}: {err}", file=sys.stderr)
+    print(f"{shards} shards in {args.out}: {written} files written, {removed} removed "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""Versioned per-pool manifests and deltas, for clients that cache questions offline.
+
+Every question has a stable content id (qbank.manifest.question_id), so
+inserting a question no longer renumbers the rest of its pool. For each pool
+this stage publishes under student-app/public/data/sync/<pool>/:
+
+    v<N>.json         manifest of version N: {"pool", "version", "hash",
+                      "questions": {id: content hash}}
+    <K>-<N>.json      delta from version K to the current version N:
+                      {"pool", "from", "to", "add": [...], "modify": [...], "remove": [ids]}
+
+plus index.json, {"version": 1, "pools": {pool: {"version", "hash", "count"}}}.
+A pool gets a new version whenever its content hash changes. Deltas are
+kept from the last --keep versions, and 0-<N>.json holds the whole pool. A
+client holding version K fetches <K>-<N>.json, or 0-<N>.json if that is
+missing, and applies it to its cache. added and modified questions are full
+questions in the shard format.
+
+    python -m qbank.sync [--raw-dir DIR] [--out student-app/public/data/sync] [--keep 8]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from .loader import load_chapter, question_problems, read_header
+from .manifest import pool_doc_id, pool_hash, question_hash, question_ids
+from .paths import DIFFICULTIES, RAW_DIR, ROOT, chapter_files
+from .shards import write_if_changed, quiz_question
+
+DEFAULT_OUT = os.path.join(ROOT, "student-app", "public", "data", "sync")
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+KEEP = 8
+
+_MANIFEST = re.compile(r"^v(\d+)\.json$")
+
+
+def _dump(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def pool_versions(pool_dir):
+    """Manifest versions kept in pool_dir, oldest first."""
+    try:
+        names = os.listdir(pool_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_MANIFEST.match, names) if m)
+
+
+def delta(pool, old, new, questions):
+    """Delta document from manifest old (None for an empty cache) to manifest new."""
+    before = old["questions"] if old else {}
+    after = new["questions"]
+    return {
+        "pool": pool,
+        "from": old["version"] if old else 0,
+        "to": new["version"],
+        "add": [questions[qid] for qid in after if qid not in before],
+        "modify": [questions[qid] for qid, h in after.items() if qid in before and before[qid] != h],
+        "remove": [qid for qid in before if qid not in after],
+    }
+
+
+def publish_pool(pool_dir, pool, questions, keep=KEEP):
+    """Version one pool. Returns (version, changed, files written)."""
+    ids = question_ids(questions)
+    valid = [(qid, q) for qid, q in zip(ids, questions) if not question_problems(q)]
+    manifest = {
+        "pool": pool,
+        "version": 0,
+        "hash": pool_hash([q for _, q in valid]),
+        "questions": {qid: question_hash(q) for qid, q in valid},
+    }
+    versions = pool_versions(pool_dir)
+    latest = _read(os.path.join(pool_dir, f"v{versions[-1]}.json")) if versions else None
+    if latest and latest["hash"] == manifest["hash"]:
+        return latest["version"], False, 0
+    version = manifest["version"] = latest["version"] + 1 if latest else 1
+
+    os.makedirs(pool_dir, exist_ok=True)
+    docs = {qid: quiz_question(qid, q) for qid, q in valid}
+    written = write_if_changed(os.path.join(pool_dir, f"v{version}.json"), _dump(manifest))
+    kept = {f"v{version}.json"}
+    # versions[-keep:] would be every version for keep=0
+    for old_version in [0] + versions[len(versions) - keep:]:
+        old = _read(os.path.join(pool_dir, f"v{old_version}.json")) if old_version else None
+        name = f"{old_version}-{version}.json"
+        written += write_if_changed(os.path.join(pool_dir, name), _dump(delta(pool, old, manifest, docs)))
+        kept.add(name)
+        if old_version:
+            kept.add(f"v{old_version}.json")
+    for name in os.listdir(pool_dir):
+        if name not in kept:
+            os.remove(os.path.join(pool_dir, name))
+    return version, True, written
+
+
+def publish(files, out_dir=DEFAULT_OUT, keep=KEEP):
+    """Version every pool in files. Returns (index, changed pools, files written, removed pools, errors)."""
+    os.makedirs(out_dir, exist_ok=True)
+    pools, errors, failed = {}, {}, set()
+    changed = written = 0
+    for path in files:
+        try:
+            chapter = load_chapter(path)
+        except (ET.ParseError, ValueError) as e:
+            errors[os.path.basename(path)] = str(e)
+            try:
+                subject, chapter_id, _ = read_header(path)
+                if chapter_id is not None:
+                    failed.update(pool_doc_id(subject, chapter_id, d) for d in DIFFICULTIES)
+            except (ET.ParseError, ValueError):
+                pass
+            continue
+        for diff in DIFFICULTIES:
+            questions = chapter.pools[diff]
+            if not questions:
+                continue
+            pool = pool_doc_id(chapter.subject, chapter.chapter_id, diff)
+            version, pool_changed, n = publish_pool(os.path.join(out_dir, pool), pool, questions, keep)
+            manifest = _read(os.path.join(out_dir, pool, f"v{version}.json"))
+            pools[pool] = {"version": version, "hash": manifest["hash"], "count": len(manifest["questions"])}
+            changed += pool_changed
+            written += n
+
+    # A chapter that fails to parse keeps its last published pools
+    previous = (_read(os.path.join(out_dir, INDEX_NAME)) or {}).get("pools", {})
+    removed = 0
+    for name in sorted(os.listdir(out_dir)):
+        pool_dir = os.path.join(out_dir, name)
+        if not os.path.isdir(pool_dir) or name in pools:
+            continue
+        if name in failed and name in previous:
+            pools[name] = previous[name]
+            continue
+        shutil.rmtree(pool_dir)
+        removed += 1
+
+    index = {"version": INDEX_VERSION, "pools": dict(sorted(pools.items()))}
+    written += write_if_changed(os.path.join(out_dir, INDEX_NAME), _dump(index))
+    return index, changed, written, removed, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish versioned pool manifests and deltas.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--keep", type=int, default=KEEP, help="older versions to keep deltas from")
+    args = parser.parse_args(argv)
+    if args.keep < 0:
+        parser.error("--keep must be 0 or more")
+
+    start = time.perf_counter()
+    index, changed, written, removed, errors = publish(chapter_files(args.raw_dir), args.out, args.keep)
+    for name, err in sorted(errors.items()):
+        print(f"[SKIPPED] {name}: {err}", file=sys.stderr)
+    print(f"{len(index['pools'])} pools in {args.out}: {changed} new versions, {removed} removed, "
+          f"{written} files written in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
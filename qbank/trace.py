@@ -0,0 +1,326 @@
+"""Per-stage spans and counters for the toolchain, exported once per run.
+
+Tools mark their stages with span() and count(). Tracing is off by default,
+and then a span costs one check. With --trace, every span records its wall
+time, its time minus its children's, and attributes such as the number of
+questions or bytes it handled. Spans from worker processes are shipped back
+with their results (see remote and collect), so a parallel run still produces
+one trace. At exit DIR gets:
+
+    <tool>-<stamp>.trace.json   Chrome trace events; open in Perfetto or chrome://tracing.
+                                Counters, per-span totals and memory go in "otherData".
+    <tool>-<stamp>.folded       collapsed stacks with self time in microseconds,
+                                for flamegraph.pl or speedscope
+    <tool>-<stamp>.pstats       with --profile: cProfile of the main process
+                                (pass --workers 1 to profile the pool work too)
+
+--tracemalloc adds the allocated memory of every span and the largest
+allocation sites of the run.
+
+    python -m qbank.generate --force --trace [DIR] [--profile] [--tracemalloc]
+"""
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import partial
+from typing import NamedTuple
+
+from .paths import BUILD_DIR
+
+TRACE_DIR = os.path.join(BUILD_DIR, "trace")
+TOP_ALLOCATIONS = 10
+
+_tracer = None
+# The open spans of the current thread or task, innermost last
+_stack = contextvars.ContextVar("qbank_trace_stack", default=())
+
+
+class Span(NamedTuple):
+    stack: tuple  # span names from the root, ending with this span's
+    pid: int
+    tid: int
+    start_ns: int  # wall clock, comparable across processes
+    duration_ns: int
+    self_ns: int  # duration minus the time of child spans
+    attrs: dict
+
+
+class _Frame:
+    __slots__ = ("name", "child_ns")
+
+    def __init__(self, name):
+        self.name = name
+        self.child_ns = 0
+
+
+class Tracer:
+    def __init__(self, memory=False, prefix=()):
+        self.memory = memory
+        self.prefix = tuple(prefix)
+        self.spans = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def options(self):
+        return {"memory": self.memory}
+
+    def _record(self, stack, start_ns, duration_ns, self_ns, attrs):
+        span = Span(self.prefix + tuple(f.name for f in stack), os.getpid(), threading.get_ident(),
+                    start_ns, duration_ns, max(self_ns, 0), attrs)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, attrs):
+        frame = _Frame(name)
+        parent = _stack.get()
+        token = _stack.set(parent + (frame,))
+        mem = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        start_ns = time.time_ns()
+        t0 = time.perf_counter_ns()
+        try:
+            yield attrs
+        finally:
+            duration = time.perf_counter_ns() - t0
+            _stack.reset(token)
+            if self.memory:
+                attrs["alloc_kb"] = round((tracemalloc.get_traced_memory()[0] - mem) / 1024, 1)
+            if parent:
+                parent[-1].child_ns += duration
+            self._record(parent + (frame,), start_ns, duration, duration - frame.child_ns, attrs)
+
+    def iterate(self, name, iterable, unit, attrs):
+        """iterable, recording the time spent producing its items as one span.
+
+        The span sits under the span that was open when iterate was called, and
+        its time is taken from whichever span consumes the items.
+        """
+        return self._iterate(_stack.get() + (_Frame(name),), iterable, unit, attrs)
+
+    def _iterate(self, stack, iterable, unit, attrs):
+        start_ns = time.time_ns()
+        spent = items = 0
+        it = iter(iterable)
+        while True:
+            t0 = time.perf_counter_ns()
+            try:
+                item = next(it)
+            except StopIteration:
+                break
+            finally:
+                elapsed = time.perf_counter_ns() - t0
+                spent += elapsed
+                consumer = _stack.get()
+                if consumer:
+                    consumer[-1].child_ns += elapsed
+            items += 1
+            yield item
+        attrs[unit] = items
+        self._record(stack, start_ns, spent, spent, attrs)
+
+    def count(self, name, n):
+        with self._lock:
+            self.counters[name] += n
+
+    def absorb(self, spans, counters):
+        with self._lock:
+            self.spans.extend(Span(*s) for s in spans)
+            self.counters.update(counters)
+
+
+def enabled():
+    return _tracer is not None
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the block as a span. Yields its attribute dict, which the block may add to."""
+    if _tracer is None:
+        yield attrs
+        return
+    with _tracer.span(name, attrs) as a:
+        yield a
+
+
+def iterate(name, iterable, unit="items", **attrs):
+    """iterable, with the time spent producing its items recorded as a span when tracing.
+
+    The span's attribute unit holds the number of items.
+    """
+    if _tracer is None:
+        return iterable
+    return _tracer.iterate(name, iterable, unit, attrs)
+
+
+def count(name, n=1):
+    if _tracer is not None:
+        _tracer.count(name, n)
+
+
+def _call_traced(options, prefix, fn, *args, **kwargs):
+    global _tracer
+    _tracer = Tracer(prefix=prefix, **options)
+    # A forked worker starts with a copy of the parent's open spans
+    token = _stack.set(())
+    try:
+        result = fn(*args, **kwargs)
+        return result, [tuple(s) for s in _tracer.spans], dict(_tracer.counters)
+    finally:
+        _stack.reset(token)
+        _tracer = None
+
+
+def remote(fn):
+    """fn, wrapped to record its spans when it runs in a worker process. Pair with collect()."""
+    if _tracer is None:
+        return fn
+    prefix = _tracer.prefix + tuple(f.name for f in _stack.get())
+    return partial(_call_traced, _tracer.options, prefix, fn)
+
+
+def collect(result):
+    """The result of a remote() call, after merging its worker's spans into this run."""
+    if _tracer is None:
+        return result
+    result, spans, counters = result
+    _tracer.absorb(spans, counters)
+    return result
+
+
+def start(memory=False):
+    global _tracer
+    _tracer = Tracer(memory=memory)
+    return _tracer
+
+
+def stop():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and tracer.memory:
+        tracemalloc.stop()
+    return tracer
+
+
+def totals(spans):
+    """{span name: {"count", "ms", "self_ms", ...summed numeric attrs}}, slowest first."""
+    by_name = defaultdict(Counter)
+    for s in spans:
+        t = by_name[s.stack[-1]]
+        t["count"] += 1
+        t["ms"] += s.duration_ns / 1e6
+        t["self_ms"] += s.self_ns / 1e6
+        for key, value in s.attrs.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                t[key] += value
+    out = {}
+    for name, t in sorted(by_name.items(), key=lambda kv: -kv[1]["self_ms"]):
+        t = {k: round(v, 3) if isinstance(v, float) else v for k, v in t.items()}
+        if t.get("questions") and t["ms"]:
+            t["questions_per_second"] = round(t["questions"] / t["ms"] * 1000)
+        out[name] = t
+    return out
+
+
+def chrome_trace(spans, origin_ns, other):
+    events = [{
+        "name": s.stack[-1],
+        "ph": "X",
+        "ts": (s.start_ns - origin_ns) / 1000,
+        "dur": s.duration_ns / 1000,
+        "pid": s.pid,
+        "tid": s.tid,
+        "args": s.attrs,
+    } for s in sorted(spans, key=lambda s: s.start_ns)]
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": other}
+
+
+def folded(spans):
+    """Collapsed stack lines, "root;child;leaf <self microseconds>"."""
+    stacks = Counter()
+    for s in spans:
+        stacks[";".join(s.stack)] += s.self_ns // 1000
+    return "".join(f"{stack} {us}\n" for stack, us in sorted(stacks.items()) if us)
+
+
+def _top_allocations(limit=TOP_ALLOCATIONS):
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+    return [{"where": str(s.traceback), "kb": round(s.size / 1024, 1), "blocks": s.count} for s in stats]
+
+
+def _write(path, text):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("tracing")
+    group.add_argument("--trace", metavar="DIR", nargs="?", const=TRACE_DIR,
+                       help=f"write a span trace and folded stacks for this run (default {TRACE_DIR})")
+    group.add_argument("--profile", action="store_true", help="also write a cProfile .pstats (implies --trace)")
+    group.add_argument("--tracemalloc", action="store_true",
+                       help="also record memory allocated per span (implies --trace)")
+
+
+@contextmanager
+def run(tool, args):
+    """Trace the block as one run of tool if args asked for it, then write the trace files."""
+    if not (args.trace or args.profile or args.tracemalloc):
+        yield
+        return
+    out_dir = args.trace or TRACE_DIR
+    base = os.path.join(out_dir, f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}")
+    root = f"qbank.{tool}"
+    tracer = start(memory=args.tracemalloc)
+    profiler = cProfile.Profile() if args.profile else None
+    origin = time.time_ns()
+    try:
+        if profiler:
+            profiler.enable()
+        with span(root):
+            yield
+    finally:
+        if profiler:
+            profiler.disable()
+        memory = None
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory = {"current_kb": round(current / 1024, 1), "peak_kb": round(peak / 1024, 1),
+                      "top": _top_allocations()}
+        stop()
+        seconds = (time.time_ns() - origin) / 1e9
+        counters = dict(sorted(tracer.counters.items()))
+        other = {"tool": root, "argv": sys.argv[1:], "seconds": round(seconds, 4), "counters": counters,
+                 "per_second": {k: round(v / seconds) for k, v in counters.items()} if seconds else {},
+                 "spans": totals(tracer.spans), "memory": memory}
+        os.makedirs(out_dir, exist_ok=True)
+        paths = [base + ".trace.json", base + ".folded"]
+        _write(paths[0], json.dumps(chrome_trace(tracer.spans, origin, other), ensure_ascii=False))
+        _write(paths[1], folded(tracer.spans))
+        if profiler:
+            paths.append(base + ".pstats")
+            profiler.dump_stats(paths[-1])
+        print_summary(other, paths)
+
+
+def print_summary(other, paths, file=sys.stderr):
+    rates = other["per_second"]
+    print(f"Trace of {other['tool']}: {other['seconds'] * 1000:.0f} ms; "
+          + ", ".join(f"{k} {v} ({rates.get(k, 0)}/s)" for k, v in other["counters"].items()), file=file)
+    for name, t in other["spans"].items():
+        rate = f"  {t['questions_per_second']:>8} q/s" if "questions_per_second" in t else ""
+        print(f"    {name:<20} {t['count']:>6}x {t['ms']:>9.1f} ms  self {t['self_ms']:>9.1f} ms{rate}",
+              file=file)
+    if other["memory"]:
+        print(f"    peak traced memory {other['memory']['peak_kb'] / 1024:.1f} MiB", file=file)
+    print(f"Wrote {', '.join(paths)}", file=file)
@@ -0,0 +1,170 @@
+"""Upload compiled question pools to question_pools/{subject}_{chapterId}_{difficulty}.
+
+Pools are read from the compiled pack, packed into batches of up to 500
+writes, and several batches are committed at once under a bounded semaphore.
+Failed batches are retried with exponential backoff. By default only the pools
+listed in the pending pool diff are written; pass --all for a full refresh.
+The diff is refused when the pack was compiled from a different bank than the
+manifest the diff came from, and only the pools written are taken off it.
+
+    python -m qbank.pack && python -m qbank.upload --backend file --target build/qbank/emulator
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from . import manifest as mf
+from . import trace
+from .backends import make_backend
+from .pack import DEFAULT_PACK, PackReader
+
+COLLECTION = "question_pools"
+
+
+def pool_document(subject, chapter_id, difficulty, questions):
+    """A pool document in the schema uploadQuestions.js writes."""
+    return {
+        "subject": subject,
+        "chapterId": chapter_id,
+        "difficulty": difficulty,
+        "version": 1,
+        "questions": [
+            {
+                "id": qid,
+                "text": q.text,
+                "options": [{"id": opt_id, "text": text} for opt_id, text in q.options],
+                "correctAnswer": q.answer,
+                "explanation": q.explanation,
+            }
+            for qid, q in zip(mf.question_ids(questions), questions)
+        ],
+    }
+
+
+def pool_writes(reader, only=None):
+    """("set", collection, doc_id, doc) for every pool in the pack, or only those in only."""
+    for subject, chapter_id, difficulty in reader.pools():
+        doc_id = mf.pool_doc_id(subject, chapter_id, difficulty)
+        if only is not None and doc_id not in only:
+            continue
+        questions = reader.pool(subject, chapter_id, difficulty)
+        yield "set", COLLECTION, doc_id, pool_document(subject, chapter_id, difficulty, questions)
+
+
+def batches(writes, max_writes, max_bytes):
+    """Group writes so that no batch exceeds max_writes or roughly max_bytes."""
+    batch, size = [], 0
+    for write in writes:
+        n = len(json.dumps(write[3], ensure_ascii=False)) if write[3] else 0
+        if batch and (len(batch) >= max_writes or size + n > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(write)
+        size += n
+    if batch:
+        yield batch
+
+
+async def commit_with_retry(backend, batch, retries=5, base_delay=0.2, stats=None):
+    for attempt in range(retries + 1):
+        try:
+            await backend.commit(batch)
+            return
+        except backend.transient_errors:
+            if attempt == retries:
+                raise
+            if stats is not None:
+                stats["retries"] += 1
+            # Full jitter keeps concurrent retries from landing together
+            await asyncio.sleep(random.uniform(0, base_delay * 2 ** attempt))
+
+
+async def upload(backend, writes, batch_size=None, concurrency=8, retries=5):
+    """Commit writes in concurrent batches. Returns stats for the run."""
+    batch_size = min(batch_size or backend.max_batch_writes, backend.max_batch_writes)
+    stats = {"docs": 0, "batches": 0, "retries": 0}
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run(batch):
+        async with sem:
+            with trace.span("upload.batch", docs=len(batch)):
+                await commit_with_retry(backend, batch, retries, stats=stats)
+        stats["docs"] += len(batch)
+        stats["batches"] += 1
+        trace.count("documents_uploaded", len(batch))
+
+    start = time.perf_counter()
+    with trace.span("upload") as attrs:
+        tasks = [asyncio.create_task(run(b)) for b in batches(writes, batch_size, backend.max_batch_bytes)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+        attrs.update(docs=stats["docs"], batches=stats["batches"], retries=stats["retries"])
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+async def _main(args):
+    only = None
+    deletes = []
+    with PackReader(args.pack) as reader:
+        if not args.all:
+            pending = mf.load_pending_diff(args.diff)
+            only = set(pending["upsert"])
+            deletes = [("delete", COLLECTION, doc_id, None) for doc_id in pending["delete"]]
+            # The diff names pools, the pack holds their content: both must come from one bank
+            if (only or deletes) and pending.get("bank") != reader.bank_hash.hex():
+                print(f"[ERROR] {args.pack} was not compiled from the bank {args.diff} describes; "
+                      "run python -m qbank.manifest and python -m qbank.pack first", file=sys.stderr)
+                return 1
+        writes = [*pool_writes(reader, only), *deletes]
+    if not writes:
+        print("Nothing to upload.")
+        return 0
+
+    backend = make_backend(args.backend, args.target, args.latency)
+    try:
+        stats = await upload(backend, writes, args.batch_size, args.concurrency, args.retries)
+    finally:
+        await backend.close()
+
+    # The memory backend is throwaway; keep the diff for a real upload
+    if not args.all and args.backend != "memory":
+        upserted = {doc_id for op, _, doc_id, _ in writes if op == "set"}
+        left = mf.settle_pending_diff(upserted, {doc_id for _, _, doc_id, _ in deletes}, args.diff)
+        if left["upsert"]:
+            print(f"[WARN] {len(left['upsert'])} pools in the diff are not in the pack; "
+                  f"kept pending in {args.diff}", file=sys.stderr)
+    rate = stats["docs"] / stats["seconds"] if stats["seconds"] else float("inf")
+    print(f"Wrote {stats['docs']} documents in {stats['batches']} batches "
+          f"({stats['retries']} retries) in {stats['seconds'] * 1000:.0f} ms, {rate:.0f} docs/s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upload question pools in concurrent batches.")
+    parser.add_argument("--pack", default=DEFAULT_PACK)
+    parser.add_argument("--backend", choices=("memory", "file", "firestore"), default="memory")
+    parser.add_argument("--target", help="directory for the file backend, project id for firestore")
+    parser.add_argument("--all", action="store_true", help="upload every pool, not just the pending diff")
+    parser.add_argument("--diff", default=mf.DIFF_PATH)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated round-trip seconds for the memory backend")
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.backend == "file" and not args.target:
+        parser.error("--target is required for the file backend")
+    with trace.run("upload", args):
+        return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
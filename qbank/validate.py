@@ -0,0 +1,143 @@
+"""Validate every chapter XML file in the question bank.
+
+Files are checked in parallel with a process pool. Each file is streamed
+through qbank.loader, which reports every schema problem it meets, so memory
+stays flat however large a chapter grows and unchanged files come straight
+from the loader's cache.
+
+    python -m qbank.validate [--raw-dir DIR] [--workers N] [--expect 40] [--json] [--trace [DIR]]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from . import trace
+from .loader import SchemaError, iter_questions, read_header
+from .paths import DIFFICULTIES, RAW_DIR, chapter_files
+
+# Below this much XML, process start-up costs more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+
+def check_file(path):
+    """Load one chapter file and return its counts and schema errors."""
+    result = {
+        "file": os.path.basename(path),
+        "subject": None,
+        "id": None,
+        "name": None,
+        "counts": dict.fromkeys(DIFFICULTIES, 0),
+        "errors": [],
+    }
+    errors = result["errors"]
+    counts = result["counts"]
+    with trace.span("validate", file=result["file"]) as attrs:
+        try:
+            subject, chapter_id, name = read_header(path)
+            result.update(subject=subject or None, id=chapter_id, name=name or None)
+            for q in iter_questions(path, on_error=errors.append):
+                counts[q.difficulty] += 1
+        except ET.ParseError as e:
+            errors.append(f"XML parse error: {e}")
+        except SchemaError as e:
+            errors.append(str(e))
+        except OSError as e:
+            errors.append(f"cannot read file: {e}")
+        attrs["questions"] = sum(counts.values())
+    trace.count("questions_validated", attrs["questions"])
+    return result
+
+
+def validate(files, workers=None):
+    """Check files across a process pool; results come back in input order.
+
+    With workers=None the pool is only used once the bank is big enough to
+    benefit from it.
+    """
+    if workers is None and sum(os.path.getsize(f) for f in files) < PARALLEL_MIN_BYTES:
+        workers = 1
+    if workers == 1 or len(files) < 2:
+        results = [check_file(f) for f in files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(files) // ((workers or os.cpu_count() or 1) * 4))
+            results = [trace.collect(r) for r in pool.map(trace.remote(check_file), files, chunksize=chunksize)]
+
+    # Chapter ids must be unique across the bank; pool documents are keyed by them
+    seen = {}
+    for r in results:
+        key = (r["subject"], r["id"])
+        if r["id"] is None:
+            continue
+        if key in seen:
+            r["errors"].append(f"chapter id {r['id']} already used by {seen[key]}")
+        else:
+            seen[key] = r["file"]
+    return results
+
+
+def check_uniqueness(results, files, min_unique):
+    """Add an error for every pool whose unique-question ratio is below min_unique."""
+    from .dedupe import low_unique_pools, report
+
+    valid = {r["file"] for r in results if not r["errors"]}
+    rep = report([f for f in files if os.path.basename(f) in valid])
+    by_file = {r["file"]: r for r in results}
+    for key, pool in low_unique_pools(rep, min_unique).items():
+        name, diff = key.rsplit(":", 1)
+        by_file[name]["errors"].append(
+            f"{diff}: only {pool['unique']}/{pool['questions']} questions are unique "
+            f"(ratio {pool['ratio']:.2f} < {min_unique})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the raw_questions bank.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--expect", type=int, default=None,
+                        help="warn when a pool does not hold exactly this many questions")
+    parser.add_argument("--min-unique", type=float, default=None,
+                        help="fail pools whose near-duplicate-free ratio is below this (needs numpy)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--quiet", action="store_true", help="only print files with problems")
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    files = chapter_files(args.raw_dir)
+    with trace.run("validate", args):
+        results = validate(files, workers=args.workers)
+        if args.min_unique is not None:
+            check_uniqueness(results, files, args.min_unique)
+        elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r["errors"]]
+    if args.json:
+        json.dump({"files": results, "seconds": round(elapsed, 4)}, sys.stdout, indent=2)
+        print()
+        return 1 if failed else 0
+
+    total = 0
+    for r in results:
+        counts = r["counts"]
+        total += sum(counts.values())
+        short = args.expect is not None and any(n != args.expect for n in counts.values())
+        if args.quiet and not r["errors"] and not short:
+            continue
+        status = "ERROR" if r["errors"] else ("WARN" if short else "OK")
+        pools = " ".join(f"{d[0].upper()}={counts[d]}" for d in DIFFICULTIES)
+        print(f"[{status}] {r['file']}: {pools}")
+        for err in r["errors"]:
+            print(f"    {err}")
+
+    print(f"\n{len(results)} files, {total} questions, {len(failed)} with errors "
+          f"in {elapsed * 1000:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Watch the bank and revalidate each chapter file as soon as it is saved.
+
+Every chapter is parsed once at start-up and kept in memory with two
+cross-chapter indexes: chapter ids, and normalized question texts. When a file
+changes, only that file is reparsed. Its entries in both indexes are swapped
+for the new ones, and only problems involving that file are reported: schema
+errors, a chapter id that another file already uses, and questions whose text
+already appears in another chapter.
+
+Changes come from filesystem notifications when watchdog is installed
+(`pip install watchdog`), and from polling the directory every --interval
+seconds otherwise. Each report shows how long after the save it was printed.
+
+    python -m qbank.watch [--raw-dir DIR] [--interval 0.05] [--expect 40] [--once]
+"""
+import argparse
+import os
+import queue
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import NamedTuple
+
+from .loader import SchemaError, iter_questions, read_header
+from .paths import DIFFICULTIES, IGNORED_FILES, RAW_DIR, chapter_files
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+SETTLE = 0.02  # seconds to let an editor finish a save (write, rename) before reading
+MAX_DUPLICATES_SHOWN = 5
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(text):
+    return _SPACE.sub(" ", text).strip().lower()
+
+
+class FileState(NamedTuple):
+    stamp: tuple  # (mtime_ns, size)
+    chapter: tuple  # (subject, chapter_id), or None if the header is unreadable
+    counts: dict
+    errors: list
+    texts: list  # (normalized text, difficulty) per question
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def check(path, stamp):
+    """Parse one chapter into a FileState."""
+    counts = dict.fromkeys(DIFFICULTIES, 0)
+    errors, texts, chapter = [], [], None
+    try:
+        subject, chapter_id, _ = read_header(path)
+        # A missing id is reported by the loader, not as a clash with other files
+        chapter = (subject, chapter_id) if chapter_id is not None else None
+        for q in iter_questions(path, on_error=errors.append):
+            counts[q.difficulty] += 1
+            texts.append((normalize(q.text), q.difficulty))
+    except ET.ParseError as e:
+        errors.append(f"XML parse error: {e}")
+    except SchemaError as e:
+        errors.append(str(e))
+    except OSError as e:
+        errors.append(f"cannot read file: {e}")
+    return FileState(stamp, chapter, counts, errors, texts)
+
+
+class Bank:
+    """Parsed chapters and the cross-chapter indexes, updated one file at a time."""
+
+    def __init__(self):
+        self.files = {}
+        self.chapters = defaultdict(set)  # (subject, chapter_id) -> file names
+        self.texts = defaultdict(set)  # normalized text -> {(file name, difficulty)}
+
+    def _unindex(self, name):
+        state = self.files.pop(name, None)
+        if state is None:
+            return
+        if state.chapter:
+            self.chapters[state.chapter].discard(name)
+        for text, diff in state.texts:
+            self.texts[text].discard((name, diff))
+
+    def _index(self, name, state):
+        self.files[name] = state
+        if state.chapter:
+            self.chapters[state.chapter].add(name)
+        for text, diff in state.texts:
+            self.texts[text].add((name, diff))
+
+    def update(self, path):
+        """Recheck path if it changed. Returns its FileState, False if unchanged, None if deleted."""
+        name = os.path.basename(path)
+        stamp = _stamp(path)
+        old = self.files.get(name)
+        if stamp is None:
+            self._unindex(name)
+            return None
+        if old is not None and old.stamp == stamp:
+            return False
+        state = check(path, stamp)
+        self._unindex(name)
+        self._index(name, state)
+        return state
+
+    def conflicts(self, name):
+        """Problems between name and the rest of the bank."""
+        state = self.files[name]
+        problems = []
+        if state.chapter:
+            others = sorted(self.chapters[state.chapter] - {name})
+            if others:
+                problems.append(f"chapter id {state.chapter[1]} already used by {', '.join(others)}")
+        duplicates = []
+        for text, diff in state.texts:
+            others = sorted(f"{f}:{d}" for f, d in self.texts[text] if f != name)
+            if others:
+                duplicates.append(f"{diff}: \"{text[:60]}\" also in {', '.join(others)}")
+        problems.extend(duplicates[:MAX_DUPLICATES_SHOWN])
+        if len(duplicates) > MAX_DUPLICATES_SHOWN:
+            problems.append(f"... {len(duplicates) - MAX_DUPLICATES_SHOWN} more duplicated questions")
+        return problems
+
+
+def report(bank, name, state, expect=None, since_save=True, out=sys.stdout):
+    """Print one file's status, with the time since it was saved. Returns True if it has errors."""
+    if state is None:
+        print(f"[REMOVED] {name}", file=out)
+        return False
+    conflicts = bank.conflicts(name)
+    short = expect is not None and any(n != expect for n in state.counts.values())
+    status = "ERROR" if state.errors else ("WARN" if conflicts or short else "OK")
+    pools = " ".join(f"{d[0].upper()}={state.counts[d]}" for d in DIFFICULTIES)
+    lag = f" ({(time.time() - state.stamp[0] / 1e9) * 1000:.0f} ms after save)" if since_save else ""
+    print(f"[{status}] {name}: {pools}{lag}", file=out)
+    for line in state.errors + conflicts:
+        print(f"    {line}", file=out)
+    out.flush()
+    return bool(state.errors)
+
+
+def poll_changes(raw_dir, interval):
+    """Batches of chapter paths whose (mtime, size) changed, by rescanning raw_dir."""
+    stamps = {path: _stamp(path) for path in chapter_files(raw_dir)}
+    while True:
+        time.sleep(interval)
+        current = {path: _stamp(path) for path in chapter_files(raw_dir)}
+        changed = {p for p, s in current.items() if stamps.get(p) != s} | (stamps.keys() - current.keys())
+        stamps = current
+        if changed:
+            yield changed
+
+
+def notify_changes(raw_dir):
+    """Batches of changed chapter paths from filesystem notifications (needs watchdog)."""
+    events = queue.Queue()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                name = os.path.basename(path)
+                if name.endswith(".xml") and name not in IGNORED_FILES:
+                    events.put(os.path.join(raw_dir, name))
+
+    observer = Observer()
+    observer.schedule(Handler(), raw_dir, recursive=False)
+    observer.start()
+    try:
+        while True:
+            changed = {events.get()}
+            time.sleep(SETTLE)
+            while not events.empty():
+                changed.add(events.get_nowait())
+            yield changed
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revalidate chapter files as they are saved.")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="polling period in seconds when watchdog is not installed")
+    parser.add_argument("--poll", action="store_true", help="poll even if watchdog is installed")
+    parser.add_argument("--expect", type=int, default=None,
+                        help="warn when a pool does not hold exactly this many questions")
+    parser.add_argument("--once", action="store_true", help="check the bank once and exit")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bank = Bank()
+    files = chapter_files(args.raw_dir)
+    for path in files:
+        bank.update(path)
+    failed = [name for name, state in bank.files.items() if state.errors]
+    for name in sorted(bank.files):
+        state = bank.files[name]
+        if state.errors or bank.conflicts(name):
+            report(bank, name, state, args.expect, since_save=False)
+    print(f"{len(files)} files, {len(failed)} with errors, loaded in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    if args.once:
+        return 1 if failed else 0
+
+    if Observer is not None and not args.poll:
+        changes, how = notify_changes(args.raw_dir), "filesystem notifications"
+    else:
+        changes, how = poll_changes(args.raw_dir, args.interval), f"polling every {args.interval}s"
+    print(f"Watching {args.raw_dir} ({how}); Ctrl+C to stop")
+    try:
+        for paths in changes:
+            for path in sorted(paths):
+                state = bank.update(path)
+                if state is not False:
+                    report(bank, os.path.basename(path), state, args.expect)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
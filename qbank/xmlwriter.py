@@ -0,0 +1,99 @@
+"""Streaming writer for chapter XML files.
+
+Questions are escaped and written straight to a buffered file handle as they
+are produced, so a chapter of any size is written in constant memory.
+
+    with open_chapter(path, "Chemistry", 124, "d- and f-Block Elements") as w:
+        w.begin_pool("easy")
+        w.question("Which ...?", [("A", "..."), ("B", "...")], "A", "Because ...")
+        w.end_pool()
+"""
+import os
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+from . import trace
+from .paths import DIFFICULTIES
+
+BUFFER_SIZE = 1 << 16
+
+
+class ChapterWriter:
+    def __init__(self, f, subject, chapter_id, name, comment=None):
+        self._f = f
+        self._pool = None
+        self.count = 0
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        if comment:
+            f.write(f"<!-- {comment.replace('--', '- -')} -->\n")
+        f.write(f"<chapter subject={quoteattr(subject)} id={quoteattr(str(chapter_id))} "
+                f"name={quoteattr(name)}>\n")
+
+    def begin_pool(self, difficulty):
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"unknown difficulty {difficulty!r}")
+        if self._pool:
+            self.end_pool()
+        self._pool = difficulty
+        self._f.write(f"    <{difficulty}>\n")
+
+    def end_pool(self):
+        self._f.write(f"    </{self._pool}>\n")
+        self._pool = None
+
+    def question(self, text, options, answer, explanation="", topic=None):
+        if not self._pool:
+            raise ValueError("question() called outside a pool")
+        w = self._f.write
+        attrs = f" topic={quoteattr(topic)}" if topic else ""
+        w(f"        <question{attrs}>\n            <text>{escape(text)}</text>\n")
+        for opt_id, opt_text in options:
+            w(f"            <option id={quoteattr(opt_id)}>{escape(opt_text)}</option>\n")
+        w(f"            <answer>{escape(answer)}</answer>\n"
+          f"            <explanation>{escape(explanation)}</explanation>\n"
+          f"        </question>\n")
+        self.count += 1
+
+    def close(self):
+        if self._pool:
+            self.end_pool()
+        self._f.write("</chapter>\n")
+
+
+@contextmanager
+def open_chapter(path, subject, chapter_id, name, comment=None):
+    """ChapterWriter for path; the file is replaced atomically once the block exits cleanly.
+
+    When tracing, "serialize" covers building the XML into the file buffer and
+    "write" the final flush and rename.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="\n", buffering=BUFFER_SIZE) as f:
+            with trace.span("serialize") as attrs:
+                writer = ChapterWriter(f, subject, chapter_id, name, comment)
+                yield writer
+                writer.close()
+                attrs["questions"] = writer.count
+            with trace.span("write") as attrs:
+                attrs["bytes"] = f.tell()  # flushes the buffer
+                f.close()
+                os.replace(tmp_path, path)
+        trace.count("bytes_written", attrs["bytes"])
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_chapter(path, subject, chapter_id, name, pools, comment=None):
+    """Write a chapter from {difficulty: iterable of (text, options, answer, explanation[, topic])}.
+
+    The iterables are consumed lazily, one question at a time.
+    """
+    with open_chapter(path, subject, chapter_id, name, comment) as w:
+        for difficulty in DIFFICULTIES:
+            w.begin_pool(difficulty)
+            for question in pools.get(difficulty, ()):
+                w.question(*question)
+            w.end_pool()
+    return w.count
@@ -1,6 +1,6 @@
 
 import { initializeApp } from "firebase/app";
-import { getFirestore, doc, setDoc } from "firebase/firestore";
+import { getFirestore, doc, setDoc, deleteDoc } from "firebase/firestore";
 import fs from 'fs';
 import path from 'path';
 import { fileURLToPath } from 'url';
@@ -28,105 +28,84 @@ const db = getFirestore(app);
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
-const RAW_DIR = path.join(__dirname, '../src/data/raw_questions');
+// Pool documents written by `python -m qbank.loader --json build/qbank/pools.json`,
+// which parses raw_questions with the same loader every other tool uses
+const POOLS_PATH = path.join(__dirname, '../../build/qbank/pools.json');
+// Written by `python -m qbank.manifest` and `python -m qbank.generate`: only these pools changed
+const DIFF_PATH = path.join(__dirname, '../../build/qbank/pool_diff.json');
 
 // ------------------------------------------------------------------
-// XML PARSER
+// MAIN UPLOAD FUNCTION
 // ------------------------------------------------------------------
-const parseXML = (xmlContent) => {
-    // Extract Chapter Info
-    const chapterMatch = xmlContent.match(/<chapter subject="(.*?)" id="(.*?)" name="(.*?)">/);
-    if (!chapterMatch) throw new Error("Invalid XML: Missing <chapter> tag");
-
-    const [_, subject, chapterId, chapterName] = chapterMatch;
-
-    // Extract Pools
-    const pools = {};
-    ['easy', 'medium', 'hard'].forEach(diff => {
-        const poolRegex = new RegExp(`<${diff}>([\\s\\S]*?)<\\/${diff}>`);
-        const poolMatch = xmlContent.match(poolRegex);
-
-        if (poolMatch) {
-            const questions = [];
-            const qBlocks = poolMatch[1].split('</question>');
-
-            qBlocks.forEach(block => {
-                if (!block.trim()) return;
-
-                const getTag = (tag) => {
-                    const match = block.match(new RegExp(`<${tag}>(.*?)<\\/${tag}>`, 's')); // 's' flag for dotAll not supported in some older nodes, but usually ok
-                    return match ? match[1].trim() : '';
-                };
-
-                const text = getTag('text');
-                if (!text) return;
-
-                const answer = getTag('answer');
-                const explanation = getTag('explanation');
-
-                const options = [];
-                const optMatches = block.matchAll(/<option id="(.*?)">(.*?)<\/option>/g);
-                for (const match of optMatches) {
-                    options.push({ id: match[1], text: match[2] });
-                }
-
-                questions.push({
-                    id: `${subject}-${chapterId}-${diff}-${questions.length + 1}`,
-                    text,
-                    options,
-                    correctAnswer: answer,
-                    explanation
-                });
-            });
-            pools[diff] = questions;
-        }
-    });
+const loadPoolDiff = () => {
+    if (!fs.existsSync(DIFF_PATH)) return null;
+    const diff = JSON.parse(fs.readFileSync(DIFF_PATH, 'utf-8'));
+    return { ...diff, upsert: new Set(diff.upsert) };
+};
 
-    return { subject, chapterId, chapterName, pools };
+// Rewrite the diff with only the pools this run did not write or delete
+const settlePoolDiff = (upserted, deleted) => {
+    const diff = JSON.parse(fs.readFileSync(DIFF_PATH, 'utf-8'));
+    diff.upsert = diff.upsert.filter((docId) => !upserted.has(docId));
+    diff.delete = diff.delete.filter((docId) => !deleted.has(docId));
+    if (diff.upsert.length === 0 && diff.delete.length === 0) {
+        fs.unlinkSync(DIFF_PATH);
+    } else {
+        fs.writeFileSync(`${DIFF_PATH}.tmp`, JSON.stringify(diff, null, 1));
+        fs.renameSync(`${DIFF_PATH}.tmp`, DIFF_PATH);
+    }
+    return diff;
 };
 
-// ------------------------------------------------------------------
-// MAIN UPLOAD FUNCTION
-// ------------------------------------------------------------------
 const processFiles = async () => {
+    const upserted = new Set();
+    const deleted = new Set();
+    // With a pool diff only changed pools are written; without one, everything is
+    const poolDiff = process.argv.includes('--all') ? null : loadPoolDiff();
     try {
-        const files = fs.readdirSync(RAW_DIR).filter(f => f.endsWith('.xml') && f !== 'template.xml');
+        if (poolDiff) {
+            console.log(`Pool diff: ${poolDiff.upsert.size} to write, ${poolDiff.delete.length} to delete`);
+        }
 
-        if (files.length === 0) {
-            console.log("No XML files found in src/data/raw_questions/");
+        if (!fs.existsSync(POOLS_PATH)) {
+            console.log("No pools found: run `python -m qbank.loader --json build/qbank/pools.json` first");
             return;
         }
+        // The diff names the pools, pools.json holds their content: it must be exported after the diff
+        if (poolDiff && fs.statSync(POOLS_PATH).mtimeMs < fs.statSync(DIFF_PATH).mtimeMs) {
+            console.error("pools.json is older than pool_diff.json: run `python -m qbank.loader --json` "
+                + "or `python -m qbank.export` first");
+            process.exitCode = 1;
+            return;
+        }
+        const pools = JSON.parse(fs.readFileSync(POOLS_PATH, 'utf-8'));
 
-        for (const file of files) {
-            console.log(`Processing ${file}...`);
-            const content = fs.readFileSync(path.join(RAW_DIR, file), 'utf-8');
-            const data = parseXML(content);
-
-            console.log(`Parsed ${data.subject} - ${data.chapterName}:`);
-            console.log(`  Easy: ${data.pools.easy?.length || 0}`);
-            console.log(`  Medium: ${data.pools.medium?.length || 0}`);
-            console.log(`  Hard: ${data.pools.hard?.length || 0}`);
-
-            // Upload to Firestore
-            for (const [diff, questions] of Object.entries(data.pools)) {
-                if (!questions || questions.length === 0) continue;
-
-                const docId = `${data.subject}_${data.chapterId}_${diff}`.toLowerCase();
-                const docRef = doc(db, "question_pools", docId);
+        for (const pool of pools) {
+            const docId = `${pool.subject}_${pool.chapterId}_${pool.difficulty}`.toLowerCase();
+            if (poolDiff && !poolDiff.upsert.has(docId)) continue;
 
-                await setDoc(docRef, {
-                    subject: data.subject,
-                    chapterId: parseInt(data.chapterId),
-                    difficulty: diff,
-                    version: 1,
-                    questions: questions
-                });
-                console.log(`  ✅ Uploaded ${docId}`);
+            await setDoc(doc(db, "question_pools", docId), pool);
+            upserted.add(docId);
+            console.log(`  ✅ Uploaded ${docId} (${pool.questions.length} questions)`);
+        }
+        if (poolDiff) {
+            for (const docId of poolDiff.delete) {
+                await deleteDoc(doc(db, "question_pools", docId));
+                deleted.add(docId);
+                console.log(`  🗑️ Deleted ${docId}`);
             }
         }
         console.log("All done!");
     } catch (error) {
         console.error("Error:", error);
+        process.exitCode = 1;
+    } finally {
+        if (poolDiff && (upserted.size || deleted.size)) {
+            const left = settlePoolDiff(upserted, deleted);
+            if (left.upsert.length || left.delete.length) {
+                console.log(`${left.upsert.length + left.delete.length} pools still pending in pool_diff.json`);
+            }
+        }
     }
 };
 
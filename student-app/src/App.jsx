@@ -19,7 +19,7 @@ import RiddleCipher from './components/RiddleCipher';
 import MathMaze from './components/MathMaze';
 import { AuthProvider, useAuth } from './contexts/AuthContext';
 import { SoundProvider } from './contexts/SoundContext';
-import { startTestSession, calculateResults, saveQuizResult, getUserProgress, saveChapterProgress } from './utils/gameLogic';
+import { startTestSession, calculateResults, saveQuizResult, getUserProgress, saveChapterProgress, toResponses } from './utils/gameLogic';
 import { getSubjectsForStream } from './utils/bossConfig';
 import { assembleBossExam, calculateBossResults, saveBossResult, getBossHistory, getRecentBossQuestionIds } from './utils/bossEngine';
 import { useHomeConfig } from './hooks/useHomeConfig';
@@ -349,7 +349,8 @@ const MainContent = () => {
         chapterId: selectedChapter.id,
         chapterName: selectedChapter.name,
         difficulty: currentDifficulty,
-        ...results
+        ...results,
+        responses: toResponses(quizQuestions, answers),
       });
 
       // 2. Calculate Rewards
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { ChevronLeft, Brain, Lightbulb, Zap, HelpCircle, Delete, Calculator, Lock } from 'lucide-react';
-import { XMLParser } from 'fast-xml-parser';
+import { openRiddleGame } from '../utils/riddleChunks';
 
 const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
     // --- Constants ---
@@ -15,30 +15,26 @@ const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
 
     // --- State ---
     const [loading, setLoading] = useState(true);
-    const [mazes, setMazes] = useState([]);
+    const [game, setGame] = useState(null);
+    const [currentMaze, setCurrentMaze] = useState(null);
     const [userInput, setUserInput] = useState("");
     const [gameState, setGameState] = useState('playing'); // playing, solved, complete, premium_locked
     const [showHint, setShowHint] = useState(false);
     const [currentLevelIndex, setCurrentLevelIndex] = useState(0);
 
-    const currentMaze = mazes[currentLevelIndex] || null;
+    const totalLevels = game?.count ?? 0;
     const currentLevel = currentMaze ? parseInt(currentMaze.id) : currentLevelIndex + 1;
 
     // --- Load Data ---
     useEffect(() => {
         const fetchMazes = async () => {
             try {
-                const response = await fetch('/data/math_riddles.xml');
-                if (!response.ok) throw new Error("File not found");
-                const xmlText = await response.text();
-                const parser = new XMLParser({ ignoreAttributes: false, attributeNamePrefix: "" });
-                const result = parser.parse(xmlText);
-
-                const data = result.math_riddles?.maze;
-                if (data) {
-                    setMazes(Array.isArray(data) ? data : [data]);
+                const opened = await openRiddleGame('math_maze');
+                if (opened) {
+                    setGame(opened);
+                } else {
+                    setLoading(false);
                 }
-                setLoading(false);
             } catch (err) {
                 console.error("Failed to load math mazes:", err);
                 setLoading(false);
@@ -47,6 +43,17 @@ const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
         fetchMazes();
     }, []);
 
+    // Only the chunk holding the current level is fetched
+    useEffect(() => {
+        if (!game) return;
+        let cancelled = false;
+        game.riddle(currentLevelIndex)
+            .then((maze) => { if (!cancelled) setCurrentMaze(maze); })
+            .catch((err) => console.error("Failed to load math maze:", err))
+            .finally(() => { if (!cancelled) setLoading(false); });
+        return () => { cancelled = true; };
+    }, [game, currentLevelIndex]);
+
     // --- Handlers ---
     const handleNextLevel = () => {
         const nextIndex = currentLevelIndex + 1;
@@ -56,7 +63,7 @@ const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
             return;
         }
 
-        if (nextIndex < mazes.length) {
+        if (nextIndex < totalLevels) {
             setCurrentLevelIndex(nextIndex);
             setUserInput("");
             setGameState('playing');
@@ -110,7 +117,7 @@ const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
         </div>
     );
 
-    if (mazes.length === 0) return (
+    if (totalLevels === 0) return (
         <div className="fixed inset-0 z-[60] bg-[#080505] flex flex-col items-center justify-center font-mono p-10 text-center">
             <Calculator size={48} className="text-rose-500 mb-6 animate-bounce" />
             <h2 className="text-white font-black italic text-xl uppercase mb-2">Arithmetic Error</h2>
@@ -177,7 +184,7 @@ const MathMaze = ({ onExit, userData, assets, updateUserStats }) => {
                     <div className="flex flex-col items-center gap-4">
                         <span className="text-[10px] font-bold text-emerald-500/60 uppercase tracking-[0.2em]">Logic Pattern</span>
                         <p className="text-4xl font-black tracking-tighter text-white text-center">
-                            {currentMaze?.puzzle}
+                            {currentMaze?.question}
                         </p>
                     </div>
                 </div>
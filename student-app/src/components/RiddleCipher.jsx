@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef, useCallback } from 'react';
 import { ChevronLeft, RotateCcw, Home, Brain, Lightbulb, Zap, HelpCircle, Delete, Lock } from 'lucide-react';
-import { XMLParser } from 'fast-xml-parser';
+import { openRiddleGame } from '../utils/riddleChunks';
 
 const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
     // --- Constants ---
@@ -15,14 +15,15 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
 
     // --- State ---
     const [loading, setLoading] = useState(true);
-    const [riddles, setRiddles] = useState([]);
+    const [game, setGame] = useState(null);
+    const [currentRiddle, setCurrentRiddle] = useState(null);
     const [userInput, setUserInput] = useState({}); // { index: char }
     const [gameState, setGameState] = useState('playing'); // playing, solved, complete, premium_locked
     const [showHint, setShowHint] = useState(false);
     const [revealedIndices, setRevealedIndices] = useState([]);
     const [currentLevelIndex, setCurrentLevelIndex] = useState(0);
 
-    const currentRiddle = riddles[currentLevelIndex] || null;
+    const totalLevels = game?.count ?? 0;
     const currentLevel = currentRiddle ? parseInt(currentRiddle.id) : currentLevelIndex + 1;
 
     // --- Matrix Background ---
@@ -73,17 +74,12 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
     useEffect(() => {
         const fetchRiddles = async () => {
             try {
-                const response = await fetch('/data/riddles.xml');
-                if (!response.ok) throw new Error("File not found");
-                const xmlText = await response.text();
-                const parser = new XMLParser({ ignoreAttributes: false, attributeNamePrefix: "" });
-                const result = parser.parse(xmlText);
-
-                const data = result.riddles?.riddle;
-                if (data) {
-                    setRiddles(Array.isArray(data) ? data : [data]);
+                const opened = await openRiddleGame('riddle_cipher');
+                if (opened) {
+                    setGame(opened);
+                } else {
+                    setLoading(false);
                 }
-                setLoading(false);
             } catch (err) {
                 console.error("Failed to load riddles:", err);
                 setLoading(false);
@@ -92,6 +88,17 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
         fetchRiddles();
     }, []);
 
+    // Only the chunk holding the current level is fetched
+    useEffect(() => {
+        if (!game) return;
+        let cancelled = false;
+        game.riddle(currentLevelIndex)
+            .then((riddle) => { if (!cancelled) setCurrentRiddle(riddle); })
+            .catch((err) => console.error("Failed to load riddle:", err))
+            .finally(() => { if (!cancelled) setLoading(false); });
+        return () => { cancelled = true; };
+    }, [game, currentLevelIndex]);
+
     // --- Handlers ---
     const handleKeyClick = (key) => {
         if (gameState !== 'playing' || !currentRiddle) return;
@@ -150,7 +157,7 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
             return;
         }
 
-        if (nextIndex < riddles.length) {
+        if (nextIndex < totalLevels) {
             setCurrentLevelIndex(nextIndex);
             setUserInput({});
             setGameState('playing');
@@ -225,7 +232,7 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
         </div>
     );
 
-    if (riddles.length === 0) return (
+    if (totalLevels === 0) return (
         <div className="fixed inset-0 z-[60] bg-[#050508] flex flex-col items-center justify-center font-mono p-10 text-center">
             <HelpCircle size={48} className="text-rose-500 mb-6 animate-bounce" />
             <h2 className="text-white font-black italic text-xl uppercase mb-2">Neural Link Failed</h2>
@@ -251,7 +258,7 @@ const RiddleCipher = ({ onExit, userData, assets, updateUserStats }) => {
                 <div className="grid grid-cols-2 gap-4 mb-12">
                     <div className="p-4 bg-white/5 border border-white/10 rounded-2xl">
                         <p className="text-[10px] text-white/40 uppercase mb-1">Total Levels</p>
-                        <p className="text-2xl font-black text-white">{riddles.length}</p>
+                        <p className="text-2xl font-black text-white">{totalLevels}</p>
                     </div>
                     <div className="p-4 bg-white/5 border border-white/10 rounded-2xl">
                         <p className="text-[10px] text-white/40 uppercase mb-1">Final Assets</p>
@@ -1,6 +1,6 @@
 import { db } from '../firebase';
 import {
-    doc, getDoc, collection, setDoc, getDocs, query, where,
+    doc, getDoc, collection, setDoc, getDocs, query, where, getCountFromServer,
 } from 'firebase/firestore';
 import { generateQuestionPool } from '../data/questions';
 
@@ -74,68 +74,67 @@ const validateQuestions = (questions) =>
         return true;
     });
 
-// ─── XML Runtime Fallback ─────────────────────────────────────────────────────
+// ─── Static Shard Fallback ────────────────────────────────────────────────────
+// Built by `python -m qbank.shards` into public/data/shards: index.json maps each
+// chapterId to one pre-parsed JSON shard per difficulty, so the offline fallback
+// is a single small fetch with nothing to parse.
 
-const parseXMLChapter = (xmlText, chapterId, difficulty) => {
-    try {
-        const parser = new DOMParser();
-        const xmlDoc = parser.parseFromString(xmlText, 'text/xml');
-
-        const chapterNode = xmlDoc.getElementsByTagName('chapter')[0];
-        if (!chapterNode) return [];
-        if (parseInt(chapterNode.getAttribute('id')) !== chapterId) return [];
-
-        const diffNode = xmlDoc.getElementsByTagName(difficulty.toLowerCase())[0];
-        if (!diffNode) return [];
-
-        const questions = [];
-        Array.from(diffNode.getElementsByTagName('question')).forEach((qNode, idx) => {
-            const text = qNode.getElementsByTagName('text')[0]?.textContent ?? '';
-            const answer = qNode.getElementsByTagName('answer')[0]?.textContent ?? '';
-            const explanation = qNode.getElementsByTagName('explanation')[0]?.textContent ?? '';
-
-            const options = Array.from(qNode.getElementsByTagName('option')).map((opt) => ({
-                id: opt.getAttribute('id'),
-                text: opt.textContent ?? '',
-            }));
-
-            if (text && options.length >= 2 && answer) {
-                questions.push({
-                    id: `xml_${chapterId}_${difficulty}_${idx + 1}`,
-                    text,
-                    options,
-                    answer,
-                    correctAnswer: answer,
-                    explanation,
-                });
-            }
-        });
+const SHARD_BASE = `${import.meta.env.BASE_URL}data/shards/`;
 
-        return questions;
-    } catch {
-        return [];
-    }
+// Subject names as written in the chapter XML files
+const SUBJECT_CODE_TO_XML_SUBJECT = {
+    phy: 'Physics',
+    chem: 'Chemistry',
+    math: 'Mathematics',
+    bio: 'Biology',
+    zoo: 'Biology',
 };
 
-/**
- * Scans all bundled XML files at runtime and returns questions for the matching
- * chapter + difficulty. Uses Vite's import.meta.glob for zero-config lazy loading.
- */
-const loadXMLFallback = async (chapterId, difficulty) => {
-    // Pattern must be a literal string — Vite resolves it at build time
-    const modules = import.meta.glob('../data/raw_questions/*.xml', { as: 'raw', eager: false });
+let shardIndexPromise = null;
+
+const loadShardIndex = () => {
+    if (!shardIndexPromise) {
+        shardIndexPromise = fetch(`${SHARD_BASE}index.json`)
+            .then((res) => {
+                if (!res.ok) throw new Error(`shard index: HTTP ${res.status}`);
+                return res.json();
+            })
+            .catch((e) => {
+                shardIndexPromise = null; // retry on the next session
+                throw e;
+            });
+    }
+    return shardIndexPromise;
+};
 
-    for (const path of Object.keys(modules)) {
-        if (path.includes('template')) continue;
+const fetchShard = async (name) => {
+    // Prefer the precompressed shard; WebViews without DecompressionStream, or
+    // servers that already decoded it, fall through to the plain file
+    if (typeof DecompressionStream !== 'undefined') {
         try {
-            const xmlText = await modules[path]();
-            const questions = parseXMLChapter(xmlText, chapterId, difficulty);
-            if (questions.length > 0) return questions;
+            const res = await fetch(`${SHARD_BASE}${name}.json.gz`);
+            if (res.ok) {
+                return await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).json();
+            }
         } catch {
-            // skip unreadable files
+            // use the plain shard
         }
     }
-    return [];
+    const res = await fetch(`${SHARD_BASE}${name}.json`);
+    if (!res.ok) throw new Error(`shard ${name}: HTTP ${res.status}`);
+    return res.json();
+};
+
+const loadShardFallback = async (subject, chapterId, difficulty) => {
+    const index = await loadShardIndex();
+    const entries = index.chapters[String(chapterId)] ?? [];
+    // Chapter ids can repeat across subjects; prefer the one for this subject
+    const entry = entries.find((e) => e.subject === SUBJECT_CODE_TO_XML_SUBJECT[subject]) ?? entries[0];
+    const name = entry?.pools[difficulty.toLowerCase()];
+    if (!name) return [];
+
+    const shard = await fetchShard(name);
+    return shard.questions.map((q) => ({ ...q, correctAnswer: q.answer }));
 };
 
 // ─── Layer 1: Flat Firestore query (admin panel schema) ───────────────────────
@@ -176,9 +175,36 @@ const loadPooledFirestore = async (subject, chapterId, difficulty) => {
     return data.questions;
 };
 
+// ─── Layer 0: Local session server (development and load tests) ─────────────
+// `python -m qbank.serve` returns ready 25-question sessions from the compiled
+// bank, options already shuffled. Only used when VITE_SESSION_SERVER is set.
+
+const SESSION_SERVER = import.meta.env.VITE_SESSION_SERVER;
+
+const loadServedSession = async (subject, chapterId, difficulty) => {
+    const res = await fetch(
+        `${SESSION_SERVER}/session/${encodeURIComponent(subject)}/${chapterId}/${difficulty.toLowerCase()}`,
+    );
+    if (!res.ok) throw new Error(`session server: HTTP ${res.status}`);
+    return (await res.json()).questions;
+};
+
 // ─── startTestSession — 4-layer fallback ─────────────────────────────────────
 
 export const startTestSession = async (subject, chapterId, difficulty) => {
+    // ── Layer 0: Local session server, when configured ───────────────────────
+    if (SESSION_SERVER) {
+        try {
+            const valid = validateQuestions(await loadServedSession(subject, chapterId, difficulty));
+            if (valid.length > 0) {
+                console.log(`[Quiz] ✅ Layer 0 (session server): ${valid.length} questions`);
+                return valid;
+            }
+        } catch (e) {
+            console.warn('[Quiz] Layer 0 (session server) failed:', e.message);
+        }
+    }
+
     // ── Layer 1: Flat Firestore (admin panel questions) ──────────────────────
     try {
         const raw = await loadFlatFirestore(subject, chapterId, difficulty);
@@ -203,16 +229,16 @@ export const startTestSession = async (subject, chapterId, difficulty) => {
         console.warn('[Quiz] Layer 2 (pooled Firestore) failed:', e.message);
     }
 
-    // ── Layer 3: XML runtime fallback ─────────────────────────────────────────
+    // ── Layer 3: Static shard fallback (bundled with the app) ────────────────
     try {
-        const raw = await loadXMLFallback(chapterId, difficulty);
+        const raw = await loadShardFallback(subject, chapterId, difficulty);
         const valid = validateQuestions(raw);
         if (valid.length > 0) {
-            console.log(`[Quiz] ✅ Layer 3 (XML): ${valid.length} questions`);
+            console.log(`[Quiz] ✅ Layer 3 (shard): ${valid.length} questions`);
             return shuffleArray(valid).slice(0, 25);
         }
     } catch (e) {
-        console.warn('[Quiz] Layer 3 (XML) failed:', e.message);
+        console.warn('[Quiz] Layer 3 (shard) failed:', e.message);
     }
 
     // ── Layer 4: Procedural mock generator (emergency — always works) ─────────
@@ -254,6 +280,15 @@ export const calculateResults = (questions, userAnswers) => {
     };
 };
 
+// ─── toResponses ─────────────────────────────────────────────────────────────
+
+/** Per-question responses stored with each result for item analytics (qbank.analytics) */
+export const toResponses = (questions, userAnswers) =>
+    questions.map((q) => {
+        const answer = userAnswers[q.id] ?? null;
+        return { id: q.id, answer, correct: answer !== null && answer === (q.correctAnswer || q.answer) };
+    });
+
 // ─── saveQuizResult ───────────────────────────────────────────────────────────
 
 export const saveQuizResult = async (userId, resultData) => {
@@ -306,21 +341,64 @@ export const getUserProgress = async (userId) => {
 
 // ─── getGlobalRank ───────────────────────────────────────────────────────────
 
+// leaderboard/global is published by `python -m qbank.leaderboard`: ascending XP
+// bucket edges and, per stream, how many users sit in later buckets
+const RANK_SNAPSHOT_TTL_MS = 10 * 60 * 1000;
+let rankSnapshot = null;
+
+const loadRankSnapshot = async () => {
+    if (rankSnapshot && Date.now() - rankSnapshot.fetchedAt < RANK_SNAPSHOT_TTL_MS) {
+        return rankSnapshot.data;
+    }
+    const snap = await getDoc(doc(db, 'leaderboard', 'global'));
+    if (!snap.exists()) return null;
+    rankSnapshot = { data: snap.data(), fetchedAt: Date.now() };
+    return rankSnapshot.data;
+};
+
+/** Users with more XP than xp, by binary search over the snapshot buckets */
+const countAbove = (snapshot, board, xp) => {
+    const { edges, bucketWidth: width } = snapshot;
+    let lo = 0, hi = edges.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (edges[mid] <= xp) lo = mid + 1;
+        else hi = mid;
+    }
+    const i = lo - 1;
+    if (i < 0) return board.total;
+
+    let higher = board.above[i];
+    if (xp < edges[i] + width - 1) {
+        // Assume users are spread evenly across a wide bucket
+        const inBucket = (i > 0 ? board.above[i - 1] : board.total) - board.above[i];
+        higher += Math.round(inBucket * (edges[i] + width - 1 - xp) / width);
+    }
+    return higher;
+};
+
 /**
- * Calculate the global rank of a user based on XP.
+ * Calculate the rank of a user based on XP, globally or within a stream ('JEE' / 'NEET').
  * Returns { rank, totalUsers, percentile }
  */
-export const getGlobalRank = async (xp) => {
+export const getGlobalRank = async (xp, stream = 'all') => {
     try {
-        const usersRef = collection(db, 'users');
-        const allUsersSnap = await getDocs(usersRef);
-        const totalUsers = allUsersSnap.size || 1;
-
-        // Count users with higher XP
-        // Note: For very large user bases, this should be replaced by a periodic aggregation
-        const higherXPQuery = query(collection(db, 'users'), where('stats.xp', '>', xp));
-        const higherXPSnap = await getDocs(higherXPQuery);
-        const rank = higherXPSnap.size + 1;
+        let higher, totalUsers;
+        const snapshot = await loadRankSnapshot();
+        if (snapshot) {
+            const board = snapshot.streams[stream] ?? snapshot.streams.all;
+            higher = countAbove(snapshot, board, xp);
+            totalUsers = board.total || 1;
+        } else {
+            // No snapshot published yet: server-side counts, without reading the users
+            const [all, above] = await Promise.all([
+                getCountFromServer(collection(db, 'users')),
+                getCountFromServer(query(collection(db, 'users'), where('stats.xp', '>', xp))),
+            ]);
+            higher = above.data().count;
+            totalUsers = all.data().count || 1;
+        }
+        const rank = higher + 1;
 
         const percentile = Math.max(1, Math.min(100, Math.round(((totalUsers - rank + 1) / totalUsers) * 100)));
 
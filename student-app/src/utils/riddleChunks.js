@@ -0,0 +1,126 @@
+// ─── Mini-game riddle chunks ──────────────────────────────────────────────────
+// Built by `python -m qbank.riddles` into public/data/riddles: index.json lists
+// each game's chunks in play order, and each chunk holds a few levels already
+// validated and deduplicated. A game fetches the index and the chunk holding
+// its current level; the next chunk is prefetched as the player nears it.
+// Without the chunks (before `npm run build:data` or `npm run riddles`), a game falls
+// back to parsing its shipped XML bank.
+
+import { XMLParser } from 'fast-xml-parser';
+
+const RIDDLE_BASE = `${import.meta.env.BASE_URL}data/riddles/`;
+const PREFETCH_AHEAD = 3; // levels before the end of a chunk to fetch the next one
+const DIFFICULTY_ORDER = ['easy', 'moderate', 'difficult'];
+
+// The XML bank of each game, and the answers its keyboard can type (as qbank/riddles.py checks)
+const XML_BANKS = {
+    riddle_cipher: { file: 'riddles.xml', typeable: (answer) => /^[A-Za-z ]+$/.test(answer) },
+    math_maze: { file: 'math_riddles.xml', typeable: (answer) => /^-?\d+$/.test(answer) && answer.length <= 10 },
+};
+
+let riddleIndexPromise = null;
+
+const loadRiddleIndex = () => {
+    if (!riddleIndexPromise) {
+        riddleIndexPromise = fetch(`${RIDDLE_BASE}index.json`)
+            .then((res) => {
+                if (!res.ok) throw new Error(`riddle index: HTTP ${res.status}`);
+                return res.json();
+            })
+            .catch((e) => {
+                riddleIndexPromise = null; // retry on the next game
+                throw e;
+            });
+    }
+    return riddleIndexPromise;
+};
+
+const fetchChunk = async (name) => {
+    // Prefer the precompressed chunk; fall through to the plain file as the shards do
+    if (typeof DecompressionStream !== 'undefined') {
+        try {
+            const res = await fetch(`${RIDDLE_BASE}${name}.json.gz`);
+            if (res.ok) {
+                return await new Response(res.body.pipeThrough(new DecompressionStream('gzip'))).json();
+            }
+        } catch {
+            // use the plain chunk
+        }
+    }
+    const res = await fetch(`${RIDDLE_BASE}${name}.json`);
+    if (!res.ok) throw new Error(`riddle chunk ${name}: HTTP ${res.status}`);
+    return res.json();
+};
+
+// Play order as the chunks have it: easy, moderate, difficult, then by id
+const loadXmlRiddles = async (game) => {
+    const bank = XML_BANKS[game];
+    if (!bank) return [];
+    const res = await fetch(`${import.meta.env.BASE_URL}data/${bank.file}`);
+    if (!res.ok) throw new Error(`${bank.file}: HTTP ${res.status}`);
+    const parser = new XMLParser({ ignoreAttributes: false, attributeNamePrefix: '', parseTagValue: false });
+    const data = parser.parse(await res.text()).riddles?.riddle;
+    const riddles = (Array.isArray(data) ? data : data ? [data] : [])
+        .map((r) => ({
+            id: parseInt(r.id, 10),
+            difficulty: String(r.difficulty ?? '').toLowerCase(),
+            question: String(r.question ?? '').trim(),
+            answer: String(r.answer ?? '').trim(),
+            hint: String(r.hint ?? '').trim(),
+            explanation: String(r.explanation ?? '').trim(),
+        }))
+        .filter((r) => r.id > 0 && DIFFICULTY_ORDER.includes(r.difficulty) && r.question && bank.typeable(r.answer));
+    return riddles.sort((a, b) =>
+        DIFFICULTY_ORDER.indexOf(a.difficulty) - DIFFICULTY_ORDER.indexOf(b.difficulty) || a.id - b.id);
+};
+
+const openXmlGame = async (game) => {
+    const riddles = await loadXmlRiddles(game);
+    if (riddles.length === 0) return null;
+    return { count: riddles.length, riddle: async (level) => riddles[level] ?? null };
+};
+
+/**
+ * Open one game's riddles ('riddle_cipher' or 'math_maze').
+ * Resolves to { count, riddle(level) }, or null when the game has no riddles.
+ * riddle(level) resolves to { id, difficulty, question, answer, hint, explanation }.
+ */
+export const openRiddleGame = async (game) => {
+    let index;
+    try {
+        index = await loadRiddleIndex();
+    } catch (e) {
+        console.warn('Riddle chunks unavailable, reading the XML bank:', e);
+        return openXmlGame(game);
+    }
+    const entry = index.games?.[game];
+    if (!entry || entry.count === 0) return null;
+
+    const chunks = new Map();
+    const chunkFor = (level) => entry.chunks.find((c) => level >= c.first && level < c.first + c.count);
+    const loadChunk = (chunk) => {
+        if (!chunks.has(chunk.file)) {
+            chunks.set(chunk.file, fetchChunk(chunk.file)
+                .then((doc) => doc.riddles)
+                .catch((e) => {
+                    chunks.delete(chunk.file);
+                    throw e;
+                }));
+        }
+        return chunks.get(chunk.file);
+    };
+
+    return {
+        count: entry.count,
+        riddle: async (level) => {
+            const chunk = chunkFor(level);
+            if (!chunk) return null;
+            const next = chunkFor(chunk.first + chunk.count);
+            if (next && level >= chunk.first + chunk.count - PREFETCH_AHEAD) {
+                loadChunk(next).catch(() => {}); // retried when the level is reached
+            }
+            const riddles = await loadChunk(chunk);
+            return riddles[level - chunk.first] ?? null;
+        },
+    };
+};
@@ -0,0 +1,31 @@
+import os
+import shutil
+
+import pytest
+
+from qbank import loader
+from qbank.paths import chapter_files
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep the parse cache of every test out of build/qbank."""
+    path = tmp_path / "cache"
+    monkeypatch.setattr(loader, "CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """A writable copy of the fixture chapters."""
+    path = tmp_path / "raw"
+    shutil.copytree(os.path.join(FIXTURES, "raw"), path)
+    return path
+
+
+@pytest.fixture
+def good_files(raw_dir):
+    """The fixture chapters that parse."""
+    return [p for p in chapter_files(str(raw_dir)) if not p.endswith("broken.xml")]
@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from qbank import numeric
+from qbank.catalog import load_catalog
+from qbank.generate import _existing_ids, generate
+from qbank.loader import load_chapter
+from qbank.paths import RAW_DIR
+
+
+def test_catalog_ids_do_not_clash_with_hand_written_chapters():
+    specs = load_catalog()
+    taken = _existing_ids(RAW_DIR, {spec.file for spec in specs})
+    assert [spec.file for spec in specs if (spec.subject.lower(), spec.id) in taken] == []
+
+
+def test_every_numeric_topic_is_in_the_catalog():
+    topics = {t for spec in load_catalog() for t in spec.topics}
+    assert sorted(set(numeric.TOPICS) - topics) == []
+
+
+@pytest.fixture
+def numeric_specs():
+    return [spec for spec in load_catalog() if any(t in numeric.TOPICS for t in spec.topics)]
+
+
+def test_numeric_topics_are_generated_with_computed_answers(tmp_path, numeric_specs):
+    out = tmp_path / "raw"
+    rebuilt, _, errors = generate(numeric_specs, str(out), count=60, workers=1,
+                                  manifest_path=str(tmp_path / "manifest.json"),
+                                  diff_path=str(tmp_path / "pool_diff.json"))
+    assert errors == {}
+    assert sorted(rebuilt) == sorted(spec.file for spec in numeric_specs)
+
+    seen = set()
+    for spec in numeric_specs:
+        chapter = load_chapter(str(out / spec.file), strict=True)
+        for questions in chapter.pools.values():
+            for q in questions:
+                if q.topic not in numeric.TOPICS:
+                    continue
+                seen.add(q.topic)
+                answer = dict(q.options)[q.answer]
+                # A computed value, not the "Option A related to ..." template text
+                assert re.match(r"-?\d", answer), (spec.file, q.text, answer)
+                assert answer.split()[0] in q.explanation
+    assert seen == set(numeric.TOPICS)
@@ -0,0 +1,60 @@
+import pytest
+
+from qbank.leaderboard import Tally, main, rank, snapshot, user_xp
+
+
+def _tally(users):
+    tally = Tally()
+    for data in users:
+        tally.add(data)
+    return tally
+
+
+def test_user_xp_normalises_bad_documents():
+    assert user_xp({"stats": {"xp": 120}, "stream": "jee"}) == (120, "JEE")
+    assert user_xp({"stats": {"xp": 99.9}, "stream": "NEET"}) == (99, "NEET")
+    assert user_xp({"stats": {"xp": True}, "stream": "CBSE"}) == (0, None)
+    assert user_xp({"stats": {"xp": -5}}) == (0, None)
+    assert user_xp({"stats": None}) == (0, None)
+
+
+def test_exact_buckets_rank_exactly():
+    tally = _tally([{"stats": {"xp": xp}, "stream": s} for xp, s in
+                    [(10, "JEE"), (20, "JEE"), (20, "NEET"), (30, "NEET"), (40, "JEE")]])
+    doc = snapshot(tally)
+    assert doc["bucketWidth"] == 1
+    assert doc["streams"]["all"] == {"total": 5, "above": [4, 2, 1, 0]}
+    assert rank(doc, 40) == (1, 5, 100)
+    assert rank(doc, 20) == (3, 5, 60)
+    assert rank(doc, 5) == (6, 5, 1)
+    assert rank(doc, 20, "NEET") == (2, 2, 50)
+    assert rank(doc, 20, "unknown") == rank(doc, 20)
+
+
+def test_rank_interpolates_within_a_wide_bucket():
+    # 100 users at xp 0..99 squeezed into 2 buckets of width 64
+    doc = snapshot(_tally({"stats": {"xp": xp}} for xp in range(100)), max_buckets=2)
+    assert (doc["bucketWidth"], doc["edges"]) == (64, [0, 64])
+    assert doc["streams"]["all"]["above"] == [36, 0]
+    # 36 users in [64, 128) spread evenly: about half of them sit above 96
+    assert rank(doc, 96) == (1 + round(36 * 31 / 64), 100, 83)
+    assert rank(doc, 127)[0] == 1
+    assert rank(doc, 0)[0] == 1 + 36 + round(64 * 63 / 64)
+    assert rank(doc, 96.7) == rank(doc, 96)
+
+
+def test_snapshot_rejects_fewer_than_one_bucket():
+    with pytest.raises(ValueError):
+        snapshot(Tally(), max_buckets=0)
+
+
+def test_empty_board_ranks_first():
+    assert rank(snapshot(Tally()), 10) == (1, 1, 100)
+
+
+def test_file_backend_needs_a_target(tmp_path, capsys):
+    users = tmp_path / "users.jsonl"
+    users.write_text('{"stats": {"xp": 5}}\n', encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main(["--input", str(users), "--backend", "file"])
+    assert "--target is required" in capsys.readouterr().err
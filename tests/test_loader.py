@@ -0,0 +1,72 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from qbank.loader import SchemaError, iter_questions, load_chapter, read_header
+
+
+def test_load_chapter_reads_pools_in_order(raw_dir):
+    chapter = load_chapter(str(raw_dir / "electrostatics.xml"))
+    assert (chapter.subject, chapter.chapter_id, chapter.name) == ("Physics", 1, "Electric Charges and Fields")
+    assert [len(chapter.pools[d]) for d in ("easy", "medium", "hard")] == [3, 1, 0]
+    q = chapter.pools["easy"][1]
+    assert q.answer == "B"
+    assert q.options[1] == ("B", "-1.6 × 10^-19 C")
+    assert q.topic == "Charge"
+
+
+def test_schema_problems_are_reported_and_skipped_unless_strict(raw_dir):
+    path = str(raw_dir / "solutions.xml")
+    problems = []
+    questions = list(iter_questions(path, on_error=problems.append))
+    # The invalid question is still yielded; callers filter it with question_problems
+    assert len(questions) == 3
+    assert problems == ["easy #2: answer 'E' is not one of the option ids"]
+
+    with pytest.raises(SchemaError, match="answer 'E'"):
+        list(iter_questions(path, strict=True))
+
+
+def test_malformed_file_raises_parse_error(raw_dir):
+    with pytest.raises(ET.ParseError):
+        load_chapter(str(raw_dir / "broken.xml"))
+    # Its header is still readable, so callers can keep its last published pools
+    assert read_header(str(raw_dir / "broken.xml")) == ("Mathematics", 201, "Sets")
+
+
+def test_missing_chapter_id_is_none(tmp_path):
+    path = tmp_path / "no_id.xml"
+    path.write_text('<chapter subject="Physics" name="Units"><easy/></chapter>', encoding="utf-8")
+    assert read_header(str(path)) == ("Physics", None, "Units")
+    assert load_chapter(str(path)).chapter_id == 0
+
+
+def test_cache_replays_until_the_file_changes(raw_dir, cache_dir):
+    path = str(raw_dir / "electrostatics.xml")
+    first = load_chapter(path)
+    assert len(os.listdir(cache_dir)) == 1
+    assert load_chapter(path) == first
+
+    text = (raw_dir / "electrostatics.xml").read_text(encoding="utf-8")
+    (raw_dir / "electrostatics.xml").write_text(text.replace("Coulomb</option>", "Coulomb (C)</option>"),
+                                               encoding="utf-8")
+    changed = load_chapter(path)
+    assert changed.pools["easy"][0].options[0] == ("A", "Coulomb (C)")
+    assert changed == load_chapter(path, cache=False)
+
+
+def test_cached_problems_still_honour_strict(raw_dir):
+    path = str(raw_dir / "solutions.xml")
+    list(iter_questions(path))  # fills the cache
+    with pytest.raises(SchemaError):
+        list(iter_questions(path, strict=True))
+
+
+def test_cached_parse_error_is_raised_again(raw_dir, cache_dir):
+    path = str(raw_dir / "broken.xml")
+    for _ in range(2):
+        with pytest.raises(ET.ParseError):
+            list(iter_questions(path))
+    assert os.listdir(cache_dir)
+
@@ -0,0 +1,77 @@
+import json
+
+from qbank import manifest as mf
+from qbank.loader import Question
+
+
+def _empty():
+    return {"version": mf.MANIFEST_VERSION, "chapters": {}}
+
+
+def _edit(path, old, new):
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new), encoding="utf-8")
+
+
+def test_first_scan_upserts_every_pool(good_files):
+    new, diff, errors = mf.update(_empty(), good_files)
+    assert errors == {}
+    assert diff == {
+        "upsert": ["chemistry_102_easy", "chemistry_102_hard", "physics_1_easy", "physics_1_medium"],
+        "delete": [],
+    }
+    assert new["chapters"]["electrostatics.xml"]["pools"]["easy"]["count"] == 3
+
+
+def test_rescan_diffs_only_changed_pools(raw_dir, good_files):
+    old, _, _ = mf.update(_empty(), good_files)
+    _edit(raw_dir / "electrostatics.xml", "Electric field lines never:", "Electric field lines can never:")
+    _edit(raw_dir / "solutions.xml", "<hard>", "<medium>")
+    _edit(raw_dir / "solutions.xml", "</hard>", "</medium>")
+    new, diff, _ = mf.update(old, good_files)
+    assert diff == {"upsert": ["chemistry_102_medium", "physics_1_medium"], "delete": ["chemistry_102_hard"]}
+    assert mf.update(new, good_files)[1] == {"upsert": [], "delete": []}
+
+
+def test_broken_file_keeps_its_previous_entry(raw_dir, good_files):
+    old, _, _ = mf.update(_empty(), good_files)
+    _edit(raw_dir / "solutions.xml", "</chapter>", "")
+    new, diff, errors = mf.update(old, good_files)
+    assert list(errors) == ["solutions.xml"]
+    assert new["chapters"]["solutions.xml"] == old["chapters"]["solutions.xml"]
+    assert diff == {"upsert": [], "delete": []}
+    assert mf.manifest_bank_hash(new, errors) == mf.bank_hash(
+        {"electrostatics.xml": new["chapters"]["electrostatics.xml"]["sha256"]})
+
+
+def test_pending_diff_merges_until_settled(tmp_path):
+    path = str(tmp_path / "pool_diff.json")
+    mf.write_pending_diff({"upsert": ["a", "b"], "delete": ["c"]}, path, bank="01")
+    # A later scan that recreates c and deletes b supersedes the first diff for them
+    merged = mf.write_pending_diff({"upsert": ["c"], "delete": ["b"]}, path, bank="02")
+    assert merged == {"upsert": ["a", "c"], "delete": ["b"], "bank": "02"}
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == merged
+
+    # An upload that only got through a keeps the rest pending
+    left = mf.settle_pending_diff({"a"}, set(), path)
+    assert (left["upsert"], left["delete"]) == (["c"], ["b"])
+    mf.settle_pending_diff({"c"}, {"b"}, path)
+    assert not (tmp_path / "pool_diff.json").exists()
+    assert mf.load_pending_diff(path) == {"upsert": [], "delete": []}
+
+
+def test_unchanged_pending_diff_is_not_rewritten(tmp_path):
+    path = tmp_path / "pool_diff.json"
+    mf.write_pending_diff({"upsert": ["a"], "delete": []}, str(path), bank="01")
+    before = path.stat().st_mtime_ns
+    mf.write_pending_diff({"upsert": ["a"], "delete": []}, str(path), bank="01")
+    assert path.stat().st_mtime_ns == before
+
+
+def test_question_id_ignores_options_but_not_difficulty():
+    q = Question("Physics", 1, "easy", "What is  charge?", (("A", "x"), ("B", "y")), "A", "")
+    assert mf.question_id(q) == mf.question_id(q._replace(text="what is charge?", answer="B"))
+    assert mf.question_id(q) != mf.question_id(q._replace(difficulty="hard"))
+    assert mf.question_ids([q, q]) == [mf.question_id(q), mf.question_id(q) + "_2"]
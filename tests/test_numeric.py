@@ -0,0 +1,56 @@
+import re
+
+import numpy as np
+import pytest
+
+from qbank import numeric
+
+
+def test_sig3_and_fmt():
+    assert numeric.sig3([123456, 0.0012345, -98.76, 0]).tolist() == pytest.approx([123000, 0.00123, -98.8, 0])
+    assert [numeric.fmt(x) for x in (0, 1.5, 98.8, 0.00123, 123000, 4.56e-7)] == [
+        "0", "1.50", "98.8", "0.00123", "1.23 × 10^5", "4.56 × 10^-7"]
+
+
+def test_options_put_the_answer_at_the_returned_position():
+    form = numeric.form_for(numeric.TOPICS["Coulomb's Law"], "easy")
+    params = {"q1": np.array([2.0, 5.0]), "q2": np.array([3.0, 5.0]), "r": np.array([0.3, 0.5])}
+    values, pos = numeric.options_for(form, params, np.random.default_rng(0))
+    expected = numeric.sig3(numeric.K_COULOMB * params["q1"] * params["q2"] * 1e-12 / params["r"] ** 2)
+    assert values[np.arange(2), pos].tolist() == pytest.approx(expected.tolist())
+    for row in values:
+        assert len(set(row)) == 4 and np.all(row != 0)
+
+
+def test_colliding_mistakes_fall_back_to_scaled_answers():
+    form = numeric.Form("{x}", lambda p: p["x"], "", (lambda p: p["x"], lambda p: p["x"] * 0))
+    values, pos = numeric.options_for(form, {"x": np.array([4.0])}, np.random.default_rng(1))
+    assert values[0, pos[0]] == 4.0
+    assert sorted(values[0]) == [2.0, 4.0, 8.0, 40.0]
+
+
+def test_ohms_law_items_are_correct():
+    rng = np.random.default_rng(7)
+    for text, options, answer, explanation, topic in numeric.items("Ohm's Law", "easy", 20, rng):
+        current, resistance = map(float, re.findall(r"([\d.]+) (?:A|Ω)", text))
+        shown = dict(options)[answer]
+        assert shown == numeric.fmt(float(numeric.sig3(current * resistance))) + " V"
+        assert shown.split()[0] in explanation
+        assert [i for i, _ in options] == list(numeric.OPTION_IDS)
+        assert topic == "Ohm's Law"
+
+
+def test_form_for_falls_back_to_the_nearest_easier_form():
+    only_easy = numeric.NumericTopic({}, {"easy": "E"})
+    only_hard = numeric.NumericTopic({}, {"hard": "H"})
+    assert numeric.form_for(only_easy, "hard") == "E"
+    assert numeric.form_for(only_hard, "easy") == "H"
+
+
+@pytest.mark.parametrize("name", sorted(numeric.TOPICS))
+def test_every_topic_generates_every_difficulty(name):
+    rng = np.random.default_rng(0)
+    for difficulty in ("easy", "medium", "hard"):
+        for _, options, answer, _, _ in numeric.items(name, difficulty, 8, rng):
+            assert len({text for _, text in options}) == 4
+            assert answer in numeric.OPTION_IDS
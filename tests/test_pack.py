@@ -0,0 +1,57 @@
+import pytest
+
+from qbank.loader import load_chapter
+from qbank.manifest import bank_hash, file_hash
+from qbank.pack import PackError, PackReader, compile_pack
+
+
+def test_round_trip_matches_the_parsed_chapters(tmp_path, good_files):
+    out = str(tmp_path / "questions.qbpk")
+    n_pools, n_questions, skipped = compile_pack(good_files, out)
+    assert (n_pools, n_questions, skipped) == (4, 7, [])
+
+    with PackReader(out) as reader:
+        assert sorted(reader.pools()) == [
+            ("Chemistry", 102, "easy"), ("Chemistry", 102, "hard"),
+            ("Physics", 1, "easy"), ("Physics", 1, "medium"),
+        ]
+        chapter = load_chapter(good_files[0])
+        assert chapter.subject == "Physics"
+        for difficulty, questions in chapter.pools.items():
+            # The pack keeps no topics
+            expected = [q._replace(topic="") for q in questions]
+            assert reader.pool("Physics", 1, difficulty) == expected
+
+
+def test_invalid_answer_decodes_as_empty(tmp_path, good_files):
+    out = str(tmp_path / "questions.qbpk")
+    compile_pack(good_files, out)
+    with PackReader(out) as reader:
+        assert [q.answer for q in reader.pool("chemistry", "102", "easy")] == ["A", ""]
+        assert reader.pool("Physics", 1, "hard") == []
+
+
+def test_malformed_files_are_skipped_and_left_out_of_the_bank_hash(tmp_path, raw_dir, good_files):
+    out = str(tmp_path / "questions.qbpk")
+    files = good_files + [str(raw_dir / "broken.xml")]
+    _, _, skipped = compile_pack(files, out)
+    assert [name for name, _ in skipped] == ["broken.xml"]
+
+    expected = bank_hash({p.rsplit("/", 1)[-1]: file_hash(p) for p in good_files})
+    with PackReader(out) as reader:
+        assert reader.bank_hash.hex() == expected
+
+
+def test_strict_refuses_malformed_and_invalid_files(tmp_path, raw_dir):
+    out = str(tmp_path / "questions.qbpk")
+    with pytest.raises(PackError, match="broken.xml"):
+        compile_pack([str(raw_dir / "broken.xml")], out, strict=True)
+    with pytest.raises(PackError, match="solutions.xml"):
+        compile_pack([str(raw_dir / "solutions.xml")], out, strict=True)
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_pack"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(PackError, match="not a question pack"):
+        PackReader(str(path))
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from qbank import riddles
+
+SOURCE = os.path.join(os.path.dirname(__file__), "fixtures", "riddles")
+
+
+def _element(xml):
+    return ET.fromstring(xml)
+
+
+def test_riddle_problems_lists_every_problem():
+    riddle, problems = riddles.riddle_problems(_element(
+        '<riddle id="x" difficulty="hard"><question>Q</question><answer/><clue>c</clue></riddle>'))
+    assert riddle is None
+    assert problems == [
+        "id 'x' is not a positive integer",
+        "unknown difficulty 'hard'",
+        "unexpected <clue>",
+        "missing or empty <answer>",
+        "missing or empty <hint>",
+        "missing or empty <explanation>",
+    ]
+
+
+def test_cipher_bank_drops_duplicates_and_untypeable_answers():
+    kept, problems = riddles.load_bank(os.path.join(SOURCE, "riddles.xml"), riddles.GAMES["riddle_cipher"])
+    assert [(r.id, r.difficulty) for r in kept] == [(1, "easy"), (2, "moderate")]
+    assert problems == [
+        ("3", "duplicate of riddle 1"),
+        ("1", "id 1 is used twice"),
+        ("4", "answer '10' cannot be typed on the RiddleCipher keyboard (A-Z only)"),
+        ("5", "unknown difficulty 'tricky'"),
+        ("6", "missing or empty <hint>"),
+    ]
+
+
+def test_maze_answers_are_short_integers():
+    maze = riddles.GAMES["math_maze"]
+    assert maze.answer_ok("-5") is None
+    assert maze.answer_ok("0.5")
+    assert maze.answer_ok("12345678901")
+    kept, _ = riddles.load_bank(os.path.join(SOURCE, "math_riddles.xml"), maze)
+    assert [r.answer for r in kept] == ["11", "-5"]
+
+
+def test_chunks_number_levels_across_difficulties():
+    bank = [riddles.Riddle(i, d, f"q{i}", "A", "h", "e")
+            for i, d in enumerate(["easy"] * 3 + ["difficult"] * 2, 1)]
+    entries = [entry for entry, _ in riddles.chunks("riddle_cipher", bank, size=2)]
+    assert entries == [
+        {"difficulty": "easy", "first": 0, "count": 2, "file": "riddle_cipher_easy_1"},
+        {"difficulty": "easy", "first": 2, "count": 1, "file": "riddle_cipher_easy_2"},
+        {"difficulty": "difficult", "first": 3, "count": 2, "file": "riddle_cipher_difficult_1"},
+    ]
+
+
+def test_build_keeps_a_broken_bank_published(tmp_path):
+    source, out = tmp_path / "data", tmp_path / "riddles"
+    shutil.copytree(SOURCE, source)
+    counts, problems, (written, removed), errors = riddles.build(str(source), str(out), size=1)
+    assert counts == {"riddle_cipher": 2, "math_maze": 2} and errors == {}
+    assert (written, removed) == (9, 0)  # 4 chunks as .json and .json.gz, and the index
+    assert riddles.build(str(source), str(out), size=1)[2] == (0, 0)
+
+    (source / "math_riddles.xml").write_text("<riddles>", encoding="utf-8")
+    counts, _, (_, removed), errors = riddles.build(str(source), str(out), size=1)
+    assert list(errors) == ["math_riddles.xml"] and removed == 0
+    index = json.loads((out / "index.json").read_text(encoding="utf-8"))
+    assert index["games"]["math_maze"]["count"] == 2
+
+    (source / "math_riddles.xml").write_text("<riddles/>", encoding="utf-8")
+    counts, _, (_, removed), _ = riddles.build(str(source), str(out), size=1)
+    assert counts["math_maze"] == 0 and removed == 4
+
+
+@pytest.mark.parametrize("game", sorted(riddles.GAMES))
+def test_shipped_banks_parse(game):
+    path = os.path.join(riddles.SOURCE_DIR, riddles.GAMES[game].source)
+    if not os.path.exists(path):
+        pytest.skip(f"{path} is not built")
+    kept, _ = riddles.load_bank(path, riddles.GAMES[game])
+    assert kept
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from qbank.pack import PackReader, compile_pack
+from qbank.serve import SessionServer
+
+CHAPTER = """<chapter subject="{subject}" id="{id}" name="{name}"><easy>
+    <question><text>{name}?</text>
+        <option id="A">Yes</option><option id="B">No</option>
+        <answer>A</answer><explanation>Yes.</explanation></question>
+</easy><medium/><hard/></chapter>"""
+
+
+@pytest.fixture
+def server(tmp_path, good_files):
+    files = list(good_files)
+    for subject, chapter_id, name in (("Biology", 301, "Structural Organisation in Animals"),
+                                      ("Zoology", 320, "Human Reproduction")):
+        path = tmp_path / f"chapter_{chapter_id}.xml"
+        path.write_text(CHAPTER.format(subject=subject, id=chapter_id, name=name), encoding="utf-8")
+        files.append(str(path))
+    compile_pack(files, str(tmp_path / "questions.qbpk"))
+    reader = PackReader(str(tmp_path / "questions.qbpk"))
+    yield SessionServer(reader, 1 << 20, seed=0)
+    reader.close()
+
+
+def _get(server, path):
+    status, body = server.route(b"GET", path.encode())
+    return status, json.loads(body)
+
+
+def test_app_codes_resolve_to_bank_subjects(server):
+    status, session = _get(server, "/session/phy/1/easy")
+    assert status == 200 and session["pool"] == "physics_1_easy" and session["size"] == 3
+    # Class 11 zoology is Biology in the bank, class 12 zoology is Zoology
+    assert _get(server, "/session/zoo/301/easy")[1]["pool"] == "biology_301_easy"
+    assert _get(server, "/session/zoo/320/easy")[1]["pool"] == "zoology_320_easy"
+    assert _get(server, "/session/Chemistry/102/easy")[0] == 200
+
+
+def test_sessions_leave_out_invalid_questions(server):
+    status, session = _get(server, "/session/chem/102/easy")
+    assert status == 200 and session["size"] == 1
+    [q] = session["questions"]
+    assert q["answer"] == q["correctAnswer"]
+    assert q["options"][ord(q["answer"]) - ord("A")]["text"] == "mol/kg"
+
+
+def test_bad_requests(server):
+    assert _get(server, "/session/phy/x/easy")[0] == 400
+    assert _get(server, "/session/phy/1/extreme")[0] == 404
+    assert _get(server, "/session/phy/99/easy")[0] == 404
+    assert server.route(b"POST", b"/metrics")[0] == 405
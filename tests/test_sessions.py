@@ -0,0 +1,61 @@
+import json
+import random
+from collections import Counter
+
+from qbank import sessions
+from qbank.loader import load_chapter
+
+
+def test_allocate_gives_every_topic_a_slot_then_shares_by_size():
+    rng = random.Random(0)
+    sizes = {"big": 60, "mid": 30, "small": 1}
+    for _ in range(50):
+        quota = sessions.allocate(sizes, 10, rng)
+        assert sum(quota.values()) == 10
+        assert quota["small"] == 1
+        assert 5 <= quota["big"] <= 7
+    assert sessions.allocate({"a": 2, "b": 1}, 25, rng) == {"a": 2, "b": 1}
+    # Fewer slots than topics: no guaranteed slot, still exactly k
+    assert sum(sessions.allocate({t: 3 for t in "abcde"}, 2, rng).values()) == 2
+
+
+def test_sessions_never_repeat_a_question_and_serve_evenly():
+    topics = ["ohm"] * 30 + ["joule"] * 20 + ["field"] * 10
+    rows = sessions.sample_sessions(topics, n_sessions=60, k=12, seed=3)
+    assert all(len(row) == len(set(row)) == 12 for row in rows)
+    served = Counter(i for row in rows for i in row)
+    assert set(served) == set(range(60))
+    # Decks deal a topic's questions evenly; the small topic is served more for its guaranteed slot
+    for first, last in ((0, 30), (30, 50), (50, 60)):
+        counts = [served[i] for i in range(first, last)]
+        assert max(counts) - min(counts) <= 1
+    assert rows == sessions.sample_sessions(topics, n_sessions=60, k=12, seed=3)
+
+
+def test_small_pool_sessions_hold_the_whole_pool():
+    rows = sessions.sample_sessions(["", "", ""], n_sessions=4, k=25)
+    assert [sorted(row) for row in rows] == [[0, 1, 2]] * 4
+
+
+def test_encoding_round_trips_and_widens_with_the_pool():
+    rows = [[0, 299, 7], [5, 1, 2]]
+    code, blob = sessions.encode_sessions(rows, 300)
+    assert code == "H"
+    assert sessions.decode_sessions({"type": code, "sessions": blob, "sessionSize": 3}) == rows
+    assert sessions.encode_sessions([[0, 255]], 256)[0] == "H"
+    assert sessions.encode_sessions([[0, 254]], 255)[0] == "B"
+
+
+def test_build_indexes_valid_questions_and_removes_stale_files(tmp_path, good_files):
+    out = tmp_path / "sessions"
+    out.mkdir()
+    (out / "physics_9_easy.json").write_text("{}", encoding="utf-8")
+    pools, written, removed, errors = sessions.build(good_files, str(out), n_sessions=4, k=25)
+    assert (pools, written, removed, errors) == (4, 4, 1, {})
+
+    doc = json.loads((out / "chemistry_102_easy.json").read_text(encoding="utf-8"))
+    valid = sessions.valid_questions(load_chapter(good_files[1]).pools["easy"])
+    assert doc["poolSize"] == len(valid) == 1
+    assert sessions.decode_sessions(doc) == [[0]] * 4
+
+    assert sessions.build(good_files, str(out), n_sessions=4, k=25)[1:3] == (0, 0)
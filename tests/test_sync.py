@@ -0,0 +1,79 @@
+import json
+import os
+
+from qbank.sync import publish
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _edit(path, old, new):
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new), encoding="utf-8")
+
+
+def test_first_publish_adds_every_valid_question(tmp_path, good_files):
+    out = tmp_path / "sync"
+    index, changed, _, removed, errors = publish(good_files, str(out))
+    assert (changed, removed, errors) == (4, 0, {})
+    assert index["pools"]["chemistry_102_easy"]["count"] == 1  # the invalid question is left out
+    assert sorted(os.listdir(out / "physics_1_easy")) == ["0-1.json", "v1.json"]
+    first = _read(out / "physics_1_easy" / "0-1.json")
+    assert (first["from"], first["to"], first["modify"], first["remove"]) == (0, 1, [], [])
+    assert [q["answer"] for q in first["add"]] == ["A", "B", "C"]
+
+
+def test_republish_writes_deltas_from_each_kept_version(tmp_path, raw_dir, good_files):
+    out = tmp_path / "sync"
+    publish(good_files, str(out))
+    v1 = _read(out / "physics_1_easy" / "v1.json")
+    _edit(raw_dir / "electrostatics.xml", "1 C = 1 A s.", "One coulomb is one ampere second.")
+    _edit(raw_dir / "electrostatics.xml", "Charge on an electron is:", "The charge on an electron is:")
+
+    index, changed, _, _, _ = publish(good_files, str(out))
+    assert changed == 1
+    assert index["pools"]["physics_1_easy"]["version"] == 2
+    assert sorted(os.listdir(out / "physics_1_easy")) == ["0-2.json", "1-2.json", "v1.json", "v2.json"]
+
+    step = _read(out / "physics_1_easy" / "1-2.json")
+    assert [q["explanation"] for q in step["modify"]] == ["One coulomb is one ampere second."]
+    # Rewording a question gives it a new id
+    assert [q["text"] for q in step["add"]] == ["The charge on an electron is:"]
+    assert len(step["remove"]) == 1 and step["remove"][0] in v1["questions"]
+    full = _read(out / "physics_1_easy" / "0-2.json")
+    assert len(full["add"]) == 3 and full["remove"] == []
+
+
+def test_unchanged_bank_publishes_nothing(tmp_path, good_files):
+    out = str(tmp_path / "sync")
+    first = publish(good_files, out)[0]
+    index, changed, written, removed, _ = publish(good_files, out)
+    assert (index, changed, written, removed) == (first, 0, 0, 0)
+
+
+def test_broken_chapter_keeps_its_pools_and_dropped_chapters_go(tmp_path, raw_dir, good_files):
+    out = tmp_path / "sync"
+    publish(good_files, str(out))
+    _edit(raw_dir / "electrostatics.xml", "</chapter>", "")
+    index, _, _, removed, errors = publish(good_files[:1], str(out))
+    assert list(errors) == ["electrostatics.xml"]
+    assert sorted(index["pools"]) == ["physics_1_easy", "physics_1_medium"]
+    assert removed == 2
+    assert not (out / "chemistry_102_easy").exists()
+
+
+def test_keep_limits_the_deltas_from_older_versions(tmp_path, raw_dir, good_files):
+    out = tmp_path / "sync"
+    pool_dir = out / "physics_1_medium"
+    for n in range(3):
+        if n:
+            _edit(raw_dir / "electrostatics.xml", f"Curve{'!' * (n - 1)}<", f"Curve{'!' * n}<")
+        publish(good_files, str(out), keep=1)
+    assert sorted(os.listdir(pool_dir)) == ["0-3.json", "2-3.json", "v2.json", "v3.json"]
+
+    _edit(raw_dir / "electrostatics.xml", "Curve!!<", "Curve!!!<")
+    publish(good_files, str(out), keep=0)
+    assert sorted(os.listdir(pool_dir)) == ["0-4.json", "v4.json"]
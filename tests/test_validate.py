@@ -0,0 +1,61 @@
+import json
+import shutil
+
+import pytest
+
+from qbank import validate
+from qbank.paths import chapter_files
+
+QUESTION = """
+        <question>
+            <text>{text}</text>
+            <option id="A">Yes</option><option id="B">No</option>
+            <answer>A</answer><explanation>By definition.</explanation>
+        </question>"""
+
+
+def _results(raw_dir, *args, capsys):
+    code = validate.main(["--raw-dir", str(raw_dir), "--json", "--workers", "1", *args])
+    return code, {r["file"]: r for r in json.loads(capsys.readouterr().out)["files"]}
+
+
+def test_clean_chapters_pass(raw_dir, capsys):
+    (raw_dir / "broken.xml").unlink()
+    (raw_dir / "solutions.xml").unlink()
+    code, results = _results(raw_dir, capsys=capsys)
+    assert code == 0
+    assert results["electrostatics.xml"]["counts"] == {"easy": 3, "medium": 1, "hard": 0}
+
+
+def test_reports_parse_and_schema_errors(raw_dir, capsys):
+    code, results = _results(raw_dir, capsys=capsys)
+    assert code == 1
+    assert results["broken.xml"]["errors"][-1].startswith("XML parse error: ")
+    assert results["solutions.xml"]["errors"] == ["easy #2: answer 'E' is not one of the option ids"]
+    assert results["electrostatics.xml"]["errors"] == []
+
+
+def test_duplicate_chapter_id_is_reported_once(raw_dir):
+    shutil.copy(raw_dir / "electrostatics.xml", raw_dir / "electrostatics_copy.xml")
+    results = {r["file"]: r for r in validate.validate(chapter_files(str(raw_dir)), workers=1)}
+    assert results["electrostatics.xml"]["errors"] == []
+    assert results["electrostatics_copy.xml"]["errors"] == ["chapter id 1 already used by electrostatics.xml"]
+
+
+def test_min_unique_fails_pools_of_repeated_questions(raw_dir, capsys):
+    pytest.importorskip("numpy")
+    (raw_dir / "broken.xml").unlink()
+    repeated = QUESTION.format(text="Is a coulomb the SI unit of charge?")
+    (raw_dir / "units.xml").write_text(
+        '<chapter subject="Physics" id="2" name="Units"><easy>'
+        + repeated * 2 + QUESTION.format(text="Does a volt measure electric potential difference?")
+        + "</easy><medium/><hard/></chapter>", encoding="utf-8")
+
+    code, results = _results(raw_dir, "--min-unique", "0.9", capsys=capsys)
+    assert code == 1
+    assert results["units.xml"]["errors"] == ["easy: only 2/3 questions are unique (ratio 0.67 < 0.9)"]
+    assert results["electrostatics.xml"]["errors"] == []
+    # Files that already failed are left out of the duplicate report
+    assert results["solutions.xml"]["errors"] == ["easy #2: answer 'E' is not one of the option ids"]
+
+    assert _results(raw_dir, "--min-unique", "0.5", capsys=capsys)[1]["units.xml"]["errors"] == []